@@ -1,23 +1,105 @@
-import tkinter as tk
-from tkinter import scrolledtext, messagebox, font, ttk
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
-from datetime import datetime, date
+import soupsieve as sv
+from lxml import etree, html as lxml_html
+from datetime import datetime, timedelta, timezone, time as dt_time
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import calendar
 import time
+import codecs
 import threading
 import queue
 import os
 import traceback
-from urllib.parse import urljoin
+import json
+import hashlib
+import html as html_module
+import struct
+import re
+import random
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlparse
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 import sqlite3
 import feedparser
 import webbrowser # Added for opening URLs
+import argparse
+import sys
+
+# tkinter is imported by _load_tkinter() when the GUI starts, so headless runs never load it
+tk = scrolledtext = messagebox = font = ttk = None
 
 # --- Constants ---
 APP_TITLE = "Indian News Scraper"
 DEFAULT_DB_PATH = "news_archive.db"
-SEARCH_TERM = "modi" # Keyword to filter articles by
+SENTIMENT_CACHE_PATH = "sentiment_cache.db" # Sentiment labels keyed by normalized content hash
+SENTIMENT_CACHE_TTL_DAYS = 7 # Cached labels older than this are recomputed
+SENTIMENT_CACHE_MAX_ENTRIES = 50000 # Least recently used labels are evicted beyond this
+WRITER_BATCH_SIZE = 25 # Matched articles committed to the DB per micro-batch...
+WRITER_FLUSH_INTERVAL = 2.0 # ...or after this many seconds, whichever comes first
+CONTENT_PREVIEW_CHARS = 600 # Article text shown in the GUI (full content lives in the DB)
+MAX_BODY_BYTES = 4 * 1024 * 1024 # Page/feed bodies are truncated beyond this
+STREAM_CHUNK_BYTES = 64 * 1024 # Bytes read from the socket at a time
+REGION_CHECK_BYTES = 8 * 1024 # How often (in body bytes) to check whether the content region has closed
+CHARSET_SNIFF_BYTES = 4096 # Bytes scanned for a BOM/<meta charset> when the header declares none
+STOP_AFTER_CONTENT_REGION = True # Stop downloading article pages once the content element has closed
+EARLY_STOP_DRAIN_BYTES = 32 * 1024 # After an early stop, read a remainder up to this size so the keep-alive connection is reused
+ARTICLE_WINDOW_HOURS = None # Keep articles from the last N hours; None = since midnight IST today
+PREFILTER_POLICY = "borderline" # RSS items to fetch: "strict" (feed text hits a rule), "borderline" (also partial/thin evidence), "off" (all)
+                                # A site's "prefilter" key in WEBSITES overrides this
+PREFILTER_MIN_WORDS = 12 # Feed text (title + summary) shorter than this is too thin to rule an item out
+PREFILTER_AUDIT_RATE = 0.05 # Share of ruled-out items fetched anyway to estimate the recall the pre-filter costs
+MINHASH_SHINGLE_WORDS = 5 # Words per shingle when comparing article texts
+MINHASH_PERMUTATIONS = 120 # MinHash signature length
+LSH_BANDS = 20 # Signature bands (of 6 rows each): pairs above ~0.6 similarity almost always collide
+NEAR_DUPLICATE_THRESHOLD = 0.7 # Estimated Jaccard similarity at which two articles are one story
+NEAR_DUPLICATE_MIN_WORDS = 40 # Shorter texts are never clustered (too little evidence)
+NEAR_DUPLICATE_ARCHIVE_DAYS = 3 # Archived articles published this recently are matched against too
+STORE_DUPLICATE_CONTENT = True # Store full text for near-duplicates too (False: drop it for exact copies of a stored text)
+SEARCH_RESULTS_LIMIT = 20 # Default number of hits returned by the `search` command
+PERF_REPORT_DIR = "perf_reports" # Per-run timing reports (JSON) go here; None disables them
+PERF_REPORTS_KEPT = 100 # Older reports are deleted
+PERF_HISTOGRAM_BUCKETS_MS = (1, 5, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000) # Latency histogram bucket bounds
+DAEMON_INTERVAL_MINUTES = 30 # Pause between polls in headless daemon mode (--fixed), first interval otherwise
+
+# --- Adaptive Polling (daemon mode) ---
+POLL_SCHEDULE_PATH = "poll_schedule.json" # Learned per-site rates, intervals and statistics
+POLL_MIN_MINUTES = 5 # Never poll a site more often than this...
+POLL_MAX_MINUTES = 180 # ...or less often than this (unless it keeps failing)
+POLL_TARGET_NEW_ITEMS = 3 # Aim for about this many new items per poll
+POLL_RATE_SMOOTHING = 0.3 # Weight of the latest observation in the new-items-per-hour average
+POLL_BACKOFF_MAX_MINUTES = 720 # Cap for the exponential back-off after repeated failures
+POLL_SEEN_LINKS = 500 # Recently discovered links remembered per site (to tell new items apart)
+
+try:
+    IST = ZoneInfo("Asia/Kolkata") # All article timestamps are carried and stored in this zone
+except ZoneInfoNotFoundError: # No system tz database (e.g. Windows without the tzdata package)
+    IST = timezone(timedelta(hours=5, minutes=30), "IST") # India has no DST, so a fixed offset is exact
+
+# --- Concurrency Limits ---
+MAX_INFLIGHT_FETCHES = 16 # HTTP requests in flight across all sites
+MAX_FETCHES_PER_HOST = 4 # HTTP requests in flight to any single host (politeness)
+HOST_FETCH_LIMITS = {} # Host -> its own MAX_FETCHES_PER_HOST (and keep-alive pool size), e.g. {"www.hindustantimes.com": 8}
+PIPELINE_STAGES = { # Stage -> (worker threads, input queue size); a full queue makes the stage before it wait
+    "discover": (4, 32), # Feeds and listing pages read at once
+    "fetch": (24, 64), # Article page downloads (FETCH_LIMITER still caps what is actually in flight)
+    "extract": (4, 32), # Page parsing; raised to PARSE_WORKERS when the process pool is bigger
+    "filter": (2, 64), # Watchlist matching
+    "analyze": (32, 64), # Articles waiting for a sentiment (batched by SENTIMENT_SCHEDULER)
+    "persist": (1, 64), # Hand-off to the database writer and the results queue
+}
+PIPELINE_STATUS_INTERVAL = 2.0 # Seconds between live queue depth/throughput reports
+WRITER_QUEUE_SIZE = 500 # Articles waiting for the database writer before the pipeline blocks
+RESULTS_QUEUE_SIZE = 1000 # Results/log lines waiting to be displayed before the pipeline blocks
+GUI_QUEUE_BATCH = 50 # Results shown per GUI refresh tick
+HOST_POOL_SIZE = MAX_FETCHES_PER_HOST # Keep-alive connections kept open per host (HOST_FETCH_LIMITS overrides)
+PARSE_WORKERS = 0 # Worker processes for page parsing/extraction; 0 = parse in the fetching thread
 
 # --- API Key Configuration ---
 # SECURITY WARNING: Storing API keys directly in code is insecure.
@@ -58,6 +140,7 @@ WEBSITES = {
         "content_fetch": True,
         "content_selector": "div.article-body, div[itemprop='articleBody']",
         "date_selector_article": "span.publish-time, div.ut-container > span, meta[itemprop='datePublished']",
+        "extractor": "lxml", # "soup" (default, BeautifulSoup) or "lxml" (faster, needs cssselect)
     },
     "News18": {
         "rss_feed_url": "https://www.news18.com/commonfeeds/v1/eng/rss/india.xml",
@@ -94,6 +177,18 @@ WEBSITES = {
         "content_fetch": True,
         "content_selector": "div.article-content, div.story-content, div.articleBody",
         "date_selector_article": "p.story-publish-date, span.date, meta[property='article:published_time']",
+        "extractor": "lxml",
+    },
+}
+
+# --- Watchlists ---
+# Articles are kept when any rule of any watchlist hits. A rule hits when at least one of its
+# "any" terms, all of its "all" terms and none of its "not" terms occur in the title or content,
+# as whole words or phrases, ignoring case. Matches are tagged "Watchlist/rule".
+# Example: "Farm laws": {"all": ["farm", "protest"], "any": ["punjab", "haryana"], "not": ["cricket"]}
+WATCHLISTS = {
+    "Politics": {
+        "Modi": {"any": ["modi"]},
     },
 }
 
@@ -101,6 +196,345 @@ HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
+# Advertise brotli only when a decoder is installed (urllib3 decodes 'br' via the brotli package)
+try:
+    import brotli # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# The lxml extractor (WEBSITES "extractor": "lxml") needs cssselect; without it those sites use BeautifulSoup
+try:
+    from lxml.cssselect import CSSSelector
+    from cssselect import HTMLTranslator, parse as parse_css
+    from cssselect.parser import CombinedSelector
+except ImportError:
+    CSSSelector = None
+
+# --- HTTP Session Pool ---
+
+class HttpSessionPool:
+    """
+    Keeps one keep-alive requests.Session per host so repeated fetches from the same
+    site reuse TCP/TLS connections instead of handshaking for every article.
+    """
+
+    def __init__(self, default_pool_size, pool_size_overrides=None):
+        self.default_pool_size = default_pool_size
+        self.pool_size_overrides = {} if pool_size_overrides is None else pool_size_overrides
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _session_for(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                pool_size = self.pool_size_overrides.get(host, self.default_pool_size)
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=False)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(HEADERS)
+                session.headers.update({"Accept-Encoding": ACCEPT_ENCODING, "Connection": "keep-alive"})
+                self._sessions[host] = session
+            return session
+
+    def get(self, url, **kwargs):
+        """Same as requests.get, but over the pooled session for the URL's host."""
+        return self._session_for(urlparse(url).netloc.lower()).get(url, **kwargs)
+
+    def stats(self):
+        """Returns request/connection counts summed over every connection pool opened so far."""
+        requests_made = connections_opened = 0
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    requests_made += pool.num_requests
+                    connections_opened += pool.num_connections
+        handshakes_saved = max(requests_made - connections_opened, 0)
+        return {
+            "hosts": len(sessions),
+            "requests": requests_made,
+            "connections": connections_opened,
+            "handshakes_saved": handshakes_saved,
+            "reuse_ratio": (handshakes_saved / requests_made) if requests_made else 0.0,
+        }
+
+HTTP_POOL = HttpSessionPool(HOST_POOL_SIZE, HOST_FETCH_LIMITS)
+
+def format_pool_stats():
+    """One-line summary of HTTP connection reuse for the log."""
+    stats = HTTP_POOL.stats()
+    return (f"HTTP pool: {stats['requests']} requests over {stats['connections']} connections "
+            f"to {stats['hosts']} hosts (reuse {stats['reuse_ratio']:.0%}, handshakes saved {stats['handshakes_saved']})")
+
+# --- Conditional GET Cache ---
+
+NOT_MODIFIED = object() # Returned by fetch_html(validators=...) when the server answers 304
+VALIDATOR_FIELDS = ("etag", "last_modified", "body_size", "parse_seconds", "not_modified_count", "bytes_saved",
+                    "parse_seconds_saved", "match_fingerprint") # Columns of http_validators besides url
+
+def matching_fingerprint(config):
+    """
+    Hash of everything that decides which of a site's feed/listing items a run keeps: the
+    WATCHLISTS rules, the site's pre-filter policy and its WEBSITES entry. Validators saved
+    under a different fingerprint are not used, since a 304 would skip items that now match.
+    """
+    settings = {"watchlists": WATCHLISTS, "prefilter": config.get("prefilter", PREFILTER_POLICY), "site": config}
+    return hashlib.sha1(json.dumps(settings, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+class ValidatorCache:
+    """
+    HTTP validators (ETag / Last-Modified) per feed/listing URL, used to send conditional GETs.
+    They live in the archive's http_validators table, so they only ever describe what that
+    archive already holds. A new 200 response's validators stay pending until confirm() (the
+    site's items were all processed) and save() (after the writer committed them); a crash or a
+    failed article fetch therefore means the next run downloads the page again instead of
+    getting a 304 for items it never stored. Also keeps per-URL savings metrics: how many 304s
+    we got, and the bytes and parse time they saved (based on the last full response).
+    Validators are stored with the matching_fingerprint() of their site and only sent while
+    it is unchanged, so editing WATCHLISTS, the pre-filter policy or a site's config makes the
+    next run read every page again.
+    """
+
+    def __init__(self, db_path=None, websites=None):
+        self.db_path = db_path
+        self._fingerprints = { # feed/listing url -> its site's current matching_fingerprint()
+            config.get("rss_feed_url") or config.get("url"): matching_fingerprint(config)
+            for config in (websites or {}).values()
+        }
+        self._lock = threading.Lock()
+        self._entries = {} # url -> saved validators and metrics
+        self._pending = {} # url -> validators of this run's full responses, not yet confirmed
+        self._confirmed = set() # urls whose entry changed and should be saved
+
+    @classmethod
+    def from_db(cls, db_path, websites=None):
+        """Loads the validators saved in `db_path` (empty if there are none yet) for a run over `websites`."""
+        cache = cls(db_path, websites)
+        try:
+            with sqlite3.connect(db_path) as conn:
+                rows = conn.execute(f"SELECT url, {', '.join(VALIDATOR_FIELDS)} FROM http_validators").fetchall()
+        except sqlite3.Error as e:
+            print(f"Database Error (HTTP validators) at {db_path}: {e}. Sending unconditional requests.")
+            return cache
+        for url, *values in rows:
+            cache._entries[url] = dict(zip(VALIDATOR_FIELDS, values))
+        return cache
+
+    def conditional_headers(self, url):
+        """Returns If-None-Match / If-Modified-Since headers for a URL we have seen before."""
+        with self._lock:
+            entry = self._entries.get(url, {})
+            headers = {}
+            if entry.get("match_fingerprint") != self._fingerprints.get(url):
+                return headers # Saved under other matching settings
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            return headers
+
+    def store_response(self, url, etag, last_modified, body_size):
+        """Notes the validators and size of a full (200) response; kept pending until confirm()."""
+        with self._lock:
+            self._pending[url] = {"etag": etag, "last_modified": last_modified, "body_size": body_size,
+                                  "match_fingerprint": self._fingerprints.get(url)}
+
+    def record_parse_time(self, url, seconds):
+        """Notes how long the last full response took to parse (what a 304 saves next time)."""
+        with self._lock:
+            if url in self._pending:
+                self._pending[url]["parse_seconds"] = seconds
+
+    def confirm(self, url):
+        """Marks `url`'s new validators as safe to save: every item the response listed was processed."""
+        with self._lock:
+            if url in self._pending:
+                self._entries.setdefault(url, {}).update(self._pending.pop(url))
+                self._confirmed.add(url)
+
+    def record_not_modified(self, url):
+        """Counts a 304 for `url` and returns (bytes_saved, parse_seconds_saved) for this hit."""
+        with self._lock:
+            entry = self._entries.setdefault(url, {})
+            bytes_saved = entry.get("body_size") or 0
+            parse_saved = entry.get("parse_seconds") or 0.0
+            entry["not_modified_count"] = (entry.get("not_modified_count") or 0) + 1
+            entry["bytes_saved"] = (entry.get("bytes_saved") or 0) + bytes_saved
+            entry["parse_seconds_saved"] = (entry.get("parse_seconds_saved") or 0.0) + parse_saved
+            self._confirmed.add(url)
+            return bytes_saved, parse_saved
+
+    def save(self):
+        """Writes the confirmed entries to the archive (call once the run's articles are committed)."""
+        with self._lock:
+            rows = [(url, *(self._entries[url].get(field) for field in VALIDATOR_FIELDS)) for url in self._confirmed]
+            self._confirmed.clear()
+        if not rows:
+            return
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO http_validators(url, {', '.join(VALIDATOR_FIELDS)}) "
+                    f"VALUES ({', '.join('?' * (len(VALIDATOR_FIELDS) + 1))})", rows
+                )
+        except sqlite3.Error as e:
+            print(f"Database Error (HTTP validators) at {self.db_path}: {e}. Pages will be fetched in full next run.")
+
+    def metrics(self, url):
+        """Cumulative savings metrics for one URL."""
+        with self._lock:
+            entry = self._entries.get(url, {})
+            return {
+                "not_modified_count": entry.get("not_modified_count") or 0,
+                "bytes_saved": entry.get("bytes_saved") or 0,
+                "parse_seconds_saved": entry.get("parse_seconds_saved") or 0.0,
+            }
+
+def use_conditional_gets(incremental, window_hours):
+    """
+    Whether a run may send conditional GETs. A 304 skips every item of a feed, which is only
+    safe when the run keeps nothing the validators' run would have skipped: incremental runs
+    over the default window. Full (--no-incremental) or wider-window runs read every page.
+    """
+    return incremental and window_hours == ARTICLE_WINDOW_HOURS
+
+# --- Fetch Concurrency Limiter ---
+
+class FetchLimiter:
+    """
+    Caps in-flight HTTP requests globally and per host (`host_limits` overrides `max_per_host`
+    for single hosts). Safe to share between threads.
+    """
+
+    def __init__(self, max_inflight, max_per_host, host_limits=None):
+        self.max_per_host = max_per_host
+        self.host_limits = {} if host_limits is None else host_limits
+        self._global_slots = threading.BoundedSemaphore(max_inflight)
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.host_limits.get(host, self.max_per_host))
+            return self._host_slots[host]
+
+    @contextmanager
+    def slot(self, url):
+        """Blocks until both a per-host and a global slot are free for `url`."""
+        host_slots = self._host_semaphore(url)
+        with host_slots: # Take the host slot first so a busy host doesn't hold global slots
+            with self._global_slots:
+                yield
+
+FETCH_LIMITER = FetchLimiter(MAX_INFLIGHT_FETCHES, MAX_FETCHES_PER_HOST, HOST_FETCH_LIMITS)
+
+# --- Run Statistics ---
+# Counters shared by all scraper threads for the current run (guarded by the lock).
+pipeline_stats = {
+    "duplicate_fetches_avoided": 0, # Article pages parsed once and reused for content extraction
+    "not_modified_responses": 0, # Feeds/listing pages answered with 304 Not Modified
+    "not_modified_bytes_saved": 0, # Body bytes those 304s saved us from downloading
+}
+pipeline_stats_lock = threading.Lock()
+download_stats = {} # site -> {"pages", "bytes_downloaded", "bytes_used", "stopped_early", "truncated", "bytes_drained", "connections_dropped"}
+site_poll_results = {} # site -> {"discovered": [(link, article datetime)], "failed": bool} for this run
+prefilter_stats = {} # site -> counts of RSS pre-filter outcomes, see record_prefilter()
+
+def increment_stat(name, amount=1):
+    """Thread-safely increments a run statistic counter."""
+    with pipeline_stats_lock:
+        pipeline_stats[name] = pipeline_stats.get(name, 0) + amount
+
+def reset_pipeline_stats():
+    """Resets all run statistic counters to zero (called at the start of each run)."""
+    with pipeline_stats_lock:
+        for name in pipeline_stats:
+            pipeline_stats[name] = 0
+        download_stats.clear()
+        site_poll_results.clear()
+        prefilter_stats.clear()
+    RUN_TIMINGS.reset()
+
+def record_site_poll(site_name, discovered=None, failed=False):
+    """Notes what a site's feed/listing yielded this run (read by the daemon's PollScheduler)."""
+    with pipeline_stats_lock:
+        entry = site_poll_results.setdefault(site_name, {"discovered": [], "failed": False})
+        if discovered:
+            entry["discovered"].extend(discovered)
+        entry["failed"] = entry["failed"] or failed
+
+def record_prefilter(site_name, outcome):
+    """
+    Counts one RSS pre-filter outcome for a site: "hit", "borderline" (fetched), "skipped" (not
+    fetched), "audit" (would have been skipped, fetched to measure recall), and "matched" /
+    "audit_matched" once a fetched item passes the full-text watchlist check.
+    """
+    with pipeline_stats_lock:
+        entry = prefilter_stats.setdefault(site_name, {
+            "hit": 0, "borderline": 0, "skipped": 0, "audit": 0, "matched": 0, "audit_matched": 0
+        })
+        entry[outcome] += 1
+
+def format_prefilter_stats():
+    """
+    One line per site: items fetched/skipped by the RSS pre-filter and its estimated recall loss,
+    the share of all matches it rules out, extrapolated from the audited items.
+    """
+    with pipeline_stats_lock:
+        items = sorted((site, dict(entry)) for site, entry in prefilter_stats.items())
+    lines = []
+    for site, entry in items:
+        line = (f"{site}: {entry['hit']} feed-text hits, {entry['borderline']} borderline fetched, "
+                f"{entry['skipped']} fetches avoided")
+        if entry["audit"]:
+            # Audited matches were found only because they were audited; the skipped items hide as many pro rata
+            missed = entry["skipped"] * entry["audit_matched"] / entry["audit"]
+            total = entry["matched"] + missed
+            loss = (entry["audit_matched"] + missed) / total * 100 if total else 0.0
+            line += (f"; audit {entry['audit_matched']}/{entry['audit']} matched, "
+                     f"est. recall loss {loss:.1f}% (~{missed:.1f} matches not fetched this run)")
+        elif entry["skipped"]:
+            line += "; recall loss not measured (no audited items yet)"
+        lines.append(line)
+    return lines
+
+def record_download(site_name, body):
+    """Adds one streamed body (see read_body) to the per-site download statistics."""
+    with pipeline_stats_lock:
+        entry = download_stats.setdefault(site_name, {
+            "pages": 0, "bytes_downloaded": 0, "bytes_used": 0, "stopped_early": 0, "truncated": 0,
+            "bytes_drained": 0, "connections_dropped": 0
+        })
+        entry["pages"] += 1
+        entry["bytes_downloaded"] += body["bytes_downloaded"]
+        entry["bytes_used"] += body["bytes_used"]
+        entry["stopped_early"] += body["stopped_early"]
+        entry["truncated"] += body["truncated"]
+        entry["bytes_drained"] += body["bytes_drained"]
+        entry["connections_dropped"] += body["connection_dropped"]
+
+def format_download_stats():
+    """One summary line per site: bytes downloaded vs bytes handed to the parser."""
+    with pipeline_stats_lock:
+        items = sorted((site, dict(entry)) for site, entry in download_stats.items())
+    return [
+        f"{site}: {entry['pages']} pages, {entry['bytes_downloaded'] / 1024:.0f} KB downloaded, "
+        f"{entry['bytes_used'] / 1024:.0f} KB used ({entry['stopped_early']} stopped after the content, "
+        f"{entry['truncated']} truncated at {MAX_BODY_BYTES // 1024} KB; {entry['bytes_drained'] / 1024:.0f} KB drained "
+        f"to keep connections, {entry['connections_dropped']} connections dropped)"
+        for site, entry in items
+    ]
+
 # --- Google AI Setup ---
 google_api_key_configured = False
 try:
@@ -117,97 +551,645 @@ except Exception as e:
 
 # --- Database Functions ---
 
-def init_db(db_path):
-    """Initializes the SQLite database and creates the articles table if needed."""
+def init_db(db_path, progress=print):
+    """
+    Opens (or creates) the SQLite archive and upgrades it to SCHEMA_VERSION, reporting
+    migration steps through `progress`. Returns False if the database can't be used.
+    """
     try:
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS articles (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    source TEXT NOT NULL,
-                    article_date TEXT NOT NULL,
-                    title TEXT NOT NULL,
-                    url TEXT NOT NULL UNIQUE,
-                    content TEXT,
-                    sentiment TEXT
-                )
-            ''')
-            conn.commit()
-        print(f"Database ready at {db_path}")
+        conn = sqlite3.connect(db_path, isolation_level=None) # Autocommit; migrations manage their own transactions
+        try:
+            version = migrate_db(conn, progress)
+        finally:
+            conn.close()
+        print(f"Database ready at {db_path} (schema version {version})")
         return True
     except sqlite3.Error as e:
         print(f"Database Error (Initialization) at {db_path}: {e}")
-        messagebox.showerror("Database Error", f"Could not initialize database:\n{db_path}\n\n{e}")
         return False
     except Exception as e:
         print(f"Unexpected Error (DB Init): {e}")
-        messagebox.showerror("Database Error", f"Unexpected error initializing database:\n{e}")
         return False
 
-def insert_article(db_path, article_data):
-    """Inserts a single article into the database, ignoring duplicates based on URL."""
-    sql = ''' INSERT OR IGNORE INTO articles(source, article_date, title, url, content, sentiment)
-              VALUES(?,?,?,?,?,?) '''
+INSERT_SOURCE_SQL = ''' INSERT OR IGNORE INTO sources(name) VALUES(?) '''
+INSERT_ARTICLE_SQL = ''' INSERT OR IGNORE INTO articles(source_id, article_date, published_at, title, url, content, sentiment,
+                                     cluster_id, minhash, matched_rules)
+              VALUES((SELECT id FROM sources WHERE name = ?),?,?,?,?,?,?,?,?,?) '''
+
+def _article_row(article_data):
+    """Maps an article dict to the parameter tuple for INSERT_ARTICLE_SQL (source name first)."""
+    article_date = article_data.get('date', 'N/A')
+    return (
+        article_data.get('source', 'N/A'),
+        article_date,
+        article_timestamp(article_date),
+        article_data.get('title', 'N/A'),
+        article_data.get('url', 'N/A'),
+        article_data.get('content', ''),
+        article_data.get('sentiment', 'N/A'),
+        article_data.get('cluster_id'),
+        article_data.get('minhash'),
+        json.dumps(article_data['matched_rules']) if article_data.get('matched_rules') else None
+    )
+
+def _insert_rows(conn, rows):
+    """Registers the rows' sources, then inserts the rows; returns the articles cursor."""
+    conn.executemany(INSERT_SOURCE_SQL, {(row[0],) for row in rows})
+    return conn.executemany(INSERT_ARTICLE_SQL, rows)
+
+class ArticleWriter(threading.Thread):
+    """
+    Background thread that persists matched articles as they arrive. Articles submitted from
+    any worker thread are committed with insert_articles_bulk in micro-batches, flushed once
+    `batch_size` articles are pending or the oldest pending one has waited `flush_interval` s.
+    If the thread hits an unexpected error it keeps draining the queue (counting every unsaved
+    article as a database error) so submit() and close() never block, and close() re-raises it.
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_path, batch_size=WRITER_BATCH_SIZE, flush_interval=WRITER_FLUSH_INTERVAL, on_flush=None,
+                 queue_size=WRITER_QUEUE_SIZE):
+        super().__init__(name="article-writer", daemon=True)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush # Called as on_flush(inserted, ignored, errors) after each batch
+        self.inserted_count = self.ignored_count = self.error_count = 0
+        self.failure = None # Exception that stopped the writer; re-raised by close()
+        self._queue = queue.Queue(maxsize=queue_size)
+
+    def submit(self, article):
+        """Queues an article dict for saving (thread-safe; blocks while `queue_size` articles are waiting)."""
+        self._queue.put(article)
+
+    def close(self):
+        """Flushes everything still pending, waits for the writer thread to exit and re-raises its failure."""
+        self._queue.put(self._STOP)
+        self.join()
+        if self.failure is not None:
+            raise self.failure
+
+    def _flush(self, batch):
+        inserted, ignored, errors = insert_articles_bulk(self.db_path, batch)
+        self.inserted_count += inserted
+        self.ignored_count += ignored
+        self.error_count += errors
+        if self.on_flush:
+            try:
+                self.on_flush(inserted, ignored, errors)
+            except Exception as e:
+                print(f"Error in article writer flush callback: {e}")
+        batch.clear()
+
+    def run(self):
+        batch = []
+        try:
+            self._write_batches(batch)
+        except Exception as e:
+            self.failure = e
+            print(f"Article writer failed: {e}")
+            traceback.print_exc()
+            self.error_count += len(batch)
+            while self._queue.get() is not self._STOP: # Unblock submit() until close()
+                self.error_count += 1
+
+    def _write_batches(self, batch):
+        deadline = None
+        while True:
+            timeout = None if not batch else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None # Time threshold reached
+            if item is self._STOP:
+                if batch:
+                    self._flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+                if len(batch) == 1:
+                    deadline = time.monotonic() + self.flush_interval
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+
+class KnownUrlIndex:
+    """
+    In-memory set of article URLs already stored in the archive, loaded once per run and
+    shared by all site workers so archived articles are skipped before any network or LLM work.
+    """
+
+    def __init__(self, urls=()):
+        self._urls = set(urls)
+        self._lock = threading.Lock()
+        self.skipped_by_site = {}
+
+    @classmethod
+    def from_db(cls, db_path):
+        """Loads every stored URL from the articles table (empty index if the DB doesn't exist yet)."""
+        if not db_path or not os.path.exists(db_path):
+            return cls()
+        try:
+            with sqlite3.connect(db_path) as conn:
+                urls = [row[0] for row in conn.execute("SELECT url FROM articles")]
+            print(f"Loaded {len(urls)} archived URLs from {db_path} for incremental scraping.")
+            return cls(urls)
+        except sqlite3.Error as e:
+            print(f"Database Error (Known URL index) at {db_path}: {e}. Incremental skipping disabled.")
+            return cls()
+
+    def __len__(self):
+        return len(self._urls)
+
+    @property
+    def skipped_count(self):
+        return sum(self.skipped_by_site.values())
+
+    def should_skip(self, url, site_name):
+        """True (and counted against `site_name`) if `url` is already archived."""
+        with self._lock:
+            if url in self._urls:
+                self.skipped_by_site[site_name] = self.skipped_by_site.get(site_name, 0) + 1
+                return True
+            return False
+
+def insert_articles_bulk(db_path, articles):
+    """
+    Inserts many articles over one connection in a single transaction (one fsync instead of one
+    per row), ignoring duplicates based on URL. Uses WAL journaling and a single prepared
+    statement via executemany. Returns (inserted_count, ignored_count, error_count).
+    """
+    rows = [_article_row(article) for article in articles]
+    if not rows:
+        return 0, 0, 0
+    with RUN_TIMINGS.timer("db_write", {row[0] for row in rows}): # One sample per batch, under each source in it
+        return _insert_articles_bulk(db_path, rows)
+
+def _insert_articles_bulk(db_path, rows):
+    try:
+        conn = sqlite3.connect(db_path)
+    except sqlite3.Error as e:
+        print(f"Database Error (Bulk Insert) opening {db_path}: {e}")
+        return 0, 0, len(rows)
+
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL") # Safe with WAL; fsync on checkpoint instead of every commit
+        try:
+            with conn: # Commits on success, rolls back on error
+                cursor = _insert_rows(conn, rows)
+            inserted = cursor.rowcount # Rows actually inserted (ignored duplicates don't count)
+            return inserted, len(rows) - inserted, 0
+        except sqlite3.Error as e:
+            # One bad row aborts the whole batch; redo it row by row so counts stay exact
+            print(f"Database Error (Bulk Insert): {e}. Retrying {len(rows)} rows individually.")
+
+        inserted = ignored = errors = 0
+        for row in rows:
+            try:
+                with conn:
+                    cursor = _insert_rows(conn, [row])
+                if cursor.rowcount > 0: inserted += 1
+                else: ignored += 1
+            except sqlite3.Error as e:
+                print(f"Database Error (Insert) for {row[4]}: {e}")
+                errors += 1
+        return inserted, ignored, errors
+    finally:
+        conn.close()
+
+# --- Full-Text Search ---
+# articles_fts is an external-content FTS5 index over articles(title, content): it stores only
+# the inverted index, and the triggers below keep it in step with every insert/update/delete.
+FTS_TABLE_SQL = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title, content, content='articles', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+'''
+FTS_TRIGGERS_SQL = (
+    '''CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF title, content ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END''',
+)
+FTS_RANK_WEIGHTS = (10.0, 1.0) # bm25 weights for (title, content): a title hit counts 10x
+FTS_SNIPPET_TOKENS = 12 # Words of context around the match in search results
+
+def has_search_index(conn):
+    """True if the articles_fts index exists in this database."""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'").fetchone()
+    return row is not None
+
+def _fts_query(query, phrase=False):
+    """The MATCH expression for `query`: FTS5 syntax as typed, or one quoted phrase."""
+    if phrase:
+        return '"' + query.replace('"', '""') + '"'
+    return query
+
+def _search_filters(sources=None, since=None, until=None, sentiments=None):
+    """WHERE clauses and parameters for the source/date/sentiment filters on `articles_view a`."""
+    clauses, params = [], []
+    if sources:
+        clauses.append(f"a.source IN ({','.join('?' * len(sources))})")
+        params.extend(sources)
+    if since is not None:
+        clauses.append("a.published_at >= ?")
+        params.append(int(datetime.combine(since, dt_time(0), IST).timestamp()))
+    if until is not None:
+        clauses.append("a.published_at < ?")
+        params.append(int(datetime.combine(until + timedelta(days=1), dt_time(0), IST).timestamp()))
+    if sentiments:
+        clauses.append(f"a.sentiment IN ({','.join('?' * len(sentiments))})")
+        params.extend(label.strip().capitalize() for label in sentiments)
+    return clauses, params
+
+def search_articles(db_path, query, sources=None, since=None, until=None, sentiments=None,
+                    limit=SEARCH_RESULTS_LIMIT, phrase=False, use_index=True):
+    """
+    Ranked keyword/phrase search over the archive. `query` uses FTS5 syntax (terms, "phrases",
+    AND/OR/NOT, prefix*), or is matched as one phrase with phrase=True. `since`/`until` are
+    dates (inclusive, IST). Hits are dicts ordered best first (bm25, title weighted), with a
+    snippet. Expects a database already upgraded by init_db. Raises ValueError for a malformed
+    query; returns None on database errors.
+    """
+    clauses, params = _search_filters(sources, since, until, sentiments)
     try:
         with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (
-                article_data.get('source', 'N/A'),
-                article_data.get('date', 'N/A'),
-                article_data.get('title', 'N/A'),
-                article_data.get('url', 'N/A'),
-                article_data.get('content', ''),
-                article_data.get('sentiment', 'N/A')
-            ))
-            conn.commit()
-            return cursor.lastrowid # ID if inserted, 0 if ignored
+            if use_index and has_search_index(conn):
+                sql = f'''
+                    SELECT a.id, a.source, a.article_date, a.title, a.url, a.sentiment,
+                           snippet(articles_fts, 1, '[', ']', '...', {FTS_SNIPPET_TOKENS}),
+                           bm25(articles_fts, {FTS_RANK_WEIGHTS[0]}, {FTS_RANK_WEIGHTS[1]}) AS rank
+                    FROM articles_fts JOIN articles_view a ON a.id = articles_fts.rowid
+                    WHERE articles_fts MATCH ?{"".join(" AND " + c for c in clauses)}
+                    ORDER BY rank LIMIT ?
+                '''
+                params = [_fts_query(query, phrase)] + params
+            else:
+                # Unranked fallback: every word (or the whole phrase) must appear in title or content
+                terms = [query] if phrase else query.split()
+                for term in terms:
+                    clauses.append("(a.title LIKE ? OR a.content LIKE ?)")
+                    params.extend([f"%{term}%"] * 2)
+                sql = f'''
+                    SELECT a.id, a.source, a.article_date, a.title, a.url, a.sentiment,
+                           substr(a.content, 1, 120), NULL
+                    FROM articles_view a WHERE {" AND ".join(clauses) or "1"}
+                    ORDER BY a.published_at DESC LIMIT ?
+                '''
+            try:
+                rows = conn.execute(sql, params + [limit]).fetchall()
+            except sqlite3.OperationalError as e:
+                if "locked" in str(e):
+                    raise
+                raise ValueError(f"Invalid search query {query!r}: {e}") from None # FTS5 rejects bad MATCH syntax here
     except sqlite3.Error as e:
-        print(f"Database Error (Insert) for {article_data.get('url', 'N/A')}: {e}")
-        return None # Indicate error
-    except Exception as e:
-        print(f"Unexpected Error (DB Insert): {e}")
+        print(f"Database Error (Search) at {db_path}: {e}")
         return None
+    keys = ("id", "source", "date", "title", "url", "sentiment", "snippet", "rank")
+    return [dict(zip(keys, row)) for row in rows]
+
+# --- Schema Migrations ---
+# PRAGMA user_version records which of SCHEMA_MIGRATIONS have been applied. init_db applies the
+# missing ones in order, each in its own transaction, so archives from any earlier release are
+# upgraded in place (and a failed step leaves the database at the previous version).
+MIGRATION_BATCH_ROWS = 50000 # Rows copied per step when a migration rebuilds a table
+
+ARTICLE_INDEXES_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_articles_source_date ON articles(source_id, published_at)",
+    "CREATE INDEX IF NOT EXISTS idx_articles_date_sentiment ON articles(published_at, sentiment)",
+)
+ARTICLES_VIEW_COLUMNS = ("article_date", "published_at", "title", "url", "content", "sentiment", "cluster_id",
+                         "matched_rules") # articles columns exposed by articles_view, after id and source
+ARTICLES_VIEW_SQL = '''
+    CREATE VIEW articles_view AS
+    SELECT a.id, s.name AS source, {columns}
+    FROM articles a JOIN sources s ON s.id = a.source_id
+'''
+
+def _create_articles_view(conn):
+    """(Re)creates articles_view over the ARTICLES_VIEW_COLUMNS the articles table has at this schema step."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+    columns = ", ".join(f"a.{name}" for name in ARTICLES_VIEW_COLUMNS if name in existing)
+    conn.execute("DROP VIEW IF EXISTS articles_view")
+    conn.execute(ARTICLES_VIEW_SQL.format(columns=columns))
+
+def _migrate_create_articles(conn, progress):
+    """Schema 1: the original articles table."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            article_date TEXT NOT NULL,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL UNIQUE,
+            content TEXT,
+            sentiment TEXT
+        )
+    ''')
+
+def _migrate_search_index(conn, progress):
+    """Schema 2: FTS5 index over title/content with its sync triggers, backfilled from existing rows."""
+    if has_search_index(conn):
+        return
+    try:
+        conn.execute("SAVEPOINT fts")
+        conn.execute(FTS_TABLE_SQL)
+        for statement in FTS_TRIGGERS_SQL:
+            conn.execute(statement)
+        conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+        conn.execute("RELEASE fts")
+    except sqlite3.OperationalError as e:
+        conn.execute("ROLLBACK TO fts")
+        conn.execute("RELEASE fts")
+        progress(f"Full-text search unavailable ({e}); search will scan with LIKE instead.")
+
+def _migrate_normalize_sources(conn, progress):
+    """
+    Schema 3: source names move to a `sources` lookup table, article_date gets a numeric
+    published_at companion (Unix seconds), and composite indexes serve the source/date/sentiment
+    queries. The table is rebuilt in id order, keeping ids so the FTS index stays valid.
+    """
+    conn.execute("CREATE TABLE sources (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    conn.execute("INSERT INTO sources(name) SELECT DISTINCT source FROM articles ORDER BY source")
+    conn.execute('''
+        CREATE TABLE articles_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_id INTEGER NOT NULL REFERENCES sources(id),
+            article_date TEXT NOT NULL, -- IST ISO timestamp (legacy rows: YYYY-MM-DD)
+            published_at INTEGER, -- article_date as Unix seconds; NULL if it isn't a date
+            title TEXT NOT NULL,
+            url TEXT NOT NULL UNIQUE,
+            content TEXT,
+            sentiment TEXT
+        )
+    ''')
+    conn.create_function("article_timestamp", 1, article_timestamp, deterministic=True)
+    total = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+    copied = last_id = 0
+    while copied < total:
+        cursor = conn.execute('''
+            INSERT INTO articles_new(id, source_id, article_date, published_at, title, url, content, sentiment)
+            SELECT a.id, s.id, a.article_date, article_timestamp(a.article_date), a.title, a.url, a.content, a.sentiment
+            FROM articles a JOIN sources s ON s.name = a.source
+            WHERE a.id > ? ORDER BY a.id LIMIT ?
+        ''', (last_id, MIGRATION_BATCH_ROWS))
+        if cursor.rowcount <= 0:
+            break
+        copied += cursor.rowcount
+        last_id = conn.execute("SELECT MAX(id) FROM articles_new").fetchone()[0]
+        progress(f"Migrating articles: {copied}/{total} rows ({copied * 100 // total}%)")
+    conn.execute("DROP TABLE articles") # Also drops the old FTS triggers
+    conn.execute("ALTER TABLE articles_new RENAME TO articles")
+    progress("Building indexes...")
+    for statement in ARTICLE_INDEXES_SQL:
+        conn.execute(statement)
+    _create_articles_view(conn)
+    if has_search_index(conn):
+        for statement in FTS_TRIGGERS_SQL:
+            conn.execute(statement)
+
+def _migrate_story_clusters(conn, progress):
+    """Schema 4: near-duplicate story cluster ids and the MinHash signatures they are found with."""
+    conn.execute("ALTER TABLE articles ADD COLUMN cluster_id TEXT")
+    conn.execute("ALTER TABLE articles ADD COLUMN minhash BLOB")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_cluster ON articles(cluster_id)")
+    _create_articles_view(conn)
+
+def _migrate_matched_rules(conn, progress):
+    """Schema 5: the watchlist rules each article matched (JSON list of "Watchlist/rule" tags)."""
+    conn.execute("ALTER TABLE articles ADD COLUMN matched_rules TEXT")
+    _create_articles_view(conn)
+
+def _migrate_http_validators(conn, progress):
+    """Schema 6: conditional GET validators for feeds/listing pages, kept with the articles they describe."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS http_validators (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            body_size INTEGER,
+            parse_seconds REAL,
+            not_modified_count INTEGER,
+            bytes_saved INTEGER,
+            parse_seconds_saved REAL
+        )
+    ''')
+
+def _migrate_validator_fingerprints(conn, progress):
+    """Schema 7: the matching settings each validator was saved under (older rows never match)."""
+    conn.execute("ALTER TABLE http_validators ADD COLUMN match_fingerprint TEXT")
+
+SCHEMA_MIGRATIONS = [ # (version, description, function(conn, progress)), applied in order
+    (1, "articles table", _migrate_create_articles),
+    (2, "full-text search index", _migrate_search_index),
+    (3, "sources table, published_at timestamps and source/date/sentiment indexes", _migrate_normalize_sources),
+    (4, "near-duplicate story clusters", _migrate_story_clusters),
+    (5, "watchlist rule tags", _migrate_matched_rules),
+    (6, "HTTP validators per archive", _migrate_http_validators),
+    (7, "HTTP validator matching fingerprints", _migrate_validator_fingerprints),
+]
+SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+def schema_version(conn):
+    """The schema version recorded in the database (0 for a new or pre-migration file)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate_db(conn, progress=print):
+    """
+    Applies every migration newer than the database's version. `conn` must be in autocommit
+    mode (isolation_level=None). Returns the resulting version.
+    """
+    version = schema_version(conn)
+    if version > SCHEMA_VERSION:
+        raise sqlite3.DatabaseError(f"schema version {version} is newer than this program supports ({SCHEMA_VERSION})")
+    for target, description, migrate in SCHEMA_MIGRATIONS:
+        if target <= version:
+            continue
+        progress(f"Upgrading database to schema {target}: {description}")
+        start_time = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            migrate(conn, progress)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        version = target
+        if time.time() - start_time >= 1:
+            progress(f"Schema {target} ready in {time.time() - start_time:.1f}s")
+    if version == SCHEMA_VERSION:
+        conn.execute("PRAGMA optimize") # Refresh planner statistics for the new indexes
+    return version
 
 # --- Web Scraping & Parsing Helpers ---
 
 def safe_get_text(element, default=""):
-    """Safely get stripped text from a BeautifulSoup element."""
-    return element.get_text(strip=True) if element else default
+    """Safely get stripped text from a BeautifulSoup (or lxml) element."""
+    if element is None:
+        return default
+    if isinstance(element, etree._Element):
+        return lxml_get_text(element, "", strip=True)
+    return element.get_text(strip=True)
 
 def safe_get_attr(element, attr, default=""):
-    """Safely get an attribute from a BeautifulSoup element, avoiding javascript links."""
-    if not element:
+    """Safely get an attribute from a BeautifulSoup (or lxml) element, avoiding javascript links."""
+    if element is None:
         return default
     value = element.get(attr)
     if value and attr == 'href' and value.strip().lower().startswith('javascript:'):
         return default
     return value if value else default
 
-def parse_date(date_str, site_name_context):
+# Compiled date formats: each regex recognises one shape of (cleaned) date string and lists the
+# strptime formats for it in the same priority order as the full cascade below. The shapes don't
+# overlap, so trying them in any order (e.g. the last one that worked for a site first) gives the
+# same result; strings that match no shape, or fail its formats, go through the full cascade.
+# ISO 8601 timestamps (with or without 'Z'/offset/fractions) are handed to datetime.fromisoformat.
+ISO_FORMAT = "iso"
+DATE_PATTERNS = [
+    (re.compile(r"[A-Za-z]+\s+\d{1,2},\s+\d{4}"), ["%b %d, %Y", "%B %d, %Y"]),
+    (re.compile(r"\d{1,2}\s+[A-Za-z]+\s+\d{4}"), ["%d %b %Y", "%d %B %Y"]),
+    (re.compile(r"\d{4}-\d{1,2}-\d{1,2}"), ["%Y-%m-%d"]),
+    (re.compile(r"\d{1,2}-\d{1,2}-\d{4}"), ["%d-%m-%Y"]),
+    (re.compile(r"\d{1,2}/\d{1,2}/\d{4}"), ["%m/%d/%Y", "%d/%m/%Y"]),
+    (re.compile(r"[A-Za-z]+,\s+\d{1,2}\s+[A-Za-z]+\s+\d{4}\s+\d{1,2}:\d{2}:\d{2}"), ["%a, %d %b %Y %H:%M:%S"]),
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?"), [ISO_FORMAT]),
+    (re.compile(r"[A-Za-z]+\s+\d{1,2},\s+\d{4},\s+\d{1,2}:\d{2}\s+[AaPp][Mm]"), ["%b %d, %Y, %I:%M %p"]),
+    (re.compile(r"[A-Za-z]+\s+\d{1,2},\s+\d{4}\s+\d{1,2}:\d{2}\s+[AaPp][Mm]"), ["%B %d, %Y %I:%M %p"]),
+    (re.compile(r"\d{1,2}\s+[A-Za-z]+\s+\d{4}\s+\d{1,2}:\d{2}"), ["%d %b %Y %H:%M"]),
+    (re.compile(r"\d{8}"), ["%Y%m%d"]),
+]
+DATE_CACHE_MAX_ENTRIES = 20000 # Memoized parse results (cleared when full)
+
+TIMEZONE_NAMES = {"IST": IST, "GMT": timezone.utc, "UTC": timezone.utc} # Trailing zone abbreviations we trust
+TZ_OFFSET_RE = re.compile(r"([+-])(\d{2}):?(\d{2})")
+RELATIVE_AGO_RE = re.compile(r"(\d+)\s*(minute|min|hour|hr)s?\b")
+
+_date_cache = {} # (raw string, today) -> parsed datetime or None
+_date_cache_lock = threading.Lock()
+_date_pattern_hints = {} # site context -> index of the DATE_PATTERNS entry that matched last
+_MISSING = object()
+
+def now_ist():
+    """Current time as an aware datetime in Asia/Kolkata."""
+    return datetime.now(IST)
+
+def to_ist(value, assumed_tz=None):
     """
-    Attempts to parse various date string formats into a date object.
-    Handles relative dates like 'today', common prefixes/suffixes, and timezones.
-    Returns a date object or None if parsing fails.
-    This function is complex due to the variety of date formats online.
+    Converts a datetime to Asia/Kolkata. Naive values are taken to be in `assumed_tz`
+    (default IST, which is what Indian sites print when they omit the zone).
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=assumed_tz or IST)
+    return value.astimezone(IST)
+
+def struct_time_to_ist(parsed):
+    """Converts a UTC struct_time (feedparser's *_parsed fields) to an aware IST datetime."""
+    return datetime.fromtimestamp(calendar.timegm(parsed), tz=timezone.utc).astimezone(IST)
+
+def window_start(hours=None, now=None):
+    """
+    Start of the article time window: the last `hours` hours, or (hours=None) midnight IST
+    today, i.e. the classic "today's news" behaviour.
+    """
+    now = now or now_ist()
+    if hours is None:
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return now - timedelta(hours=hours)
+
+def format_article_date(value):
+    """Formats a stored article_date (ISO timestamp, or a legacy YYYY-MM-DD) for display."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+    if parsed.tzinfo is None:
+        return value # Legacy date-only row
+    return to_ist(parsed).strftime("%Y-%m-%d %H:%M IST")
+
+def article_timestamp(value):
+    """
+    Unix seconds for a stored article_date (ISO timestamp, or a legacy YYYY-MM-DD taken as
+    midnight IST), or None if it isn't a date. Backs the indexed published_at column.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return int(to_ist(parsed).timestamp())
+
+def is_within_window(article_dt, since):
+    """
+    True if the article was published at or after `since`. Date-only values (parsed as
+    midnight IST) count when their day overlaps the window.
+    """
+    if article_dt is None:
+        return False
+    if article_dt >= since:
+        return True
+    return article_dt.time() == dt_time(0) and article_dt.date() == since.date()
+
+def parse_datetime(date_str, site_name_context):
+    """
+    Attempts to parse various date string formats into an aware datetime in Asia/Kolkata.
+    Handles relative dates like '2 hours ago', common prefixes, and timezones (offsets such
+    as +0530, and IST/GMT/UTC); strings without a zone are taken to be IST, and date-only
+    strings become midnight IST. Returns None if parsing fails.
+    Results are memoized per raw string (and day), and the format that last matched for
+    each site is tried first.
     """
     if not date_str:
         return None
 
-    today = date.today()
-    original_date_str = date_str
+    now = now_ist()
+    relative = _parse_relative(date_str, now)
+    if relative is not _MISSING:
+        return relative # Depends on the current time; never cached
+
+    cache_key = (date_str, now.date())
+    cached = _date_cache.get(cache_key, _MISSING)
+    if cached is not _MISSING:
+        return cached
+
+    parsed = _parse_datetime_uncached(date_str, site_name_context, now.date())
+    with _date_cache_lock:
+        if len(_date_cache) >= DATE_CACHE_MAX_ENTRIES:
+            _date_cache.clear()
+        _date_cache[cache_key] = parsed
+    return parsed
+
+def _parse_relative(date_str, now):
+    """Handles 'N hours/minutes ago', 'today', 'just now' and 'yesterday'; _MISSING otherwise."""
+    lowered = date_str.strip().lower()
+    if "yesterday" in lowered:
+        return (now - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    if any(word in lowered for word in ["hour", "minute", "today", "just now"]):
+        match = RELATIVE_AGO_RE.search(lowered)
+        if match:
+            amount = int(match.group(1))
+            unit = timedelta(hours=1) if match.group(2) in ("hour", "hr") else timedelta(minutes=1)
+            return now - amount * unit
+        return now
+    return _MISSING
+
+def _clean_date_string(date_str):
+    """
+    Strips known prefixes ('Updated:') and a trailing timezone (offset like +0530, or
+    IST/GMT/UTC). Returns (cleaned string, tzinfo or None).
+    """
     cleaned_date_str = date_str.strip()
     cleaned_date_str_lower = cleaned_date_str.lower()
 
-    # Handle simple relative dates
-    if any(word in cleaned_date_str_lower for word in ["hour", "minute", "today", "just now"]):
-        return today
-    if "yesterday" in cleaned_date_str_lower:
-        return None # Explicitly skip yesterday
-
-    # Clean common prefixes and timezone indicators
+    # Clean common prefixes
     prefixes = ["Updated :", "Published :", "Updated:", "Published:"]
-    suffixes = ["IST", "PST", "GMT", "UTC"] # Keep suffixes simple for now
 
     for prefix in prefixes:
         if cleaned_date_str_lower.startswith(prefix.lower()):
@@ -215,97 +1197,282 @@ def parse_date(date_str, site_name_context):
             cleaned_date_str_lower = cleaned_date_str.lower() # Update lower version
             break # Assume only one prefix
 
-    # Remove timezone offsets like +0530 (basic removal)
+    # Split off a trailing zone: 'IST', 'GMT', '+0530', '+05:30', '-0400'
+    tzinfo = None
     parts = cleaned_date_str.split()
     if len(parts) > 1:
-        last_part = parts[-1]
-        if last_part.startswith('+') or (last_part.startswith('-') and ':' not in last_part):
-             # Basic check to avoid removing parts of date like '2024-01-01'
-             if not last_part.replace('-','').isdigit() or len(last_part) != 5:
-                 cleaned_date_str = " ".join(parts[:-1]).strip()
+        last_part = parts[-1].strip("()")
+        offset = TZ_OFFSET_RE.fullmatch(last_part)
+        if last_part.upper() in TIMEZONE_NAMES:
+            tzinfo = TIMEZONE_NAMES[last_part.upper()]
+        elif offset:
+            sign = 1 if offset.group(1) == '+' else -1
+            tzinfo = timezone(sign * timedelta(hours=int(offset.group(2)), minutes=int(offset.group(3))))
+        if tzinfo is not None:
+            cleaned_date_str = " ".join(parts[:-1]).strip()
+
+    return cleaned_date_str, tzinfo
+
+def _strptime(value, fmt):
+    """strptime that also understands ISO_FORMAT (via fromisoformat, which keeps offsets)."""
+    if fmt == ISO_FORMAT:
+        return datetime.fromisoformat(value)
+    return datetime.strptime(value, fmt)
+
+def _parse_with_compiled_formats(cleaned_date_str, site_name_context):
+    """Regex-dispatched strptime; returns a datetime, or None if no known shape matched."""
+    hint = _date_pattern_hints.get(site_name_context)
+    order = range(len(DATE_PATTERNS))
+    if hint is not None:
+        order = [hint] + [i for i in order if i != hint]
+
+    for index in order:
+        pattern, formats = DATE_PATTERNS[index]
+        if not pattern.fullmatch(cleaned_date_str):
+            continue
+        for fmt in formats:
+            try:
+                parsed = _strptime(cleaned_date_str, fmt)
+            except ValueError:
+                continue # e.g. '%b' vs '%B', or an out-of-range day/month
+            _date_pattern_hints[site_name_context] = index
+            return parsed
+        return None # Shape matched but no format did; let the full cascade decide
+    return None
+
+def _parse_datetime_uncached(date_str, site_name_context, today):
+    """Parses one absolute date string: compiled formats, then the full strptime cascade."""
+    original_date_str = date_str
+    cleaned_date_str, tzinfo = _clean_date_string(date_str)
+    cleaned_date_str_lower = cleaned_date_str.lower()
+
+    parsed = _parse_with_compiled_formats(cleaned_date_str, site_name_context)
+    if parsed:
+        return to_ist(parsed, tzinfo)
 
     # Define formats to try (prioritize common ones)
     formats_to_try = [
         # Most common first
         "%b %d, %Y", "%d %b %Y", "%B %d, %Y", "%d %B %Y",
         "%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%Y",
-        # With time (time part is ignored)
+        # With time
         "%a, %d %b %Y %H:%M:%S", # RFC 5322 (often in RSS/meta)
-        "%Y-%m-%dT%H:%M:%S",     # ISO 8601 common variant
+        ISO_FORMAT,              # ISO 8601, with or without Z/offset
         "%b %d, %Y, %I:%M %p", "%B %d, %Y %I:%M %p",
         "%d %b %Y %H:%M",
         # Less common
         "%Y%m%d",
-        "%Y-%m-%dT%H:%M:%S.%fZ", # ISO 8601 with milliseconds and Z
     ]
 
-    parsed_date = None
     for fmt in formats_to_try:
         try:
-            # Handle potential 'Z' and milliseconds for specific ISO formats
-            parse_str = cleaned_date_str
-            if fmt.endswith("%fZ"):
-                if '.' not in parse_str and parse_str.endswith('Z'):
-                    parse_str = parse_str[:-1] + ".000Z"
-                elif not parse_str.endswith('Z'): continue # Skip if format expects Z
-            elif fmt == "%Y-%m-%dT%H:%M:%S" and parse_str.endswith('Z'):
-                parse_str = parse_str[:-1] # Remove Z if format doesn't expect it
-
-            parsed_datetime = datetime.strptime(parse_str, fmt)
-            parsed_date = parsed_datetime.date()
-            return parsed_date # Success
+            return to_ist(_strptime(cleaned_date_str, fmt), tzinfo) # Success
         except ValueError:
             # Try parsing just the date part if time might be included
             try:
                 date_part = cleaned_date_str.split(',')[0].strip() # e.g., "Apr 12, 2025, ..."
                 if date_part != cleaned_date_str: # Check if splitting actually did something
-                    parsed_datetime = datetime.strptime(date_part, fmt)
-                    parsed_date = parsed_datetime.date()
-                    return parsed_date
+                    return to_ist(_strptime(date_part, fmt))
             except ValueError:
                 try:
                     date_part = cleaned_date_str.split('T')[0] # ISO Date part
                     if date_part != cleaned_date_str:
-                        parsed_datetime = datetime.strptime(date_part, "%Y-%m-%d")
-                        parsed_date = parsed_datetime.date()
-                        return parsed_date
+                        return to_ist(datetime.strptime(date_part, "%Y-%m-%d"))
                 except ValueError:
                     continue # Try next format
 
     # Fallback: Check if today's components are present (less reliable)
-    if not parsed_date:
-         year_str = str(today.year)
-         month_short = today.strftime("%b").lower()
-         month_long = today.strftime("%B").lower()
-         day_str = str(today.day)
-         # Check for day number with common separators/endings
-         if (year_str in cleaned_date_str_lower and
-             (month_short in cleaned_date_str_lower or month_long in cleaned_date_str_lower) and
-             (f" {day_str} " in cleaned_date_str_lower or
-              f" {day_str}," in cleaned_date_str_lower or
-              cleaned_date_str_lower.endswith(f" {day_str}"))):
-              print(f"[{site_name_context}] Warning: Fallback date match for '{original_date_str}'")
-              return today
+    year_str = str(today.year)
+    month_short = today.strftime("%b").lower()
+    month_long = today.strftime("%B").lower()
+    day_str = str(today.day)
+    # Check for day number with common separators/endings
+    if (year_str in cleaned_date_str_lower and
+        (month_short in cleaned_date_str_lower or month_long in cleaned_date_str_lower) and
+        (f" {day_str} " in cleaned_date_str_lower or
+         f" {day_str}," in cleaned_date_str_lower or
+         cleaned_date_str_lower.endswith(f" {day_str}"))):
+         print(f"[{site_name_context}] Warning: Fallback date match for '{original_date_str}'")
+         return datetime(today.year, today.month, today.day, tzinfo=IST)
 
     print(f"[{site_name_context}] Failed to parse date: '{original_date_str}' (Cleaned: '{cleaned_date_str}')")
     return None
 
-def fetch_html(url):
-    """Fetches HTML/XML content from a URL with error handling and content type check."""
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=20, stream=True)
-        response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+CHARSET_META_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+XML_ENCODING_RE = re.compile(rb"""<\?xml[^>]+encoding\s*=\s*["']([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
 
-        content_type = response.headers.get('content-type', '').lower()
-        if not ('html' in content_type or 'xml' in content_type or 'application/rss+xml' in content_type):
-            print(f"Warning: Non-HTML/XML content type '{content_type}' from {url}. Skipping.")
-            response.close()
-            return None
+def detect_charset(content_type, head):
+    """
+    Picks the charset for a body: a BOM wins, then the Content-Type header's charset, then a
+    <meta charset>/<?xml encoding?> declaration in the first bytes; UTF-8 otherwise.
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    candidates = []
+    if 'charset=' in content_type:
+        candidates.append(content_type.split('charset=', 1)[1].split(';')[0].strip().strip('"\''))
+    for pattern in (CHARSET_META_RE, XML_ENCODING_RE):
+        match = pattern.search(head[:CHARSET_SNIFF_BYTES])
+        if match:
+            candidates.append(match.group(1).decode('ascii', 'ignore'))
+    for charset in candidates:
+        try:
+            return codecs.lookup(charset).name
+        except LookupError:
+            continue # Unknown label; try the next source
+    return 'utf-8'
+
+_region_tests = {} # CSS selector -> compiled "does this element match" XPath (None if unsupported)
 
-        content = response.content # Read the content
-        response.close()
-        # Decode robustly, ignoring errors
-        return content.decode('utf-8', errors='ignore')
+def _region_test(selector):
+    """XPath testing whether an element itself matches a simple (combinator-free) CSS selector."""
+    if selector not in _region_tests:
+        test = None
+        try:
+            parsed = parse_css(selector)
+            if len(parsed) == 1 and not isinstance(parsed[0].parsed_tree, CombinedSelector):
+                test = etree.XPath(HTMLTranslator().css_to_xpath(selector, prefix='self::'))
+        except Exception as e: # cssselect SelectorError/ExpressionError
+            print(f"Warning: Can't watch for content region '{selector}': {e}")
+        _region_tests[selector] = test
+    return _region_tests[selector]
+
+class ContentRegionWatcher:
+    """
+    Follows a page as it streams in (lxml pull parser) and reports when the first element
+    matching `selector` has been closed, i.e. the rest of the page isn't needed for extraction.
+    Only simple selectors (no combinators) are watched; otherwise closed() never becomes True.
+    """
+    def __init__(self, selector):
+        self.test = _region_test(selector) if CSSSelector is not None and selector else None
+        self.parser = etree.HTMLPullParser(events=('end',)) if self.test is not None else None
+        self.closed = False
+
+    def feed(self, text):
+        """Feeds decoded text; returns True once the content region has closed."""
+        if self.parser is None or self.closed:
+            return self.closed
+        try:
+            self.parser.feed(text)
+            for _, element in self.parser.read_events():
+                # An enclosing element matching too would be the one select_one() picks
+                if self.test(element) and not any(self.test(a) for a in element.iterancestors()):
+                    self.closed = True
+                    break
+        except Exception as e:
+            print(f"Warning: Stopped watching content region ({e}); downloading the whole page.")
+            self.parser = None
+        return self.closed
+
+def read_body(response, stop_after=None):
+    """
+    Streams a response body, decoding it incrementally with the declared (or sniffed) charset.
+    Reading stops at MAX_BODY_BYTES and, if `stop_after` (a CSS selector) is given, as soon as
+    the element it matches has closed. Returns a dict with the text and byte counts.
+    After stopping, a remainder of up to EARLY_STOP_DRAIN_BYTES is read and discarded so the
+    connection can go back to the pool; a larger one is left for close() to drop with the
+    connection ("connection_dropped").
+    """
+    content_type = response.headers.get('content-type', '').lower()
+    watcher = ContentRegionWatcher(stop_after) if stop_after else None
+    decoder = None
+    head = b"" # Buffered until there is enough to sniff the charset
+    parts = []
+    body = {"text": "", "bytes_downloaded": 0, "bytes_used": 0, "stopped_early": False, "truncated": False,
+            "bytes_drained": 0, "connection_dropped": False}
+
+    def consume(data):
+        # Decode (and watch) in REGION_CHECK_BYTES pieces so an early stop wastes little
+        step = REGION_CHECK_BYTES if watcher is not None else len(data) or 1
+        for offset in range(0, len(data), step):
+            piece = data[offset:offset + step]
+            text = decoder.decode(piece)
+            parts.append(text)
+            body["bytes_used"] += len(piece)
+            if watcher is not None and watcher.feed(text):
+                body["stopped_early"] = True
+                return
+
+    chunks = response.iter_content(chunk_size=STREAM_CHUNK_BYTES)
+    for chunk in chunks:
+        if not chunk:
+            continue
+        remaining = MAX_BODY_BYTES - body["bytes_downloaded"]
+        if len(chunk) > remaining: # A body of exactly MAX_BODY_BYTES is complete, not truncated
+            chunk = chunk[:remaining]
+            body["truncated"] = True
+        body["bytes_downloaded"] += len(chunk)
+        if decoder is None:
+            head += chunk
+            if len(head) < CHARSET_SNIFF_BYTES and not body["truncated"]:
+                continue
+            chunk, head = head, b""
+            decoder = codecs.getincrementaldecoder(detect_charset(content_type, chunk))(errors='ignore')
+        consume(chunk)
+        if body["stopped_early"] or body["truncated"]:
+            _drain_body(response, chunks, body)
+            break
+
+    if decoder is None: # Body shorter than CHARSET_SNIFF_BYTES
+        decoder = codecs.getincrementaldecoder(detect_charset(content_type, head))(errors='ignore')
+        consume(head)
+    parts.append(decoder.decode(b"", final=True))
+    body["text"] = "".join(parts)
+    return body
+
+def _drain_body(response, chunks, body):
+    """Reads the rest of a body we stopped reading, if it is small enough, so the connection is reused."""
+    length = response.headers.get('content-length', '')
+    raw_read = getattr(response.raw, 'tell', None)
+    if length.isdigit() and raw_read is not None and int(length) - raw_read() > EARLY_STOP_DRAIN_BYTES:
+        body["connection_dropped"] = True # Known to be too big; don't download it just to keep the socket
+        return
+    for chunk in chunks:
+        body["bytes_drained"] += len(chunk)
+        if body["bytes_drained"] > EARLY_STOP_DRAIN_BYTES:
+            body["connection_dropped"] = True
+            return
+
+def fetch_html(url, validators=None, site_name=None, stop_after=None):
+    """
+    Fetches HTML/XML content from a URL with error handling and content type check.
+    With `validators` (a ValidatorCache) the request carries the URL's ETag/Last-Modified and
+    NOT_MODIFIED is returned if the server answers 304 (the caller can then skip parsing).
+    The body is streamed by read_body (size cap, charset detection, and an early stop once the
+    `stop_after` selector's element has closed); byte counts are recorded under `site_name`.
+    """
+    try:
+        site_label = site_name or urlparse(url).netloc
+        wait_start = time.perf_counter()
+        with FETCH_LIMITER.slot(url), RUN_TIMINGS.timer("fetch", site_label):
+            RUN_TIMINGS.record("fetch_wait", time.perf_counter() - wait_start, site_label) # Queued for a free slot
+            extra_headers = validators.conditional_headers(url) if validators is not None else {}
+            response = HTTP_POOL.get(url, headers=extra_headers, timeout=20, stream=True)
+            if validators is not None and response.status_code == 304:
+                response.close()
+                return NOT_MODIFIED
+            response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+
+            content_type = response.headers.get('content-type', '').lower()
+            if not ('html' in content_type or 'xml' in content_type or 'application/rss+xml' in content_type):
+                print(f"Warning: Non-HTML/XML content type '{content_type}' from {url}. Skipping.")
+                response.close()
+                return None
+
+            try:
+                body = read_body(response, stop_after)
+            finally:
+                response.close() # Returns the connection to the pool, or drops it if read_body left a large remainder
+            if body["truncated"]:
+                print(f"Warning: {url} is larger than {MAX_BODY_BYTES // 1024} KB; truncated.")
+            record_download(site_label, body)
+            if validators is not None:
+                validators.store_response(
+                    url, response.headers.get('ETag'), response.headers.get('Last-Modified'), body["bytes_downloaded"]
+                )
+        return body["text"]
 
     except requests.exceptions.Timeout:
         print(f"Timeout fetching {url}")
@@ -318,61 +1485,163 @@ def fetch_html(url):
         traceback.print_exc()
         return None
 
-def get_article_content(article_url, config):
-    """Fetches and extracts main article content using configured and fallback selectors."""
-    if not article_url:
-        return "Error: No URL provided for content fetching."
+# --- Compiled Selectors ---
+COMMON_CONTENT_SELECTORS = [ # Tried (in order) when a site's content_selector finds nothing
+    'div[itemprop="articleBody"]', 'div.article-body', 'div.story-body',
+    'div.entry-content', 'div.main-content', 'div.story_details',
+    'div.story-details', 'div.article-content', 'div#storybody',
+    'article', 'main', 'div[role="main"]',
+    'div.article-body-content', 'div.abp-story-detail', 'div._s30J.clearfix',
+    'div.article_content', 'div.content', 'div.story-data', 'div.inner-copy',
+    'div.articleBody' # Added from The Week config
+]
+LISTING_FALLBACK_SELECTOR = sv.compile('div[class*="item"], div[class*="post"], li[class*="item"], li[class*="post"]')
+
+class SelectorChain:
+    """
+    Comma-separated CSS selector alternatives, compiled once with soupsieve (and, on first
+    use against an lxml tree, with cssselect).
+    select_one() tries the alternative that matched last time first (each site has its own
+    chains, so this is a per-site "winning selector" memory), then the rest in config order.
+    """
+    def __init__(self, selectors, label=""):
+        if isinstance(selectors, str):
+            selectors = selectors.split(',')
+        self.compiled = []
+        for sel in selectors:
+            sel = sel.strip()
+            if not sel:
+                continue
+            try:
+                self.compiled.append((sel, sv.compile(sel)))
+            except sv.SelectorSyntaxError as e:
+                print(f"Warning: Ignoring invalid selector '{sel}'{f' ({label})' if label else ''}: {e}")
+        self._winner = 0 # Index into self.compiled
+        self._lxml_compiled = None # CSSSelector per alternative (None where cssselect can't translate it)
+
+    def __bool__(self):
+        return bool(self.compiled)
+
+    def _lxml_patterns(self):
+        if self._lxml_compiled is None:
+            patterns = []
+            for sel, _ in self.compiled:
+                try:
+                    patterns.append(CSSSelector(sel, translator='html'))
+                except Exception as e: # cssselect's SelectorError/ExpressionError
+                    print(f"Warning: Selector '{sel}' not supported by cssselect: {e}")
+                    patterns.append(None)
+            self._lxml_compiled = patterns
+        return self._lxml_compiled
+
+    def select_one(self, tag):
+        """
+        Returns (element, selector string) for the first alternative that matches, or (None, None).
+        `tag` may be a BeautifulSoup tag or an lxml element.
+        """
+        winner = self._winner
+        order = [winner] + [i for i in range(len(self.compiled)) if i != winner] if self.compiled else []
+        lxml_patterns = self._lxml_patterns() if isinstance(tag, etree._Element) else None
+        for index in order:
+            sel, pattern = self.compiled[index]
+            if lxml_patterns is not None:
+                matches = lxml_patterns[index](tag) if lxml_patterns[index] is not None else []
+                element = matches[0] if matches else None
+            else:
+                element = pattern.select_one(tag)
+            if element is not None:
+                self._winner = index
+                return element, sel
+        return None, None
+
+    def preferred(self):
+        """The selector string select_one() will try first (None if the chain is empty)."""
+        return self.compiled[self._winner][0] if self.compiled else None
+
+    def select(self, tag):
+        """All matches of every alternative, in config order (like calling select() for each)."""
+        elements = []
+        for sel, pattern in self.compiled:
+            elements.extend(pattern.select(tag))
+        return elements
+
+class SiteSelectors:
+    """The selector strings of one WEBSITES entry, compiled into SelectorChains."""
+    def __init__(self, config, label=""):
+        self.article = SelectorChain(config.get("article_selector", ""), label)
+        self.title = SelectorChain(config.get("title_selector", ""), label)
+        self.link = SelectorChain(config.get("link_selector", ""), label)
+        self.date = SelectorChain(config.get("date_selector", ""), label)
+        self.content = SelectorChain(config.get("content_selector", ""), label)
+        self.content_fallback = SelectorChain(COMMON_CONTENT_SELECTORS, label)
+        self.date_article = SelectorChain(config.get("date_selector_article", ""), label)
+
+_site_selectors = {} # id(config) -> (config, SiteSelectors); the config is kept so its id can't be reused
+_site_selectors_lock = threading.Lock()
+
+def selectors_for(config, label=""):
+    """Returns the compiled SiteSelectors for a site config dict, compiling it on first use."""
+    entry = _site_selectors.get(id(config))
+    if entry is None or entry[0] is not config:
+        with _site_selectors_lock:
+            entry = _site_selectors.get(id(config))
+            if entry is None or entry[0] is not config:
+                entry = (config, SiteSelectors(config, label))
+                _site_selectors[id(config)] = entry
+    return entry[1]
+
+def compile_site_selectors(websites):
+    """Compiles every site's selectors up front (invalid selectors are reported once, here)."""
+    for site_name, config in websites.items():
+        selectors_for(config, site_name)
+        if config.get("extractor") == "lxml" and CSSSelector is None:
+            print(f"Warning: {site_name} asks for the lxml extractor but cssselect is not installed; using BeautifulSoup.")
+
+def content_stop_selector(config):
+    """
+    The selector whose element, once closed, ends an article page download (see read_body):
+    the site's preferred content selector. select_one() tries it first, so if it matched the
+    extractor will use that same element. None disables the early stop.
+    """
+    if not STOP_AFTER_CONTENT_REGION or CSSSelector is None:
+        return None
+    return selectors_for(config).content.preferred()
 
-    # Ensure URL is absolute
-    base_url = config.get('url', article_url) # Use article_url itself as base if 'url' isn't in config (likely RSS)
-    try:
-        absolute_url = urljoin(base_url, article_url.strip())
-        if not absolute_url.startswith('http'):
-             print(f"Could not construct absolute URL from base '{base_url}' and relative '{article_url}'")
-             return "Error: Could not construct absolute URL."
-    except Exception as e:
-        print(f"Error joining base '{base_url}' and relative '{article_url}': {e}")
-        return "Error: Could not construct absolute URL."
+def extractor_for(config):
+    """The extraction engine for a site: 'lxml' if configured (and cssselect is available), else 'soup'."""
+    if config.get("extractor") == "lxml" and CSSSelector is not None:
+        return "lxml"
+    return "soup"
+
+def parse_article_page(html, config):
+    """Parses an article page for the site's extractor: an lxml tree, or a BeautifulSoup."""
+    if extractor_for(config) == "lxml":
+        try:
+            return lxml_html.document_fromstring(html)
+        except ValueError: # str input with an <?xml encoding=...?> declaration
+            return lxml_html.document_fromstring(html.encode('utf-8'))
+    return BeautifulSoup(html, 'lxml')
 
-    print(f"Fetching content from: {absolute_url}")
-    html = fetch_html(absolute_url)
-    if not html:
-        return "Error: Could not fetch article page."
+compile_site_selectors(WEBSITES)
 
+def extract_article_content(soup, config, absolute_url):
+    """Extracts main article content from an already-parsed article page."""
+    if isinstance(soup, etree._Element):
+        return extract_article_content_lxml(soup, config, absolute_url)
     try:
-        soup = BeautifulSoup(html, 'lxml')
-        content_area = None
-        used_selector = "N/A"
+        selectors = selectors_for(config)
 
         # Try primary selectors first
-        primary_selectors = config.get("content_selector", "").split(',')
-        for sel in primary_selectors:
-            sel = sel.strip()
-            if sel:
-                content_area = soup.select_one(sel)
-                if content_area:
-                    used_selector = sel
-                    print(f"Using primary selector '{sel}' for {absolute_url}")
-                    break
+        content_area, used_selector = selectors.content.select_one(soup)
+        if content_area:
+            print(f"Using primary selector '{used_selector}' for {absolute_url}")
 
         # Try common fallbacks if primary fails
         if not content_area:
             print(f"Primary selector(s) '{config.get('content_selector')}' failed for {absolute_url}. Trying fallbacks...")
-            common_selectors = [
-                'div[itemprop="articleBody"]', 'div.article-body', 'div.story-body',
-                'div.entry-content', 'div.main-content', 'div.story_details',
-                'div.story-details', 'div.article-content', 'div#storybody',
-                'article', 'main', 'div[role="main"]',
-                'div.article-body-content', 'div.abp-story-detail', 'div._s30J.clearfix',
-                'div.article_content', 'div.content', 'div.story-data', 'div.inner-copy',
-                'div.articleBody' # Added from The Week config
-            ]
-            for sel in common_selectors:
-                content_area = soup.select_one(sel)
-                if content_area:
-                    print(f"Using fallback selector '{sel}' for {absolute_url}")
-                    used_selector = sel
-                    break
+            content_area, used_selector = selectors.content_fallback.select_one(soup)
+            if content_area:
+                print(f"Using fallback selector '{used_selector}' for {absolute_url}")
 
         # Extract text if content area found
         if content_area:
@@ -417,13 +1686,332 @@ def get_article_content(article_url, config):
         traceback.print_exc()
         return f"Error: Parsing content failed ({e})"
 
+# --- lxml Extraction Engine ---
+FIGURE_TAGS = {'figure', 'figcaption', 'aside'} # Paragraphs under these may be captions
+NON_TEXT_TAGS = {'script', 'style', 'template', 'rt', 'rp'} # Strings inside these are skipped by get_text()
+
+def lxml_get_text(element, separator="", strip=False):
+    """
+    lxml equivalent of BeautifulSoup's get_text(): text nodes in document order, leaving out
+    comments and anything inside script/style/template/rt/rp, exactly as bs4 does.
+    """
+    if element.tag in NON_TEXT_TAGS or any(a.tag in NON_TEXT_TAGS for a in element.iterancestors()):
+        return ""
+    strings = []
+    hidden_depth = 0 # Open NON_TEXT_TAGS elements around the current node
+    for event, node in etree.iterwalk(element, events=('start', 'end', 'comment', 'pi')):
+        if event == 'start':
+            if node.tag in NON_TEXT_TAGS:
+                hidden_depth += 1
+            elif node.text is not None and not hidden_depth:
+                strings.append(node.text)
+            continue
+        if event == 'end' and node.tag in NON_TEXT_TAGS:
+            hidden_depth -= 1
+        # The tail of an element (or comment/PI) belongs to its parent
+        if node is not element and node.tail is not None and not hidden_depth:
+            strings.append(node.tail)
+    if strip:
+        strings = [text.strip() for text in strings]
+        strings = [text for text in strings if text]
+    return separator.join(strings)
+
+def _lxml_content_paragraphs(content_area):
+    """
+    The <p> elements extract_article_content would use, in one walk over the content area:
+    direct children if there are any, else all descendants. Yields (p, protected), where
+    `protected` means a figure/figcaption/aside sits between the paragraph and the area
+    (inclusive), which is what the BeautifulSoup extractor's find_parent check amounts to.
+    """
+    direct = [child for child in content_area if child.tag == 'p']
+    if direct:
+        protected = content_area.tag in FIGURE_TAGS
+        for p in direct:
+            yield p, protected
+        return
+    figure_depth = 0
+    for event, node in etree.iterwalk(content_area, events=('start', 'end')):
+        if event == 'start':
+            if node.tag == 'p' and node is not content_area:
+                yield node, figure_depth > 0
+            if node.tag in FIGURE_TAGS:
+                figure_depth += 1
+        elif node.tag in FIGURE_TAGS:
+            figure_depth -= 1
+
+def extract_article_content_lxml(root, config, absolute_url):
+    """
+    extract_article_content for lxml trees (sites with "extractor": "lxml"). Produces the same
+    output as the BeautifulSoup version, but filters the paragraphs in a single pass instead of
+    calling find_parent/find_parents for each one.
+    """
+    try:
+        selectors = selectors_for(config)
+
+        # Try primary selectors first
+        content_area, used_selector = selectors.content.select_one(root)
+        if content_area is not None:
+            print(f"Using primary selector '{used_selector}' for {absolute_url}")
+
+        # Try common fallbacks if primary fails
+        if content_area is None:
+            print(f"Primary selector(s) '{config.get('content_selector')}' failed for {absolute_url}. Trying fallbacks...")
+            content_area, used_selector = selectors.content_fallback.select_one(root)
+            if content_area is not None:
+                print(f"Using fallback selector '{used_selector}' for {absolute_url}")
+
+        if content_area is None:
+            return "Error: Could not find content area using any selectors."
+
+        # Paragraphs inside a figure/caption/aside that wraps the whole area are skipped
+        area_in_figure = any(ancestor.tag in FIGURE_TAGS for ancestor in content_area.iterancestors())
+
+        content_parts = []
+        for p, protected in _lxml_content_paragraphs(content_area):
+            if area_in_figure and not protected:
+                continue
+
+            text = lxml_get_text(p, " ", strip=True)
+
+            # Filter out short/irrelevant paragraphs
+            if text and len(text) > 40 and 'Advertisement' not in text and 'also read:' not in text.lower():
+                # Avoid paragraphs that are mostly just link text
+                link_text_len = sum(len(lxml_get_text(a, strip=True)) for a in p.iter('a'))
+                if len(text) - link_text_len > 20: # Require some non-link text
+                    content_parts.append(text)
+
+        content = "\n\n".join(content_parts)
+        if content:
+            return content
+        # Last resort: get all text from the content area
+        fallback_text = lxml_get_text(content_area, " ", strip=True)
+        if fallback_text and len(fallback_text) > 100:
+            print(f"Warning: Extracted content using get_text() fallback for {absolute_url}")
+            return fallback_text
+        return f"Warning: Content area found (selector: '{used_selector}'), but no suitable text extracted."
+
+    except Exception as e:
+        print(f"Error parsing content from {absolute_url}: {e}")
+        traceback.print_exc()
+        return f"Error: Parsing content failed ({e})"
+
+# --- Page Parsing (optionally in worker processes) ---
+
+_stable_configs = {} # site name -> the config dict selectors were compiled for (in this process)
+
+def _stable_config(site_name, config):
+    """
+    Maps a config to one long-lived dict per site, so configs unpickled in a worker process
+    (a new dict on every call) still share compiled selectors and winning-selector memory.
+    """
+    cached = _stable_configs.get(site_name)
+    if cached is config or cached == config:
+        return cached
+    _stable_configs[site_name] = config
+    return config
+
+def parse_listing_page(html, config, site_name, list_url):
+    """
+    Parses an HTML listing page and returns one dict (title, absolute link, listing date
+    string and parsed date) per article element, or None if no article elements were found.
+    Runs in a parse worker process when PARSE_POOL is enabled.
+    """
+    config = _stable_config(site_name, config)
+    soup = BeautifulSoup(html, 'lxml')
+
+    # Find article elements using configured selectors
+    selectors = selectors_for(config, site_name)
+    articles = selectors.article.select(soup)
+
+    # Basic fallback if primary selectors fail
+    if not articles:
+         print(f"Warning: Primary selectors failed for {site_name}. Trying fallbacks...")
+         articles = soup.find_all('article')
+         if not articles:
+             articles = LISTING_FALLBACK_SELECTOR.select(soup)
+         if not articles:
+             return None
+
+    print(f"[{site_name}] Found {len(articles)} potential article elements on listing page.")
+
+    items = []
+    for article_element in articles:
+        # Extract title, link, and potentially date from the listing item
+        title_element, _ = selectors.title.select_one(article_element)
+        link_element, _ = selectors.link.select_one(article_element)
+        date_element, _ = selectors.date.select_one(article_element)
+
+        title = safe_get_text(title_element)
+        link = safe_get_attr(link_element, 'href')
+
+        if not link or not title:
+            continue # Skip if essential info is missing
+
+        # Resolve link URL
+        try:
+            link = urljoin(list_url, link.strip())
+            if not link.startswith('http'):
+                print(f"[{site_name}] Skipping invalid link after join: {link}")
+                continue
+        except Exception as e:
+            print(f"[{site_name}] Error joining URL {link}: {e}")
+            continue
+
+        # Attempt to parse date from listing
+        article_date = None
+        date_str_listing = None
+        if date_element:
+             date_str_listing = safe_get_attr(date_element, 'datetime') or safe_get_text(date_element)
+             if date_str_listing:
+                 article_date = parse_datetime(date_str_listing, f"{site_name} (Listing)")
+
+        items.append({
+            'title': title,
+            'link': link,
+            'article_date': article_date,
+            'date_str_listing': date_str_listing,
+        })
+    return items
+
+def parse_article_fields(html, config, site_name, url, want_date=False, want_content=True):
+    """
+    Parses one article page and returns only what the pipeline needs: {"date", "content"}
+    (None unless asked for) plus "timings" (seconds spent parsing and extracting, see
+    record_parse_timings). Runs in a parse worker process when PARSE_POOL
+    is enabled, so just these strings cross the process boundary.
+    """
+    config = _stable_config(site_name, config)
+    fields = {"date": None, "content": None, "timings": {}}
+    parse_start = time.perf_counter()
+    try:
+        page = parse_article_page(html, config)
+        fields["timings"]["parse"] = time.perf_counter() - parse_start # lxml tree / BeautifulSoup construction
+    except Exception as e:
+        print(f"Error parsing content from {url}: {e}")
+        traceback.print_exc()
+        if want_content:
+            fields["content"] = f"Error: Parsing content failed ({e})"
+        return fields
+
+    if want_date:
+        date_element_article, _ = selectors_for(config, site_name).date_article.select_one(page)
+        if date_element_article is not None:
+            date_str_article = safe_get_attr(date_element_article, 'datetime') or \
+                               safe_get_attr(date_element_article, 'content') or \
+                               safe_get_text(date_element_article)
+            fields["date"] = parse_datetime(date_str_article, f"{site_name} (Article)")
+
+    if want_content:
+        extract_start = time.perf_counter()
+        fields["content"] = extract_article_content(page, config, url)
+        fields["timings"]["extract"] = time.perf_counter() - extract_start
+    return fields
+
+def record_parse_timings(fields, site_name):
+    """Adds the timings parse_article_fields measured (possibly in a worker process) to RUN_TIMINGS."""
+    for stage, seconds in fields.get("timings", {}).items():
+        RUN_TIMINGS.record(stage, seconds, site_name)
+
+class ParsePool:
+    """
+    Optional process pool for the CPU-bound part of scraping (tree building, selector
+    matching, text extraction), which otherwise serializes on the GIL across all fetch
+    threads. Fetch threads hand over the page text and get back only the extracted fields.
+    With 0 workers everything runs in the calling thread, as before.
+    """
+
+    def __init__(self, workers=0):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def configure(self, workers):
+        """Sets the number of worker processes (0 disables the pool); restarts it if it changes."""
+        with self._lock:
+            if workers == self.workers:
+                return
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            self.workers = workers
+
+    def _get_executor(self):
+        with self._lock:
+            if self.workers and self._executor is None:
+                # 'spawn' so workers don't inherit the scraper's threads and locks mid-flight
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def run(self, func, *args):
+        """Calls func(*args) in a worker process (or inline if the pool is disabled) and returns the result."""
+        executor = self._get_executor() if self.workers else None
+        if executor is None:
+            return func(*args)
+        try:
+            return executor.submit(func, *args).result()
+        except BrokenProcessPool as e:
+            print(f"Warning: Parse worker pool failed ({e}); parsing in-process from now on.")
+            self.configure(0)
+            return func(*args)
+
+    def shutdown(self):
+        """Stops the worker processes (they are started again on the next run())."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+PARSE_POOL = ParsePool(PARSE_WORKERS)
+
 # --- Sentiment Analysis ---
 
-def get_sentiment(text):
-    """Determines sentiment using Google Gemini API (Positive, Negative, Neutral)."""
-    if not google_api_key_configured:
-        return "API Key Missing"
+SENTIMENT_MODEL_NAME = 'gemini-1.5-flash-latest'
+SENTIMENT_LABELS = ["Positive", "Negative", "Neutral"]
+SENTIMENT_SAFETY_SETTINGS = [ # Allow most content, typical for news analysis
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+]
+SENTIMENT_BATCH_SIZE = 8 # Articles packed into one Gemini request
+SENTIMENT_BATCH_MAX_WAIT = 1.0 # Seconds to wait for a batch to fill before sending it anyway
+SENTIMENT_BATCH_ITEM_CHARS = 3000 # Per-article text limit inside a batched prompt
+SENTIMENT_QUEUE_SIZE = 200 # Articles waiting for analysis before submitters block (backpressure)
+SENTIMENT_MAX_CONCURRENT_CALLS = 4 # Gemini requests in flight at once
+LLM_REQUESTS_PER_MINUTE = 60 # Token-bucket limits for Gemini (match the project's quota)
+LLM_TOKENS_PER_MINUTE = 250000
+LLM_MAX_RETRIES = 4 # Retries for transient errors (429, 5xx, timeouts)
+LLM_BACKOFF_BASE = 1.0 # Seconds; doubled per attempt, with full jitter
+LLM_BACKOFF_MAX = 30.0
+
+_sentiment_model = None
+_sentiment_model_lock = threading.Lock()
+
+def get_sentiment_model():
+    """Returns the shared Gemini model object (created once, reused for every call)."""
+    global _sentiment_model
+    with _sentiment_model_lock:
+        if _sentiment_model is None:
+            _sentiment_model = genai.GenerativeModel(SENTIMENT_MODEL_NAME)
+        return _sentiment_model
+
+def _normalize_sentiment(raw):
+    """Maps a model answer to Positive/Negative/Neutral, or None if it isn't recognisable."""
+    sentiment = str(raw).strip().capitalize()
+    if sentiment in SENTIMENT_LABELS:
+        return sentiment
+    elif "positive" in sentiment.lower(): return "Positive"
+    elif "negative" in sentiment.lower(): return "Negative"
+    elif "neutral" in sentiment.lower(): return "Neutral"
+    return None
 
+def request_sentiment(text, model=None):
+    """
+    Single Gemini sentiment request. Returns Positive/Negative/Neutral, "Blocked" or
+    "Unknown"; API errors are raised so the caller can decide whether to retry.
+    """
     max_chars = 8000 # Limit input text length
     truncated_text = text[:max_chars]
 
@@ -436,103 +2024,1049 @@ def get_sentiment(text):
 
     Sentiment:"""
 
+    model = model or get_sentiment_model()
+    generation_config = genai.types.GenerationConfig(temperature=0, max_output_tokens=10)
+
+    response = model.generate_content(
+        prompt,
+        generation_config=generation_config,
+        safety_settings=SENTIMENT_SAFETY_SETTINGS
+    )
+
+    if not response.candidates:
+         print("Warning: Gemini response blocked or empty.")
+         try: print(f"Prompt Feedback: {response.prompt_feedback}")
+         except Exception: pass
+         return "Blocked"
+
+    # Validate and normalize response
+    sentiment = _normalize_sentiment(response.text)
+    if sentiment:
+        return sentiment
+    else:
+        print(f"Warning: Unexpected sentiment response: '{response.text.strip()}'")
+        return "Unknown"
+
+def _sentiment_error_label(error):
+    """Maps an exception from a Gemini call to the label stored for the article."""
+    if "API key not valid" in str(error) or "PermissionDenied" in str(error):
+        return "Auth Error"
+    return "API Error"
+
+def get_sentiments_batch(texts, model=None):
+    """
+    Determines sentiment for several articles with a single Gemini request.
+    Returns a list aligned with `texts`; an entry is None if that article's label
+    couldn't be parsed from the response (the scheduler then asks for it on its own).
+    Raises on API errors.
+    """
+    articles_block = "\n\n".join(
+        f'ARTICLE {i}:\n\"\"\"\n{text[:SENTIMENT_BATCH_ITEM_CHARS]}\n\"\"\"' for i, text in enumerate(texts)
+    )
+    prompt = f"""Analyze the sentiment of each of the following news articles regarding the main subject mentioned.
+Respond with only a JSON array containing one object per article, in order, like
+[{{"id": 0, "sentiment": "Positive"}}, {{"id": 1, "sentiment": "Neutral"}}]
+where sentiment is exactly one of: Positive, Negative, Neutral.
+
+{articles_block}
+
+JSON:"""
+
+    model = model or get_sentiment_model()
+    generation_config = genai.types.GenerationConfig(temperature=0, max_output_tokens=20 * len(texts) + 50)
+    response = model.generate_content(
+        prompt,
+        generation_config=generation_config,
+        safety_settings=SENTIMENT_SAFETY_SETTINGS
+    )
+    labels = [None] * len(texts)
+    if not response.candidates:
+        print("Warning: Gemini batch response blocked or empty.")
+        return labels
+
+    raw = response.text
     try:
-        model = genai.GenerativeModel('gemini-1.5-flash-latest')
-        generation_config = genai.types.GenerationConfig(temperature=0, max_output_tokens=10)
-        safety_settings=[ # Allow most content, typical for news analysis
-            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-        ]
+        parsed = json.loads(raw[raw.index('['):raw.rindex(']') + 1])
+    except ValueError:
+        print(f"Warning: Could not parse batched sentiment response: '{raw[:200]}'")
+        return labels
+
+    for position, item in enumerate(parsed):
+        if isinstance(item, dict):
+            index, label = item.get("id", position), item.get("sentiment")
+        else:
+            index, label = position, item # Tolerate a bare array of labels
+        if isinstance(index, int) and 0 <= index < len(texts):
+            labels[index] = _normalize_sentiment(label) if label is not None else None
+    return labels
 
-        response = model.generate_content(
-            prompt,
-            generation_config=generation_config,
-            safety_settings=safety_settings
-        )
+class SentimentCache:
+    """
+    Persistent sentiment cache in its own SQLite table, keyed by a hash of the normalized
+    article text so the same wire story republished by several sites (or re-scraped on a
+    later run) costs one Gemini call. Entries expire after `ttl_days` and the least recently
+    used ones are evicted once there are more than `max_entries`.
+    """
+
+    def __init__(self, db_path, ttl_days=SENTIMENT_CACHE_TTL_DAYS, max_entries=SENTIMENT_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_days * 24 * 3600
+        self.max_entries = max_entries
+        self._conn = None # Opened lazily on first use
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def text_key(text):
+        """Hash of the text with case, punctuation and whitespace differences removed."""
+        normalized = " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _connection(self):
+        """Returns the shared connection, creating the table on first use (caller holds the lock)."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS sentiment_cache (
+                    text_hash TEXT PRIMARY KEY,
+                    sentiment TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sentiment_cache_last_used ON sentiment_cache(last_used)")
+            self._conn.execute("DELETE FROM sentiment_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            self._conn.commit()
+        return self._conn
+
+    def get(self, text_key):
+        """Returns the cached label for `text_key`, or None on a miss (counted either way)."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT sentiment, created_at FROM sentiment_cache WHERE text_hash = ?", (text_key,)
+                ).fetchone()
+                now = time.time()
+                if row and now - row[1] <= self.ttl_seconds:
+                    conn.execute("UPDATE sentiment_cache SET last_used = ? WHERE text_hash = ?", (now, text_key))
+                    conn.commit()
+                    self.hits += 1
+                    return row[0]
+                self.misses += 1
+                return None
+        except sqlite3.Error as e:
+            print(f"Database Error (Sentiment cache read) at {self.db_path}: {e}")
+            return None
+
+    def put(self, text_key, sentiment):
+        """Stores a label, evicting least recently used entries when over capacity."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO sentiment_cache(text_hash, sentiment, created_at, last_used) VALUES(?,?,?,?)",
+                    (text_key, sentiment, now, now)
+                )
+                self._writes_since_evict += 1
+                if self._writes_since_evict >= 100: # Check the size now and then, not on every write
+                    self._writes_since_evict = 0
+                    conn.execute('''
+                        DELETE FROM sentiment_cache WHERE text_hash IN (
+                            SELECT text_hash FROM sentiment_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                        )
+                    ''', (self.max_entries,))
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Database Error (Sentiment cache write) at {self.db_path}: {e}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": (self.hits / lookups) if lookups else 0.0}
+
+SENTIMENT_CACHE = SentimentCache(SENTIMENT_CACHE_PATH)
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Takes `amount` tokens now and returns how many seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+            self._updated = now
+            self._tokens -= min(amount, self.capacity) # Oversized requests still get through eventually
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate_per_second
+
+TRANSIENT_LLM_ERRORS = ( # Rate-limit, server and timeout errors worth retrying
+    google_exceptions.TooManyRequests, # Includes ResourceExhausted
+    google_exceptions.InternalServerError, google_exceptions.BadGateway,
+    google_exceptions.ServiceUnavailable, google_exceptions.GatewayTimeout, # Includes DeadlineExceeded
+    TimeoutError, ConnectionError,
+)
+TRANSIENT_LLM_STATUS_CODES = {408, 429, 500, 502, 503, 504} # For other errors that carry an HTTP status in `.code`
+
+def _is_transient_llm_error(error):
+    """True for rate-limit/server/timeout errors worth retrying, judged by type or status code, never by message."""
+    if isinstance(error, TRANSIENT_LLM_ERRORS):
+        return True
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code in TRANSIENT_LLM_STATUS_CODES
 
-        if not response.candidates:
-             print("Warning: Gemini response blocked or empty.")
-             try: print(f"Prompt Feedback: {response.prompt_feedback}")
-             except Exception: pass
-             return "Blocked"
+def _estimate_tokens(text):
+    """Rough Gemini token count (about 4 characters per token) for rate limiting."""
+    return len(text) // 4 + 1
 
-        sentiment = response.text.strip().capitalize()
+class SentimentScheduler:
+    """
+    Central sentiment stage that all scraper workers submit to.
+    Requests wait in a bounded queue (submit blocks when it is full, so scraping can run
+    ahead of analysis but not without limit) and are answered by an asyncio dispatcher:
+    up to `batch_size` articles per Gemini request, sent when the batch is full or the oldest
+    request has waited `max_wait` seconds, with at most `max_concurrent_calls` requests in
+    flight. Every request is paced by request-per-minute and token-per-minute token buckets,
+    and transient failures are retried with jittered exponential backoff. Articles whose label
+    can't be parsed from a batched response are retried as single requests. If the dispatcher
+    fails unexpectedly, every request still waiting gets the exception (so no caller blocks
+    forever) and the next submit starts a new dispatcher.
+    `model_factory` returns the model client (swap in a fake one for testing).
+    With a `cache` (SentimentCache), known texts are answered without a request, and
+    identical texts already waiting for an answer share it.
+    """
 
-        # Validate and normalize response
-        if sentiment in ["Positive", "Negative", "Neutral"]:
-            return sentiment
-        elif "positive" in sentiment.lower(): return "Positive"
-        elif "negative" in sentiment.lower(): return "Negative"
-        elif "neutral" in sentiment.lower(): return "Neutral"
+    def __init__(self, batch_size=SENTIMENT_BATCH_SIZE, max_wait=SENTIMENT_BATCH_MAX_WAIT,
+                 model_factory=get_sentiment_model, cache=None, queue_size=SENTIMENT_QUEUE_SIZE,
+                 max_concurrent_calls=SENTIMENT_MAX_CONCURRENT_CALLS,
+                 requests_per_minute=LLM_REQUESTS_PER_MINUTE, tokens_per_minute=LLM_TOKENS_PER_MINUTE):
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.model_factory = model_factory
+        self.cache = cache
+        self.max_concurrent_calls = max_concurrent_calls
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self._pending_by_key = {} # text hash -> Future for requests already queued
+        self._unanswered = set() # Futures handed out and not resolved yet
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.articles_count = 0
+            self.api_calls = 0
+            self.fallback_calls = 0
+            self.retries = 0
+            self.first_request_time = None
+            self.last_result_time = None
+        if self.cache is not None:
+            self.cache.reset_stats()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sentiment-scheduler", daemon=True)
+                self._thread.start()
+
+    def submit(self, text):
+        """
+        Queues `text` for analysis and returns a Future resolving to its sentiment label.
+        Blocks only while the queue is full.
+        """
+        if not google_api_key_configured:
+            future = Future()
+            future.set_result("API Key Missing")
+            return future
+
+        text_key = None
+        if self.cache is not None:
+            text_key = SentimentCache.text_key(text)
+            cached = self.cache.get(text_key)
+            if cached:
+                future = Future()
+                future.set_result(cached)
+                return future
+
+        self._ensure_started()
+        with self._lock:
+            if self.first_request_time is None:
+                self.first_request_time = time.perf_counter()
+            future = self._pending_by_key.get(text_key) if text_key else None
+            if future is not None:
+                return future
+            future = Future()
+            if text_key:
+                self._pending_by_key[text_key] = future
+            self._unanswered.add(future)
+        self._queue.put((text, text_key, future)) # Outside the lock: may block on a full queue
+        return future
+
+    def analyze(self, text):
+        """Returns the sentiment label for `text`; blocks until it has been answered."""
+        return self.submit(text).result()
+
+    def _run(self):
+        stopped = threading.Event()
+        try:
+            asyncio.run(self._dispatch(stopped))
+        except Exception as e:
+            stopped.set()
+            print(f"Error: sentiment dispatcher stopped: {e}")
+            traceback.print_exc()
+            self._fail_unanswered(e)
+
+    def _resolve(self, future, text_key, label=None, error=None):
+        """Answers one request (unless it was already failed) and forgets it."""
+        with self._lock:
+            self._unanswered.discard(future)
+            if text_key and self._pending_by_key.get(text_key) is future:
+                del self._pending_by_key[text_key]
+        if future.done():
+            return
+        if error is None:
+            future.set_result(label)
         else:
-            print(f"Warning: Unexpected sentiment response: '{sentiment}'")
-            return "Unknown"
+            future.set_exception(error)
 
-    except Exception as e:
-        print(f"Error getting sentiment from Google Gemini: {e}")
-        traceback.print_exc()
-        if "API key not valid" in str(e) or "PermissionDenied" in str(e):
-            return "Auth Error"
-        return "API Error"
+    def _fail_unanswered(self, error):
+        """Fails every request still waiting for an answer, including those not yet dispatched."""
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            futures = list(self._unanswered)
+            self._unanswered.clear()
+            self._pending_by_key.clear()
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def _feed(self, loop, ready, stopped):
+        """Moves submitted requests onto the event loop, blocking while the dispatcher is saturated."""
+        while True:
+            item = self._queue.get()
+            if stopped.is_set(): # Our dispatcher died: leave the request to its replacement
+                self._queue.put(item)
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(ready.put(item), loop).result()
+            except Exception: # Loop closed under us; _fail_unanswered() has failed the request
+                return
 
-# --- Core Scraping Logic ---
+    def _batch_done(self, task, batch, call_slots):
+        call_slots.release()
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error answering a sentiment batch: {task.exception()}")
+            for _, text_key, future in batch:
+                self._resolve(future, text_key, error=task.exception())
+
+    async def _dispatch(self, stopped):
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Queue(maxsize=self.batch_size)
+        threading.Thread(target=self._feed, args=(loop, ready, stopped), name="sentiment-feeder", daemon=True).start()
+        call_slots = asyncio.Semaphore(self.max_concurrent_calls)
+        while True:
+            batch = [await ready.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(ready.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await call_slots.acquire()
+            task = loop.create_task(self._answer_batch(batch))
+            task.add_done_callback(lambda task, batch=batch: self._batch_done(task, batch, call_slots))
+
+    async def _call_llm(self, func, *args, estimated_tokens):
+        """Runs a blocking Gemini call under the rate limits, retrying transient errors."""
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            wait = max(self.request_bucket.reserve(1), self.token_bucket.reserve(estimated_tokens))
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                with self._lock:
+                    self.api_calls += 1
+                with RUN_TIMINGS.timer("sentiment_api"):
+                    return await asyncio.to_thread(func, *args)
+            except Exception as e:
+                if attempt == LLM_MAX_RETRIES or not _is_transient_llm_error(e):
+                    raise
+                delay = random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+                with self._lock:
+                    self.retries += 1
+                print(f"Transient Gemini error ({e}); retry {attempt + 1}/{LLM_MAX_RETRIES} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _answer_batch(self, batch):
+        texts = [text for text, _, _ in batch]
+        model = None
+        labels = [None] * len(texts)
+        try:
+            model = self.model_factory()
+            if len(texts) > 1:
+                estimated = sum(_estimate_tokens(t[:SENTIMENT_BATCH_ITEM_CHARS]) for t in texts) + 20 * len(texts)
+                labels = await self._call_llm(get_sentiments_batch, texts, model, estimated_tokens=estimated)
+        except Exception as e:
+            print(f"Error getting batched sentiment from Google Gemini: {e}. Falling back to single calls.")
+
+        fallback_calls = 0
+        for i, (text, text_key, future) in enumerate(batch):
+            label = labels[i]
+            if label is None:
+                fallback_calls += 1
+                try:
+                    label = await self._call_llm(request_sentiment, text, model, estimated_tokens=_estimate_tokens(text[:8000]))
+                except Exception as e:
+                    print(f"Error getting sentiment from Google Gemini: {e}")
+                    label = _sentiment_error_label(e)
+            if text_key and self.cache is not None and label in SENTIMENT_LABELS:
+                self.cache.put(text_key, label) # Only real labels; errors are retried next time
+            self._resolve(future, text_key, label)
+
+        with self._lock:
+            self.articles_count += len(batch)
+            self.fallback_calls += fallback_calls
+            self.last_result_time = time.perf_counter()
+
+    def stats(self):
+        """Throughput (articles/s) and API calls per article since the last reset."""
+        with self._lock:
+            elapsed = 0.0
+            if self.first_request_time is not None and self.last_result_time is not None:
+                elapsed = self.last_result_time - self.first_request_time
+            return {
+                "articles": self.articles_count,
+                "api_calls": self.api_calls,
+                "fallback_calls": self.fallback_calls,
+                "retries": self.retries,
+                "queued": self._queue.qsize(),
+                "articles_per_second": (self.articles_count / elapsed) if elapsed > 0 else 0.0,
+                "calls_per_article": (self.api_calls / self.articles_count) if self.articles_count else 0.0,
+            }
 
-def _process_article(article_info, config, results_queue):
-    """Fetches content, gets sentiment, and queues the result if it matches the filter."""
-    title = article_info['title']
-    link = article_info['link']
-    article_date = article_info['article_date']
-    site_name = article_info['site_name']
+SENTIMENT_SCHEDULER = SentimentScheduler(cache=SENTIMENT_CACHE)
 
-    content = "Content not fetched."
-    sentiment = "Not Analyzed"
+def format_sentiment_stats():
+    """One-line summary of sentiment throughput for the log."""
+    stats = SENTIMENT_SCHEDULER.stats()
+    cache_stats = SENTIMENT_CACHE.stats()
+    return (f"Sentiment: {stats['articles']} articles, {stats['api_calls']} API calls "
+            f"({stats['calls_per_article']:.2f} per article, {stats['fallback_calls']} single-call fallbacks, {stats['retries']} retries), "
+            f"{stats['articles_per_second']:.2f} articles/s; cache {cache_stats['hits']} hits / "
+            f"{cache_stats['misses']} misses ({cache_stats['hit_ratio']:.0%})")
 
-    if config.get("content_fetch"):
-        time.sleep(0.2) # Politeness delay
-        content = get_article_content(link, config)
+# --- Keyword Matching ---
 
-    # Filter by search term in title or content
-    title_lower = title.lower()
-    content_lower = content.lower()
+def normalize_match_text(text):
+    """Lowercases text and collapses whitespace runs, so terms and phrases match across line breaks."""
+    return " ".join(text.lower().split())
 
-    if SEARCH_TERM in title_lower or SEARCH_TERM in content_lower:
-        # Get sentiment if content was fetched successfully
-        if not content.startswith("Error:") and not content.startswith("Warning:") and content != "Content not fetched.":
-            print(f"[{site_name}] Getting sentiment for: {title[:50]}...")
-            text_for_sentiment = f"Title: {title}\n\nContent: {content}"
-            sentiment = get_sentiment(text_for_sentiment)
-            time.sleep(0.5) # Delay after API call
-        else:
-            sentiment = "No Content" # Indicate content fetching issue
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
 
-        # Prepare and queue the final result
-        result = {
-            "title": title,
-            "date": article_date.strftime("%Y-%m-%d"),
-            "sentiment": sentiment,
-            "content": content,
-            "source": site_name,
-            "url": link
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of terms. scan() reports every term that occurs as a
+    whole word/phrase in one left-to-right pass over the text, however many terms there are.
+    """
+
+    def __init__(self, terms):
+        self.terms = sorted({normalize_match_text(term) for term in terms if term.strip()})
+        self._goto = [{}] # state -> {char: next state}
+        self._fail = [0]
+        self._output = [()] # state -> ((term index, term length), ...) ending here
+        for index, term in enumerate(self.terms):
+            state = 0
+            for char in term:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += ((index, len(term)),)
+        # Breadth-first: each state's failure link is the longest proper suffix that is also a prefix
+        pending = list(self._goto[0].values())
+        for state in pending: # Grows while iterating
+            for char, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+                pending.append(next_state)
+
+    def scan(self, text):
+        """The set of terms found in `text` (already normalized) at word boundaries."""
+        goto, fail, output, terms = self._goto, self._fail, self._output, self.terms
+        found = set()
+        state = 0
+        last = len(text) - 1
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for index, length in output[state]:
+                    term = terms[index]
+                    start = position - length + 1
+                    # Whole words only: no word character may continue the term on either side
+                    if _is_word_char(term[0]) and start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    if _is_word_char(term[-1]) and position < last and _is_word_char(text[position + 1]):
+                        continue
+                    found.add(term)
+        return found
+
+class WatchlistMatcher:
+    """Compiled WATCHLISTS: one KeywordMatcher over all their terms plus each rule's boolean test."""
+
+    def __init__(self, watchlists):
+        self.rules = [] # (tag, any terms, all terms, not terms)
+        terms = set()
+        for watchlist, rules in watchlists.items():
+            for rule_name, rule in rules.items():
+                any_terms, all_terms, not_terms = (
+                    frozenset(normalize_match_text(term) for term in rule.get(key, ())) for key in ("any", "all", "not")
+                )
+                if not any_terms and not all_terms:
+                    raise ValueError(f"Watchlist rule {watchlist}/{rule_name} needs 'any' or 'all' terms")
+                self.rules.append((f"{watchlist}/{rule_name}", any_terms, all_terms, not_terms))
+                terms |= any_terms | all_terms | not_terms
+        self.keywords = KeywordMatcher(terms)
+
+    def terms_in(self, *texts):
+        """Set of watchlist terms occurring in any of the texts."""
+        found = set()
+        for text in texts:
+            if text:
+                found |= self.keywords.scan(normalize_match_text(text))
+        return found
+
+    def match(self, *texts):
+        """Tags of the rules hit by the given texts taken together (empty list: no match)."""
+        return self.rules_hit(self.terms_in(*texts))
+
+    def rules_hit(self, found):
+        """Tags of the rules satisfied by a set of found terms."""
+        if not found:
+            return []
+        return [
+            tag for tag, any_terms, all_terms, not_terms in self.rules
+            if (not any_terms or any_terms & found) and all_terms <= found and not not_terms & found
+        ]
+
+WATCHLIST_MATCHER = WatchlistMatcher(WATCHLISTS)
+
+# --- Near-Duplicate Clustering ---
+# Wire copy (PTI/ANI) is republished nearly verbatim by several sites. Each article's text is
+# reduced to a MinHash signature of its word shingles; banded LSH buckets find the few earlier
+# articles that could be the same story without comparing against every one of them.
+_MINHASH_PRIME = (1 << 61) - 1
+_minhash_rng = random.Random(20240601) # Fixed seed: signatures stored in the archive must stay comparable
+MINHASH_COEFFICIENTS = [
+    (_minhash_rng.randrange(1, _MINHASH_PRIME), _minhash_rng.randrange(0, _MINHASH_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+_MINHASH_STRUCT = struct.Struct(f"<{MINHASH_PERMUTATIONS}Q")
+
+def story_cluster_id(url):
+    """Cluster id for a story whose first (canonical) copy is at `url`."""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+def minhash_signature(text, shingle_words=MINHASH_SHINGLE_WORDS):
+    """
+    MinHash signature (tuple of MINHASH_PERMUTATIONS ints) of the text's word shingles, ignoring
+    case and punctuation; None if the text has fewer than NEAR_DUPLICATE_MIN_WORDS words.
+    """
+    words = re.sub(r"[^\w\s]", " ", text.lower()).split()
+    if len(words) < max(NEAR_DUPLICATE_MIN_WORDS, shingle_words):
+        return None
+    shingles = {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + shingle_words]).encode("utf-8"), digest_size=8).digest(), "little")
+        for i in range(len(words) - shingle_words + 1)
+    }
+    return tuple(min((a * shingle + b) % _MINHASH_PRIME for shingle in shingles) for a, b in MINHASH_COEFFICIENTS)
+
+def _text_hash(text):
+    """Hash of an article text with whitespace normalized (tells exact copies apart from near-duplicates)."""
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+def pack_signature(signature):
+    return _MINHASH_STRUCT.pack(*signature)
+
+def unpack_signature(blob):
+    return _MINHASH_STRUCT.unpack(blob) if blob and len(blob) == _MINHASH_STRUCT.size else None
+
+def signature_similarity(a, b):
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+class NearDuplicateIndex:
+    """
+    LSH index of this run's articles plus recently archived ones. assign() puts each new article
+    in a story cluster: the first copy of a story is canonical and gets a real sentiment call,
+    later near-duplicates share its sentiment (a Future, or the archived label) and cluster_id.
+    Counts the sentiment requests and stored text this saves; only exact copies of a text
+    already in the cluster can have their text dropped (near-duplicates may differ by ~30%).
+    """
+
+    def __init__(self, bands=LSH_BANDS, threshold=NEAR_DUPLICATE_THRESHOLD):
+        self.bands = bands
+        self.rows = MINHASH_PERMUTATIONS // bands
+        self.threshold = threshold
+        self._buckets = [{} for _ in range(bands)] # band -> {band values: [member index]}
+        self._members = [] # (signature, cluster_id)
+        self._sentiments = {} # cluster_id -> Future resolving to the canonical copy's label
+        self._text_hashes = {} # cluster_id -> hashes of the (whitespace-normalized) texts stored in it
+        self._lock = threading.Lock()
+        self.archived_count = 0
+        self.duplicates = self.archive_duplicates = 0
+        self.candidates_compared = 0
+        self.sentiment_calls_saved = 0
+        self.bytes_saved = 0
+
+    @classmethod
+    def from_db(cls, db_path, days=NEAR_DUPLICATE_ARCHIVE_DAYS):
+        """Index of the articles archived in the last `days` days (empty if the DB doesn't exist yet)."""
+        index = cls()
+        if not db_path or not os.path.exists(db_path):
+            return index
+        since = int(time.time() - days * 86400)
+        try:
+            with sqlite3.connect(db_path) as conn:
+                rows = conn.execute(
+                    "SELECT url, content, sentiment, cluster_id, minhash FROM articles WHERE published_at >= ?", (since,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Database Error (Near-duplicate index) at {db_path}: {e}. Archive not matched against.")
+            return index
+        for url, content, sentiment, cluster_id, minhash in rows:
+            signature = unpack_signature(minhash) or (minhash_signature(content) if content else None)
+            if signature is None:
+                continue
+            cluster_id = cluster_id or story_cluster_id(url)
+            index._add(signature, cluster_id)
+            if content:
+                index._text_hashes.setdefault(cluster_id, set()).add(_text_hash(content))
+            # Only real labels are shared: an "API Error"/"API Key Missing" copy mustn't spread to new ones
+            if sentiment in SENTIMENT_LABELS and cluster_id not in index._sentiments:
+                future = Future()
+                future.set_result(sentiment)
+                index._sentiments[cluster_id] = future
+            index.archived_count += 1
+        return index
+
+    def _band_keys(self, signature):
+        return [tuple(signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _add(self, signature, cluster_id, band_keys=None):
+        member = len(self._members)
+        self._members.append((signature, cluster_id))
+        for band, key in enumerate(band_keys or self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(member)
+
+    def assign(self, url, text):
+        """
+        Clusters one article. Returns a dict with "cluster_id", "minhash" (packed signature or
+        None), "canonical" (True for the first copy of a story), "exact" (True if the cluster
+        already holds this very text) and "sentiment" (for a duplicate, a Future with the
+        canonical copy's label; for a canonical copy, pass its own sentiment Future to resolve()).
+        """
+        signature = minhash_signature(text) # Outside the lock: the expensive part
+        if signature is None:
+            return {"cluster_id": story_cluster_id(url), "minhash": None, "canonical": True, "exact": False,
+                    "sentiment": None}
+        text_hash = _text_hash(text)
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(band_keys):
+                candidates.update(self._buckets[band].get(key, ()))
+            self.candidates_compared += len(candidates)
+            best, best_similarity = None, self.threshold
+            for member in candidates:
+                similarity = signature_similarity(signature, self._members[member][0])
+                if similarity >= best_similarity:
+                    best, best_similarity = member, similarity
+            if best is None:
+                cluster_id = story_cluster_id(url)
+                self._sentiments[cluster_id] = Future()
+                canonical = True
+            elif self._members[best][1] not in self._sentiments:
+                # Same story as an archived copy without a usable label: this copy asks for its own
+                cluster_id = self._members[best][1]
+                self._sentiments[cluster_id] = Future()
+                canonical = True
+                self.duplicates += 1
+                self.archive_duplicates += 1
+            else:
+                cluster_id = self._members[best][1]
+                canonical = False
+                self.duplicates += 1
+                if best < self.archived_count:
+                    self.archive_duplicates += 1
+                self.sentiment_calls_saved += 1
+            hashes = self._text_hashes.setdefault(cluster_id, set())
+            exact = text_hash in hashes
+            if exact and not STORE_DUPLICATE_CONTENT:
+                self.bytes_saved += len(text.encode("utf-8"))
+            hashes.add(text_hash)
+            self._add(signature, cluster_id, band_keys)
+            return {"cluster_id": cluster_id, "minhash": pack_signature(signature), "canonical": canonical,
+                    "exact": exact, "sentiment": self._sentiments[cluster_id]}
+
+    def resolve(self, story, sentiment_future):
+        """Passes a canonical copy's sentiment on to the duplicates waiting for it."""
+        shared = story["sentiment"]
+        if shared is None:
+            return
+
+        def _copy(finished):
+            if shared.done():
+                return
+            if finished.exception() is not None:
+                shared.set_exception(finished.exception())
+            else:
+                shared.set_result(finished.result())
+
+        sentiment_future.add_done_callback(_copy)
+
+    def summary(self):
+        """One line describing what clustering saved this run."""
+        return (f"Near-duplicates: {self.duplicates} articles joined existing stories "
+                f"({self.archive_duplicates} matched the archive of {self.archived_count}); "
+                f"saved {self.sentiment_calls_saved} sentiment requests and "
+                f"{self.bytes_saved / 1024:.1f} KB of stored text")
+
+# --- RSS Pre-filter ---
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+def feed_entry_text(entry):
+    """Title, summary/description (tags stripped) and category terms of a feedparser entry."""
+    summary = html_module.unescape(HTML_TAG_RE.sub(" ", entry.get('summary', '') or entry.get('description', '') or ''))
+    categories = " ; ".join(tag.get('term', '') for tag in entry.get('tags', ()) if tag.get('term'))
+    return entry.get('title', ''), summary, categories
+
+def prefilter_feed_entry(title, summary, categories):
+    """
+    Decides from feed text alone whether an item can match the watchlists: "hit" (a rule already
+    matches), "borderline" (some watchlist term occurs, or the text is too short to rule the item
+    out) or "skip" (nothing suggests a match, so the full page needn't be fetched).
+    """
+    found = WATCHLIST_MATCHER.terms_in(title, summary, categories)
+    if WATCHLIST_MATCHER.rules_hit(found):
+        return "hit"
+    if found or len(f"{title} {summary}".split()) < PREFILTER_MIN_WORDS:
+        return "borderline"
+    return "skip"
+
+# --- Run Instrumentation ---
+# Latency samples per stage and site for the current run, summarized into a JSON report.
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-len(sorted_values) * fraction // 1)) # ceil(n * fraction), at least 1
+    return sorted_values[int(rank) - 1]
+
+class RunTimings:
+    """
+    Thread-safe latency recorder. Stages are timed with `with RUN_TIMINGS.timer("fetch", site):`
+    (or record() for durations measured elsewhere, e.g. in a parse worker process). report()
+    summarizes each stage, overall and per site: count, total, mean, p50/p95/p99, max and a
+    histogram over PERF_HISTOGRAM_BUCKETS_MS. A sample that served several sites (e.g. one
+    database batch) is counted once overall and once under each of them.
+    """
+
+    def __init__(self):
+        self._samples = {} # stage -> [seconds]
+        self._site_samples = {} # (stage, site) -> [seconds]
+        self._lock = threading.Lock()
+        self.started_at = now_ist()
+        self._started = time.perf_counter()
+
+    def reset(self):
+        """Drops all samples and restarts the run clock (called at the start of each run)."""
+        with self._lock:
+            self._samples.clear()
+            self._site_samples.clear()
+            self.started_at = now_ist()
+            self._started = time.perf_counter()
+
+    def record(self, stage, seconds, site=None):
+        """Adds one sample for `stage`; `site` is a site name, a collection of them, or None."""
+        sites = (site,) if isinstance(site, str) else (site or ())
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+            for name in sites:
+                self._site_samples.setdefault((stage, name), []).append(seconds)
+
+    @contextmanager
+    def timer(self, stage, site=None):
+        """Records how long the `with` block took under `stage` (and `site`, see record()), even if it raised."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, site)
+
+    @staticmethod
+    def _summarize(samples):
+        ordered = sorted(samples)
+        histogram = {f"<={bound}ms": 0 for bound in PERF_HISTOGRAM_BUCKETS_MS}
+        histogram[f">{PERF_HISTOGRAM_BUCKETS_MS[-1]}ms"] = 0
+        for seconds in ordered:
+            for bound in PERF_HISTOGRAM_BUCKETS_MS:
+                if seconds * 1000 <= bound:
+                    histogram[f"<={bound}ms"] += 1
+                    break
+            else:
+                histogram[f">{PERF_HISTOGRAM_BUCKETS_MS[-1]}ms"] += 1
+        return {
+            "count": len(ordered),
+            "total_s": round(sum(ordered), 4),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+            "p50_ms": round(_percentile(ordered, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+            "histogram": histogram,
         }
-        results_queue.put(result)
-        return True # Indicates article matched filter and was processed
-    else:
-        # print(f"[{site_name}] Skipping article (filter mismatch): {title[:50]}...") # Optional logging
-        return False # Indicates article did not match filter
 
-def _scrape_rss_feed(site_name, config, today_date, results_queue, processed_links):
-    """Scrapes articles from an RSS feed."""
+    def report(self, **run_info):
+        """The run's timing report as a JSON-ready dict; `run_info` is added under "run"."""
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self._samples.items()}
+            site_samples = {key: list(values) for key, values in self._site_samples.items()}
+            started_at, elapsed = self.started_at, time.perf_counter() - self._started
+        stages = {}
+        for stage in sorted(samples):
+            summary = self._summarize(samples[stage])
+            summary["sites"] = {
+                site: self._summarize(values)
+                for (name, site), values in sorted(site_samples.items())
+                if name == stage
+            }
+            stages[stage] = summary
+        run = {"started_at": started_at.isoformat(), "duration_s": round(elapsed, 2)}
+        run.update(run_info)
+        return {"run": run, "stages": stages}
+
+RUN_TIMINGS = RunTimings()
+
+def write_perf_report(report, report_dir=None):
+    """
+    Writes `report` (see RunTimings.report) to a timestamped JSON file in `report_dir`
+    (PERF_REPORT_DIR by default), keeping the newest PERF_REPORTS_KEPT. Returns the path, or
+    None if reports are disabled or the file could not be written.
+    """
+    report_dir = PERF_REPORT_DIR if report_dir is None else report_dir
+    if not report_dir:
+        return None
+    try:
+        os.makedirs(report_dir, exist_ok=True)
+        stamp = f"{now_ist():%Y%m%d-%H%M%S-%f}"[:-3] # Millisecond resolution
+        for attempt in range(100): # Counter keeps runs finishing in the same millisecond apart, in order
+            path = os.path.join(report_dir, f"run-{stamp}-{attempt:02d}.json")
+            try:
+                f = open(path, "x", encoding="utf-8")
+                break
+            except FileExistsError:
+                continue
+        else:
+            raise OSError(f"no free report file name for {stamp}")
+        with f:
+            json.dump(report, f, indent=2)
+        old_reports = sorted(name for name in os.listdir(report_dir) if name.startswith("run-") and name.endswith(".json"))
+        for name in old_reports[:-PERF_REPORTS_KEPT]:
+            os.remove(os.path.join(report_dir, name))
+        return path
+    except OSError as e:
+        print(f"Error writing performance report to {report_dir}: {e}")
+        return None
+
+def format_perf_report(report):
+    """Text table of a timing report: one line per stage, then one per site under it."""
+    lines = [f"Run started {format_article_date(report['run']['started_at'])}, took {report['run']['duration_s']:.1f}s",
+             f"{'stage / site':<32} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'total s':>8}"]
+    for stage, summary in report["stages"].items():
+        rows = [(stage, summary)] + [(f"  {site}", site_summary) for site, site_summary in summary["sites"].items()]
+        for label, entry in rows:
+            lines.append(f"{label[:32]:<32} {entry['count']:>6} {entry['p50_ms']:>9.1f} {entry['p95_ms']:>9.1f} "
+                         f"{entry['p99_ms']:>9.1f} {entry['max_ms']:>9.1f} {entry['total_s']:>8.2f}")
+    return lines
+
+# --- Staged Pipeline ---
+
+class PipelineStage:
+    """One pipeline stage: `workers` threads taking items from a bounded input queue."""
+
+    def __init__(self, name, handler, workers, queue_size, fan_out=False):
+        self.name = name
+        self.handler = handler # item -> next item, or None to drop it (a list of items with fan_out)
+        self.workers = max(1, workers)
+        self.fan_out = fan_out
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.busy = 0
+        self._live_workers = 0
+        self._lock = threading.Lock()
+
+class Pipeline:
+    """
+    Stages connected by bounded queues, each with its own worker threads. A worker blocks while
+    the next stage's queue is full, so a slow stage holds back the stages before it instead of
+    letting work pile up in memory. Items a handler drops (returns None) or fails on are passed
+    to on_drop(stage_name, item, error); items that leave the last stage to on_done(item).
+    """
+
+    _STOP = object()
+
+    def __init__(self, stages, on_drop=None, on_done=None):
+        self.stages = stages
+        self.on_drop = on_drop
+        self.on_done = on_done
+        self._threads = []
+        self._last_sample = None # (time, [processed per stage]) for the live rates
+
+    def start(self):
+        self._last_sample = (time.monotonic(), [0] * len(self.stages))
+        for index, stage in enumerate(self.stages):
+            stage._live_workers = stage.workers
+            for number in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(index,), name=f"{stage.name}-{number}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def put(self, item):
+        """Feeds an item to the first stage (blocks while its queue is full)."""
+        self.stages[0].queue.put(item)
+
+    def close(self):
+        """Declares the input finished and waits until every stage has drained."""
+        for _ in range(self.stages[0].workers):
+            self.stages[0].queue.put(self._STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def is_alive(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _work(self, index):
+        stage = self.stages[index]
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            item = stage.queue.get()
+            if item is self._STOP:
+                with stage._lock:
+                    stage._live_workers -= 1
+                    last_worker = stage._live_workers == 0
+                if last_worker and next_stage is not None: # Upstream is done: stop the next stage too
+                    for _ in range(next_stage.workers):
+                        next_stage.queue.put(self._STOP)
+                return
+            with stage._lock:
+                stage.busy += 1
+            try:
+                output = stage.handler(item)
+                error = None
+            except Exception as e:
+                output, error = None, e
+            with stage._lock:
+                stage.busy -= 1
+                stage.processed += 1
+            outputs = (output or []) if stage.fan_out else ([] if output is None else [output])
+            if error is not None or (output is None and not stage.fan_out):
+                if self.on_drop:
+                    self.on_drop(stage.name, item, error)
+                continue
+            for out in outputs:
+                if next_stage is not None:
+                    next_stage.queue.put(out) # Blocks while the next stage is saturated (backpressure)
+                elif self.on_done:
+                    self.on_done(out)
+
+    def snapshot(self):
+        """Per stage: (name, queued, queue size, busy workers, workers, items/s since the last snapshot)."""
+        now = time.monotonic()
+        last_time, last_counts = self._last_sample or (now, [0] * len(self.stages))
+        counts = [stage.processed for stage in self.stages]
+        elapsed = max(now - last_time, 1e-6)
+        self._last_sample = (now, counts)
+        return [
+            (stage.name, stage.queue.qsize(), stage.queue.maxsize, stage.busy, stage.workers,
+             (count - last_count) / elapsed)
+            for stage, count, last_count in zip(self.stages, counts, last_counts)
+        ]
+
+    def format_status(self):
+        """One-line live view: queue depth, busy workers and throughput per stage."""
+        return " | ".join(
+            f"{name} {queued}/{size} q, {busy}/{workers} busy, {rate:.1f}/s"
+            for name, queued, size, busy, workers, rate in self.snapshot()
+        )
+
+# --- Core Scraping Logic ---
+
+def _report_not_modified(site_name, kind, url, results_queue, validators):
+    """Logs a 304 for a feed/listing page together with what it saved."""
+    bytes_saved, parse_saved = validators.record_not_modified(url)
+    increment_stat("not_modified_responses")
+    increment_stat("not_modified_bytes_saved", bytes_saved)
+    totals = validators.metrics(url)
+    print(f"[{site_name}] {kind} not modified (304); skipped download and parsing.")
+    results_queue.put(
+        f"--- {kind} unchanged for {site_name} (304): saved {bytes_saved / 1024:.1f} KB and {parse_saved * 1000:.0f} ms parsing "
+        f"(total: {totals['not_modified_count']} hits, {totals['bytes_saved'] / 1024:.1f} KB, {totals['parse_seconds_saved']:.2f}s) ---"
+    )
+
+def _discover_rss_articles(site_name, config, since, results_queue, processed_links, known_urls=None, validators=None,
+                           discovered=None):
+    """
+    Reads an RSS feed and returns article_info dicts for entries published since `since` that
+    pass the pre-filter (no article pages fetched). Every new in-window entry, pre-filtered or
+    not, is appended to `discovered` as (link, article date) for the poll scheduler.
+    """
     feed_url = config['rss_feed_url']
     print(f"[{site_name}] Using RSS feed: {feed_url}")
-    feed_content = fetch_html(feed_url)
+    feed_content = fetch_html(feed_url, validators, site_name=site_name)
+    if feed_content is NOT_MODIFIED:
+        _report_not_modified(site_name, "RSS feed", feed_url, results_queue, validators)
+        return []
     if not feed_content:
         results_queue.put(f"--- Failed to fetch RSS feed for {site_name} ---")
-        return 0 # Return count of matched articles
+        record_site_poll(site_name, failed=True)
+        return []
 
+    parse_start = time.perf_counter()
     feed = feedparser.parse(feed_content)
-    matched_count = 0
+    parse_seconds = time.perf_counter() - parse_start
+    if validators is not None:
+        validators.record_parse_time(feed_url, parse_seconds)
+    RUN_TIMINGS.record("parse_feed", parse_seconds, site_name)
+    candidates = []
 
     if feed.bozo:
         print(f"[{site_name}] Warning: RSS parsing issue: {feed.bozo_exception}")
@@ -541,9 +3075,10 @@ def _scrape_rss_feed(site_name, config, today_date, results_queue, processed_lin
     if not feed.entries:
         print(f"[{site_name}] No entries found in RSS feed.")
         results_queue.put(f"--- No entries found in RSS feed for {site_name} ---")
-        return 0
+        return []
 
     print(f"[{site_name}] Found {len(feed.entries)} items in RSS feed.")
+    policy = config.get("prefilter", PREFILTER_POLICY)
 
     for entry in feed.entries:
         title = entry.get('title', '').strip()
@@ -567,190 +3102,778 @@ def _scrape_rss_feed(site_name, config, today_date, results_queue, processed_lin
         if link in processed_links:
             continue
         processed_links.add(link)
+        if known_urls is not None and known_urls.should_skip(link, site_name):
+            continue # Already in the archive (incremental mode)
 
-        # Parse date from RSS entry
+        # Parse date from RSS entry (feedparser normalizes published_parsed to UTC)
         article_date = None
         if hasattr(entry, 'published_parsed') and entry.published_parsed:
             try:
-                ts = time.mktime(entry.published_parsed)
-                article_date = datetime.fromtimestamp(ts).date()
+                article_date = struct_time_to_ist(entry.published_parsed)
             except Exception as e:
                 print(f"[{site_name}] Error converting RSS parsed date: {e}. Trying 'published'.")
                 date_str = entry.get('published')
                 if date_str:
-                    article_date = parse_date(date_str, f"{site_name} (RSS String)")
+                    article_date = parse_datetime(date_str, f"{site_name} (RSS String)")
         elif 'published' in entry:
             date_str = entry.get('published')
             if date_str:
-                article_date = parse_date(date_str, f"{site_name} (RSS String)")
-
-        # Process if date matches today
-        if article_date == today_date:
-            article_info = {
-                'title': title,
-                'link': link,
-                'article_date': article_date,
-                'site_name': site_name
-            }
-            if _process_article(article_info, config, results_queue):
-                matched_count += 1
+                article_date = parse_datetime(date_str, f"{site_name} (RSS String)")
+
+        # Keep only entries published inside the time window
+        if not is_within_window(article_date, since):
+            continue
+        if discovered is not None:
+            discovered.append((link, article_date)) # New item for the feed's publishing rate, matching or not
+
+        # Rule out items whose feed text shows no sign of a watchlist match before fetching them
+        decision = None
+        if policy != "off":
+            decision = prefilter_feed_entry(*feed_entry_text(entry))
+            if decision == "skip" or (decision == "borderline" and policy == "strict"):
+                decision = "audit" if random.random() < PREFILTER_AUDIT_RATE else "skipped"
+            record_prefilter(site_name, decision)
+            if decision == "skipped":
+                continue
+        candidates.append({
+            'title': title,
+            'link': link,
+            'article_date': article_date,
+            'site_name': site_name,
+            'prefilter': decision
+        })
         # else: # Optional logging for non-matching dates
-        #     if article_date: print(f"[{site_name}] Skipping RSS (not today: {article_date}): {title[:50]}...")
+        #     if article_date: print(f"[{site_name}] Skipping RSS (outside window: {article_date}): {title[:50]}...")
         #     else: print(f"[{site_name}] Skipping RSS (no date): {title[:50]}...")
 
-    return matched_count
+    return candidates
 
-def _scrape_html_listing(site_name, config, today_date, results_queue, processed_links):
-    """Scrapes articles from an HTML listing page."""
+def _discover_html_articles(site_name, config, results_queue, processed_links, known_urls=None, validators=None,
+                            discovered=None):
+    """
+    Reads an HTML listing page and returns candidate dicts (title, link, listing date) for each
+    article; each is also appended to `discovered` as (link, listing date).
+    """
     list_url = config['url']
     print(f"[{site_name}] Using HTML scraping: {list_url}")
-    html_content = fetch_html(list_url)
+    html_content = fetch_html(list_url, validators, site_name=site_name)
+    if html_content is NOT_MODIFIED:
+        _report_not_modified(site_name, "HTML listing", list_url, results_queue, validators)
+        return []
     if not html_content:
         results_queue.put(f"--- Failed to fetch HTML listing for {site_name} ---")
-        return 0
+        record_site_poll(site_name, failed=True)
+        return []
+
+    parse_start = time.perf_counter()
+    items = PARSE_POOL.run(parse_listing_page, html_content, config, site_name, list_url)
+    parse_seconds = time.perf_counter() - parse_start
+    if validators is not None:
+        validators.record_parse_time(list_url, parse_seconds)
+    RUN_TIMINGS.record("parse_listing", parse_seconds, site_name)
+    if items is None:
+        results_queue.put(f"--- No articles found on HTML listing for {site_name} (all selectors failed) ---")
+        return []
+
+    candidates = []
+    for item in items:
+        link = item['link']
+        if link in processed_links:
+            continue
+        processed_links.add(link)
+        if known_urls is not None and known_urls.should_skip(link, site_name):
+            continue # Already in the archive (incremental mode)
 
-    soup = BeautifulSoup(html_content, 'lxml')
-    matched_count = 0
+        candidates.append(dict(item, site_name=site_name))
+        if discovered is not None:
+            discovered.append((link, item['article_date']))
 
-    # Find article elements using configured selectors
-    articles = []
-    for sel in config['article_selector'].split(','):
-        sel = sel.strip()
-        if sel:
-            articles.extend(soup.select(sel))
+    return candidates
 
-    # Basic fallback if primary selectors fail
-    if not articles:
-         print(f"Warning: Primary selectors failed for {site_name}. Trying fallbacks...")
-         articles = soup.find_all('article')
-         if not articles:
-             articles = soup.select('div[class*="item"], div[class*="post"], li[class*="item"], li[class*="post"]')
-         if not articles:
-             results_queue.put(f"--- No articles found on HTML listing for {site_name} (all selectors failed) ---")
-             return 0
+def _has_content(content):
+    """True if `content` is extracted article text rather than an error/placeholder string."""
+    return not content.startswith("Error:") and not content.startswith("Warning:") and content != "Content not fetched."
 
-    print(f"[{site_name}] Found {len(articles)} potential article elements on listing page.")
+class ScrapeRun:
+    """
+    One scrape of `websites` as a staged pipeline: discover (read feeds/listings) -> fetch
+    (download article pages) -> extract (parse them) -> filter (watchlist rules) -> analyze
+    (sentiment, shared by near-duplicates) -> persist (hand to the writer and results_queue).
+    Items are dicts that pick up fields as they move along; the run also tracks how many
+    articles of each site are still in flight, to report each site as it finishes. A site
+    whose articles were all processed without a failed fetch or error confirms its feed's
+    new validators (see ValidatorCache).
+    """
 
-    for article_element in articles:
-        # Extract title, link, and potentially date from the listing item
-        title_element = link_element = date_element = None
-        for sel in config['title_selector'].split(','):
-            title_element = article_element.select_one(sel.strip())
-            if title_element: break
-        for sel in config['link_selector'].split(','):
-            link_element = article_element.select_one(sel.strip())
-            if link_element: break
-        if config.get('date_selector'):
-            for sel in config['date_selector'].split(','):
-                date_element = article_element.select_one(sel.strip())
-                if date_element: break
+    def __init__(self, websites, since, results_queue, known_urls=None, writer=None, duplicates=None, validators=None):
+        self.websites = websites
+        self.since = since
+        self.results_queue = results_queue
+        self.known_urls = known_urls
+        self.writer = writer
+        self.duplicates = duplicates
+        self.validators = validators
+        self.matched = {} # site -> articles that matched the watchlists
+        self._pending = {} # site -> discovered articles not yet persisted or dropped
+        self._failed_sites = set() # sites with a failed fetch or processing error this run
+        self._lock = threading.Lock()
+
+    def build_pipeline(self, stage_sizes=None):
+        """The Pipeline for this run; `stage_sizes` maps stage name -> (workers, queue size), see PIPELINE_STAGES."""
+        sizes = dict(PIPELINE_STAGES, **(stage_sizes or {}))
+        extract_workers, extract_queue = sizes["extract"]
+        sizes["extract"] = (max(extract_workers, PARSE_POOL.workers), extract_queue) # Keep every parse process busy
+        handlers = [("discover", self.discover), ("fetch", self.fetch), ("extract", self.extract),
+                    ("filter", self.filter), ("analyze", self.analyze), ("persist", self.persist)]
+        stages = [PipelineStage(name, handler, *sizes[name], fan_out=name == "discover") for name, handler in handlers]
+        return Pipeline(stages, on_drop=self._dropped, on_done=self._persisted)
+
+    # Stage handlers (each runs in that stage's worker threads)
+
+    def discover(self, site_name):
+        """Reads a site's feed or listing page; returns its candidate articles."""
+        config = self.websites[site_name]
+        print(f"Scraping {site_name}...")
+        self.results_queue.put(f"--- Starting {site_name} ---")
+        processed_links = set() # Keep track of processed links for this site
+        discovered = [] # (link, date) of every new item, including those the pre-filter rules out
+        kind, candidates = None, []
+        try:
+            if "rss_feed_url" in config:
+                kind = "rss"
+                candidates = _discover_rss_articles(site_name, config, self.since, self.results_queue, processed_links,
+                                                    self.known_urls, self.validators, discovered)
+            elif "url" in config:
+                kind = "listing"
+                candidates = _discover_html_articles(site_name, config, self.results_queue, processed_links,
+                                                     self.known_urls, self.validators, discovered)
+            else:
+                self.results_queue.put(f"--- Skipping {site_name}: No 'url' or 'rss_feed_url' in config ---")
+            record_site_poll(site_name, discovered)
+        except Exception as e:
+            print(f"!!! Unhandled Error scraping {site_name}: {e} !!!")
+            traceback.print_exc()
+            self.results_queue.put(f"--- CRITICAL Error during scraping {site_name}: {e} ---")
+            record_site_poll(site_name, failed=True)
+            self._mark_failed(site_name)
+            candidates = []
+
+        items = [dict(candidate, kind=kind, config=config) for candidate in candidates]
+        with self._lock:
+            self.matched.setdefault(site_name, 0)
+            self._pending[site_name] = len(items)
+        if not items:
+            self._finish_site(site_name)
+        return items
+
+    def fetch(self, item):
+        """Downloads the article page if the site needs it (for content, or for a date the listing lacked)."""
+        config = item['config']
+        site_name = item['site_name']
+        link = item['link']
+        if item['kind'] == "rss":
+            if config.get("content_fetch"):
+                print(f"Fetching content from: {link}")
+                item['html'] = fetch_html(link, site_name=site_name, stop_after=content_stop_selector(config))
+                if not item['html']:
+                    item['content'] = "Error: Could not fetch article page."
+                    self._mark_failed(site_name)
+            return item
+
+        article_date = item['article_date']
+        if config.get("content_fetch") or (not article_date and config.get("date_selector_article")):
+            # The date may sit below the article body, so only stop early if it is already known
+            stop_after = content_stop_selector(config) if article_date or not config.get("date_selector_article") else None
+            item['html'] = fetch_html(link, site_name=site_name, stop_after=stop_after)
+            if not item['html']:
+                print(f"[{site_name}] Could not fetch article page {link} for details.")
+                self._mark_failed(site_name)
+                if config.get("content_fetch"):
+                    item['content'] = "Error: Could not fetch article page."
+                # Use listing date as fallback if it existed but didn't parse before
+                if not article_date and item['date_str_listing']:
+                    item['article_date'] = parse_datetime(item['date_str_listing'], f"{site_name} (Listing Fallback)")
+        return item
+
+    def extract(self, item):
+        """Parses the fetched page for content (and the date, if still missing); drops articles outside the window."""
+        config = item['config']
+        html = item.pop('html', None)
+        if html:
+            want_date = item['kind'] == "listing" and not item['article_date'] and bool(config.get("date_selector_article"))
+            want_content = bool(config.get("content_fetch"))
+            # Parsed and extracted in a worker process when PARSE_POOL is enabled
+            fields = PARSE_POOL.run(parse_article_fields, html, config, item['site_name'], item['link'], want_date, want_content)
+            record_parse_timings(fields, item['site_name'])
+            if want_content:
+                item['content'] = fields["content"]
+                if item['kind'] == "listing":
+                    # Page was fetched and parsed for the date as well; its content is reused
+                    increment_stat("duplicate_fetches_avoided")
+            if fields["date"]:
+                item['article_date'] = fields["date"] # Update date if found on page
+
+        # Listing dates are only final now (RSS entries were checked against the window when discovered)
+        if item['kind'] == "listing" and not is_within_window(item['article_date'], self.since):
+            return None
+        if item.get('content') is None:
+            item['content'] = "Content not fetched."
+        return item
+
+    def filter(self, item):
+        """Keeps articles whose title or content matches a watchlist rule."""
+        matched_rules = WATCHLIST_MATCHER.match(item['title'], item['content'])
+        if not matched_rules:
+            return None
+        if item.get('prefilter'):
+            record_prefilter(item['site_name'], "matched")
+            if item['prefilter'] == "audit":
+                record_prefilter(item['site_name'], "audit_matched")
+        item['matched_rules'] = matched_rules
+        return item
+
+    def analyze(self, item):
+        """
+        Gets the article's sentiment. With a NearDuplicateIndex, near-duplicates of a story
+        already seen wait for its sentiment instead of requesting their own.
+        """
+        site_name, title, content = item['site_name'], item['title'], item['content']
+        story = None
+        if not _has_content(content):
+            item['sentiment'] = "No Content" # Indicate content fetching issue
+            item['story'] = None
+            return item
+
+        if self.duplicates is not None:
+            story = self.duplicates.assign(item['link'], content)
+        if story is not None and not story["canonical"]:
+            print(f"[{site_name}] Near-duplicate of story {story['cluster_id']}, reusing its sentiment: {title[:50]}...")
+            sentiment_future = story["sentiment"]
+        else:
+            print(f"[{site_name}] Getting sentiment for: {title[:50]}...")
+            try:
+                sentiment_future = SENTIMENT_SCHEDULER.submit(f"Title: {title}\n\nContent: {content}")
+            except Exception as e:
+                if story is not None and story["sentiment"] is not None:
+                    story["sentiment"].set_exception(e) # Don't leave its duplicates waiting
+                raise
+            if story is not None:
+                self.duplicates.resolve(story, sentiment_future)
+        with RUN_TIMINGS.timer("sentiment", site_name): # Queueing, batching and the API call, as the article sees it
+            item['sentiment'] = sentiment_future.result() # Blocks this worker only: analyze has the most workers
+        item['story'] = story
+        return item
+
+    def persist(self, item):
+        """Builds the result dict, hands it to the writer and queues it for display."""
+        story = item['story']
+        result = {
+            "title": item['title'],
+            "date": item['article_date'].isoformat(), # Aware IST timestamp, e.g. 2025-04-12T10:30:00+05:30
+            "sentiment": item['sentiment'],
+            "content": item['content'],
+            "source": item['site_name'],
+            "url": item['link'],
+            "matched_rules": item['matched_rules']
+        }
+        if story is not None:
+            result["cluster_id"] = story["cluster_id"]
+            result["minhash"] = story["minhash"]
+        if self.writer is not None:
+            if story is not None and story["exact"] and not STORE_DUPLICATE_CONTENT:
+                self.writer.submit(dict(result, content="")) # An identical text is already stored
+            else:
+                self.writer.submit(result) # Blocks while the writer's queue is full
+        self.results_queue.put(result)
+        return result
 
-        title = safe_get_text(title_element)
-        link = safe_get_attr(link_element, 'href')
+    # Per-site bookkeeping
 
-        if not link or not title:
-            continue # Skip if essential info is missing
+    def _persisted(self, result):
+        self._article_done(result["source"], matched=True)
 
-        # Resolve link URL
+    def _dropped(self, stage_name, item, error):
+        if stage_name == "discover": # Only on a bug in discover() itself; it reports its own failures
+            print(f"!!! Unhandled Error discovering {item}: {error} !!!")
+            return
+        if error is not None:
+            print(f"[{item['site_name']}] Error processing article: {error}")
+            traceback.print_exception(type(error), error, error.__traceback__)
+            self._mark_failed(item['site_name'])
+        self._article_done(item['site_name'], matched=False)
+
+    def _mark_failed(self, site_name):
+        with self._lock:
+            self._failed_sites.add(site_name)
+
+    def _article_done(self, site_name, matched):
+        with self._lock:
+            self._pending[site_name] -= 1
+            if matched:
+                self.matched[site_name] += 1
+            finished = self._pending[site_name] == 0
+        if finished:
+            self._finish_site(site_name)
+
+    def _finish_site(self, site_name):
+        if self.validators is not None and site_name not in self._failed_sites:
+            config = self.websites[site_name]
+            self.validators.confirm(config.get("rss_feed_url") or config.get("url"))
+        matched_articles_count = self.matched.get(site_name, 0)
+        archived_note = ""
+        if self.known_urls is not None:
+            archived_note = f", {self.known_urls.skipped_by_site.get(site_name, 0)} already archived"
+        print(f"Finished scraping {site_name}. Matched filter: {matched_articles_count} articles.")
+        self.results_queue.put(f"--- Finished {site_name} ({matched_articles_count} matched filter{archived_note}) ---")
+
+def scrape_website(site_name, config, since, results_queue, known_urls=None, writer=None, duplicates=None,
+                   validators=None):
+    """Scrapes a single website through the pipeline; returns how many articles matched the filter."""
+    run = scrape_all_websites({site_name: config}, since, results_queue, known_urls, writer, duplicates, validators)
+    return run.matched.get(site_name, 0)
+
+def scrape_all_websites(websites, since, results_queue, known_urls=None, writer=None, duplicates=None, validators=None,
+                        on_status=None):
+    """
+    Blocking entry point: scrapes every site in `websites` and returns the finished ScrapeRun.
+    Only articles published at or after `since` (an aware datetime, see window_start()) are kept.
+    Pass a KnownUrlIndex as `known_urls` to run incrementally (skip already-archived articles)
+    and an ArticleWriter as `writer` to stream matched articles into the database. A
+    NearDuplicateIndex as `duplicates` clusters wire copies so each story is analysed once.
+    A ValidatorCache as `validators` sends conditional GETs for feeds and listing pages (save
+    it once the writer has committed the run, see use_conditional_gets()).
+    `on_status` is called every PIPELINE_STATUS_INTERVAL seconds with the live per-stage
+    queue depth and throughput line.
+    """
+    run = ScrapeRun(websites, since, results_queue, known_urls, writer, duplicates, validators)
+    pipeline = run.build_pipeline()
+    pipeline.start()
+
+    def _feed():
+        for site_name in websites:
+            pipeline.put(site_name)
+        pipeline.close()
+
+    feeder = threading.Thread(target=_feed, name="pipeline-feeder", daemon=True)
+    feeder.start()
+    while True:
+        feeder.join(PIPELINE_STATUS_INTERVAL)
+        if not feeder.is_alive():
+            break
+        if on_status:
+            on_status(pipeline.format_status())
+
+    results_queue.put("--- Pipeline processed: " + ", ".join(
+        f"{stage.name} {stage.processed}" for stage in pipeline.stages) + " ---")
+    if known_urls is not None:
+        results_queue.put(f"--- Incremental mode: skipped {known_urls.skipped_count} already-archived articles ---")
+    if duplicates is not None:
+        results_queue.put(f"--- {duplicates.summary()} ---")
+    return run
+
+
+def is_error_message(message):
+    """True for results_queue log strings that report a failure (shown in red, counted by run_once)."""
+    return "Error" in message or "Failed" in message
+
+def format_run_summary():
+    """End-of-run statistics lines, shared by the GUI summary tab and the headless runner."""
+    lines = [
+        f"Duplicate article page fetches avoided: {pipeline_stats['duplicate_fetches_avoided']}",
+        format_pool_stats(),
+        format_sentiment_stats(),
+    ]
+    lines += [f"Downloads: {line}" for line in format_download_stats()]
+    lines += [f"Pre-filter: {line}" for line in format_prefilter_stats()]
+    lines.append(f"Unchanged feeds/listings (304): {pipeline_stats['not_modified_responses']}, "
+                 f"saved {pipeline_stats['not_modified_bytes_saved'] / 1024:.1f} KB")
+    return lines
+
+def finish_perf_report(websites, db_path, writer):
+    """Builds the timing report for the run that just ended and writes it to PERF_REPORT_DIR; returns (report, path)."""
+    report = RUN_TIMINGS.report(sites=sorted(websites), db_path=db_path, inserted=writer.inserted_count,
+                                ignored=writer.ignored_count, db_errors=writer.error_count)
+    return report, write_perf_report(report)
+
+
+# --- Headless Runner ---
+EXIT_OK = 0 # Every site was scraped and every match saved
+EXIT_PARTIAL_FAILURE = 1 # Some feeds/pages failed or some rows could not be saved
+EXIT_USAGE = 2 # Bad command line (argparse uses 2 as well)
+EXIT_DB_ERROR = 3 # The database could not be initialized; nothing was scraped
+
+def select_websites(site_names=None):
+    """The WEBSITES entries named in `site_names` (all of them if None); raises KeyError for unknown names."""
+    if not site_names:
+        return dict(WEBSITES)
+    unknown = [name for name in site_names if name not in WEBSITES]
+    if unknown:
+        raise KeyError(", ".join(unknown))
+    return {name: WEBSITES[name] for name in site_names}
+
+def _print_results(results_queue, problems, stop_event):
+    """Prints queued articles and log messages until stop_event is set and the queue is empty."""
+    while not (stop_event.is_set() and results_queue.empty()):
         try:
-            link = urljoin(list_url, link.strip())
-            if not link.startswith('http'):
-                print(f"[{site_name}] Skipping invalid link after join: {link}")
-                continue
-        except Exception as e:
-            print(f"[{site_name}] Error joining URL {link}: {e}")
+            result = results_queue.get(timeout=0.2)
+        except queue.Empty:
             continue
+        if isinstance(result, dict):
+            print(f"[{result['source']}] {format_article_date(result['date'])} | {result['sentiment']} | {result['title']}")
+            print(f"    {result['url']}  ({', '.join(result.get('matched_rules', ()))})")
+        else:
+            if is_error_message(result):
+                problems.append(result)
+            print(result)
 
-        if link in processed_links:
-            continue
-        processed_links.add(link)
+def run_once(websites, db_path, window_hours=None, incremental=True):
+    """
+    Scrapes `websites` once into `db_path` without the GUI, using the same engine
+    (scrape_all_websites + ArticleWriter). Returns an EXIT_* status code.
+    """
+    reset_pipeline_stats()
+    SENTIMENT_SCHEDULER.reset_stats()
+    since = window_start(window_hours)
+    print(f"=== Fetching {len(websites)} sites into {db_path} (articles since {since:%Y-%m-%d %H:%M} IST) ===")
+    if not google_api_key_configured:
+        print("Warning: Google API Key not configured. Sentiment analysis disabled.")
+
+    if not init_db(db_path):
+        print(f"Fetch aborted: could not initialize database {db_path}")
+        return EXIT_DB_ERROR
+
+    known_urls = KnownUrlIndex.from_db(db_path) if incremental else None
+    if known_urls is not None:
+        print(f"Incremental mode: {len(known_urls)} URLs already archived in {db_path}")
+    validators = ValidatorCache.from_db(db_path, websites) if use_conditional_gets(incremental, window_hours) else None
+
+    start_time = time.time()
+    results_queue = queue.Queue(maxsize=RESULTS_QUEUE_SIZE)
+    problems = []
+    stop_printing = threading.Event()
+    printer = threading.Thread(target=_print_results, args=(results_queue, problems, stop_printing), daemon=True)
+    printer.start()
+
+    duplicates = NearDuplicateIndex.from_db(db_path)
+    writer = ArticleWriter(db_path)
+    writer.start()
+    try:
+        scrape_all_websites(websites, since, results_queue, known_urls, writer, duplicates, validators,
+                            on_status=lambda status: print(f"Pipeline: {status}"))
+    finally:
+        try:
+            writer.close() # Commits whatever is still pending
+        except Exception as e:
+            print(f"Database Error: article writer stopped early ({e}); unsaved articles are counted as errors.")
+        stop_printing.set()
+        printer.join()
+    if validators is not None and not writer.error_count and writer.failure is None:
+        validators.save() # Only now are the articles behind them in the archive
+
+    print(f"Database save to {db_path} finished: Inserted={writer.inserted_count}, "
+          f"Ignored={writer.ignored_count}, Errors={writer.error_count}, Duration={time.time() - start_time:.2f}s")
+    for line in format_run_summary():
+        print(line)
+    report, report_path = finish_perf_report(websites, db_path, writer)
+    for line in format_perf_report(report):
+        print(f"Timing: {line}")
+    if report_path:
+        print(f"Performance report written to {report_path}")
+    if problems or writer.error_count or writer.failure is not None:
+        print(f"=== Finished with {len(problems)} failures and {writer.error_count} database errors ===")
+        return EXIT_PARTIAL_FAILURE
+    print("=== All scraping finished ===")
+    return EXIT_OK
+
+class PollScheduler:
+    """
+    Adaptive per-site polling for daemon mode. Each site's rate of new items (links not seen
+    in earlier polls) is learned as a moving average of new items per hour, and the site is
+    polled about every POLL_TARGET_NEW_ITEMS / rate hours, kept within [min, max] minutes.
+    Consecutive failures back off exponentially. State persists in a JSON file, so rates
+    survive restarts; freshness (publish-to-discovery lag) is tracked per site.
+    """
 
-        # Attempt to parse date from listing
-        article_date = None
-        date_str_listing = None
-        if date_element:
-             date_str_listing = safe_get_attr(date_element, 'datetime') or safe_get_text(date_element)
-             if date_str_listing:
-                 article_date = parse_date(date_str_listing, f"{site_name} (Listing)")
-
-        # Determine if fetching the article page is necessary
-        fetch_article_page = config.get("content_fetch") or \
-                             (not article_date and config.get("date_selector_article"))
-
-        if fetch_article_page:
-            time.sleep(0.2) # Politeness delay
-            article_html = fetch_html(link)
-            if article_html:
-                article_soup = BeautifulSoup(article_html, 'lxml')
-                # Try parsing date from article page if needed or listing date failed
-                if not article_date and config.get("date_selector_article"):
-                    date_element_article = None
-                    for sel in config["date_selector_article"].split(','):
-                        date_element_article = article_soup.select_one(sel.strip())
-                        if date_element_article: break
-
-                    if date_element_article:
-                        date_str_article = safe_get_attr(date_element_article, 'datetime') or \
-                                           safe_get_attr(date_element_article, 'content') or \
-                                           safe_get_text(date_element_article)
-                        parsed_page_date = parse_date(date_str_article, f"{site_name} (Article)")
-                        if parsed_page_date:
-                            article_date = parsed_page_date # Update date if found on page
+    def __init__(self, path, min_minutes=POLL_MIN_MINUTES, max_minutes=POLL_MAX_MINUTES,
+                 initial_minutes=DAEMON_INTERVAL_MINUTES):
+        self.path = path
+        self.min_seconds = min_minutes * 60
+        self.max_seconds = max(max_minutes, min_minutes) * 60
+        self.initial_seconds = min(max(initial_minutes * 60, self.min_seconds), self.max_seconds)
+        self._lock = threading.Lock()
+        self._sites = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._sites = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read poll schedule {path}: {e}. Starting fresh.")
+
+    def _save(self):
+        """Writes the schedule atomically (caller holds the lock)."""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._sites, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write poll schedule {self.path}: {e}")
+
+    def _site(self, site_name):
+        return self._sites.setdefault(site_name, {
+            "interval": self.initial_seconds, "next_due": 0.0, "rate_per_hour": None,
+            "last_success": None, "failures": 0, "seen": [], "polls": 0, "failed_polls": 0,
+            "polls_with_new": 0, "new_items": 0, "lags": [],
+        })
+
+    def _clamp(self, seconds):
+        return min(max(seconds, self.min_seconds), self.max_seconds)
+
+    def due_sites(self, site_names, now=None):
+        """The sites (of `site_names`) whose next poll is due."""
+        now = now or time.time()
+        with self._lock:
+            return [name for name in site_names if self._site(name)["next_due"] <= now]
+
+    def seconds_until_next(self, site_names, now=None):
+        """Seconds until the earliest of `site_names` is due (0 if one already is)."""
+        now = now or time.time()
+        with self._lock:
+            return max(0.0, min(self._site(name)["next_due"] for name in site_names) - now)
+
+    def record_poll(self, site_name, discovered, failed, now=None):
+        """Updates a site's rate, interval and statistics after a poll; returns the next interval."""
+        now = now or time.time()
+        with self._lock:
+            site = self._site(site_name)
+            site["polls"] += 1
+            if failed:
+                site["failures"] += 1
+                site["failed_polls"] += 1
+                backoff = min(site["interval"] * 2 ** site["failures"], POLL_BACKOFF_MAX_MINUTES * 60)
+                wait = backoff * random.uniform(0.9, 1.1) # Jitter so failing sites don't retry in lockstep
+                site["next_due"] = now + wait
+                self._save()
+                return wait
+
+            site["failures"] = 0
+            seen = set(site["seen"])
+            new = [(link, published) for link, published in discovered if link not in seen]
+            new = list(dict(new).items()) # Same link listed twice counts once
+            site["seen"] = (site["seen"] + [link for link, _ in new])[-POLL_SEEN_LINKS:]
+
+            if site["last_success"] is None:
+                pass # First poll only seeds the seen links; everything would look new
             else:
-                 print(f"[{site_name}] Could not fetch article page {link} for details.")
-                 # Use listing date as fallback if it existed but wasn't today
-                 if not article_date and date_str_listing:
-                     article_date = parse_date(date_str_listing, f"{site_name} (Listing Fallback)")
-
-
-        # Process if date matches today
-        if article_date == today_date:
-            article_info = {
-                'title': title,
-                'link': link,
-                'article_date': article_date,
-                'site_name': site_name
-            }
-            # Pass to the common processing function (which handles content fetching again if needed)
-            if _process_article(article_info, config, results_queue):
-                matched_count += 1
-        # else: # Optional logging
-        #     if article_date: print(f"[{site_name}] Skipping HTML (not today: {article_date}): {title[:50]}...")
-        #     else: print(f"[{site_name}] Skipping HTML (no date): {title[:50]}...")
-
-    return matched_count
-
-
-def scrape_website(site_name, config, today_date, results_queue):
-    """Main function to scrape a single website, choosing between RSS and HTML."""
-    print(f"Scraping {site_name}...")
-    results_queue.put(f"--- Starting {site_name} ---")
-    processed_links = set() # Keep track of processed links for this site
-    matched_articles_count = 0
+                hours = max((now - site["last_success"]) / 3600, 1e-6)
+                observed = len(new) / hours
+                rate = site["rate_per_hour"]
+                site["rate_per_hour"] = observed if rate is None else (
+                    POLL_RATE_SMOOTHING * observed + (1 - POLL_RATE_SMOOTHING) * rate)
+                if new:
+                    site["polls_with_new"] += 1
+                    site["new_items"] += len(new)
+                for _, published in new:
+                    # Only timestamps with a time of day say anything about freshness
+                    if published is not None and published.time() != dt_time(0):
+                        lag = now - published.timestamp()
+                        if lag >= 0:
+                            site["lags"] = (site["lags"] + [lag])[-200:]
+                rate = site["rate_per_hour"]
+                site["interval"] = self._clamp(POLL_TARGET_NEW_ITEMS / rate * 3600 if rate > 0 else self.max_seconds)
+
+            site["last_success"] = now
+            site["next_due"] = now + site["interval"]
+            self._save()
+            return site["interval"]
+
+    def stats(self, site_name):
+        """Per-site interval and freshness statistics."""
+        with self._lock:
+            site = dict(self._site(site_name))
+        lags = sorted(site["lags"])
+        observed_polls = site["polls"] - site["failed_polls"] - 1 # The seeding poll has nothing to compare to
+        return {
+            "interval_minutes": site["interval"] / 60,
+            "rate_per_hour": site["rate_per_hour"],
+            "polls": site["polls"],
+            "failed_polls": site["failed_polls"],
+            "consecutive_failures": site["failures"],
+            "new_items": site["new_items"],
+            "empty_poll_ratio": 1 - site["polls_with_new"] / observed_polls if observed_polls > 0 else None,
+            "freshness_p50_minutes": lags[len(lags) // 2] / 60 if lags else None,
+            "freshness_p90_minutes": lags[min(len(lags) - 1, int(len(lags) * 0.9))] / 60 if lags else None,
+            "next_due_in_minutes": max(0.0, site["next_due"] - time.time()) / 60,
+        }
 
+    def report_lines(self, site_names):
+        """One summary line per site for the daemon log."""
+        lines = []
+        for name in site_names:
+            st = self.stats(name)
+            rate = f"{st['rate_per_hour']:.1f}/h" if st['rate_per_hour'] is not None else "learning"
+            empty = f"{st['empty_poll_ratio'] * 100:.0f}%" if st['empty_poll_ratio'] is not None else "n/a"
+            fresh = (f"{st['freshness_p50_minutes']:.0f}/{st['freshness_p90_minutes']:.0f} min"
+                     if st['freshness_p50_minutes'] is not None else "n/a")
+            failing = f", {st['consecutive_failures']} failures in a row" if st['consecutive_failures'] else ""
+            lines.append(f"{name}: every {st['interval_minutes']:.0f} min (new items {rate}), {st['polls']} polls, "
+                         f"{empty} without new items, freshness p50/p90 {fresh}, next in "
+                         f"{st['next_due_in_minutes']:.0f} min{failing}")
+        return lines
+
+def run_daemon(websites, db_path, interval_minutes=DAEMON_INTERVAL_MINUTES, window_hours=None, incremental=True,
+               max_runs=None, adaptive=True, min_minutes=POLL_MIN_MINUTES, max_minutes=POLL_MAX_MINUTES):
+    """
+    Polls until interrupted or `max_runs` runs are done; returns the status of the last run.
+    With adaptive=True a PollScheduler decides which sites are due (each run only scrapes
+    those); otherwise every site is scraped every `interval_minutes`.
+    """
+    scheduler = PollScheduler(POLL_SCHEDULE_PATH, min_minutes, max_minutes, interval_minutes) if adaptive else None
+    status = EXIT_OK
+    runs = 0
     try:
-        if "rss_feed_url" in config:
-            matched_articles_count = _scrape_rss_feed(
-                site_name, config, today_date, results_queue, processed_links
-            )
-        elif "url" in config:
-            matched_articles_count = _scrape_html_listing(
-                site_name, config, today_date, results_queue, processed_links
-            )
-        else:
-            results_queue.put(f"--- Skipping {site_name}: No 'url' or 'rss_feed_url' in config ---")
-
-    except Exception as e:
-        print(f"!!! Unhandled Error scraping {site_name}: {e} !!!")
-        traceback.print_exc()
-        results_queue.put(f"--- CRITICAL Error during scraping {site_name}: {e} ---")
+        while True:
+            started = time.monotonic()
+            if scheduler is None:
+                status = run_once(websites, db_path, window_hours, incremental)
+                pause = max(0.0, interval_minutes * 60 - (time.monotonic() - started))
+            else:
+                due = scheduler.due_sites(list(websites))
+                if not due:
+                    time.sleep(min(scheduler.seconds_until_next(list(websites)), 60))
+                    continue
+                status = run_once({name: websites[name] for name in due}, db_path, window_hours, incremental)
+                with pipeline_stats_lock:
+                    results = {name: dict(entry) for name, entry in site_poll_results.items()}
+                for name in due:
+                    result = results.get(name, {"discovered": [], "failed": True})
+                    scheduler.record_poll(name, result["discovered"], result["failed"])
+                for line in scheduler.report_lines(list(websites)):
+                    print(f"Schedule: {line}")
+                pause = scheduler.seconds_until_next(list(websites))
+            runs += 1
+            if status == EXIT_DB_ERROR or (max_runs and runs >= max_runs):
+                return status
+            print(f"--- Next poll in {pause / 60:.1f} minutes (Ctrl+C to stop) ---")
+            time.sleep(pause)
+    except KeyboardInterrupt:
+        print("Daemon stopped.")
+        return status
+
+def _cli_date(value):
+    """argparse type for YYYY-MM-DD dates."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}, expected YYYY-MM-DD") from None
+
+def run_search(args):
+    """Prints ranked search hits for the `search` command. Returns an EXIT_* status code."""
+    if not os.path.exists(args.db):
+        print(f"Database {args.db} does not exist.")
+        return EXIT_DB_ERROR
+    if not init_db(args.db): # Older archives are upgraded (and indexed) first
+        return EXIT_DB_ERROR
+    try:
+        hits = search_articles(args.db, args.query, args.source, args.since, args.until, args.sentiment,
+                               args.limit, args.phrase)
+    except ValueError as e:
+        print(e)
+        return EXIT_USAGE
+    if hits is None:
+        return EXIT_DB_ERROR
+    for hit in hits:
+        print(f"[{hit['source']}] {format_article_date(hit['date'])} | {hit['sentiment']} | {hit['title']}")
+        print(f"    {hit['url']}")
+        print(f"    {hit['snippet']}")
+    print(f"{len(hits)} result(s)")
+    return EXIT_OK
+
+def build_arg_parser():
+    """Command line: `run` (one headless fetch), `daemon` (poll on a schedule), `search`, `gui`, `sites`."""
+    parser = argparse.ArgumentParser(prog="python -m Scrapper", description=APP_TITLE)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_scrape_options(sub):
+        sub.add_argument("--sites", nargs="+", metavar="NAME", help="site names from WEBSITES (default: all)")
+        sub.add_argument("--db", default=DEFAULT_DB_PATH, help=f"SQLite database path (default: {DEFAULT_DB_PATH})")
+        sub.add_argument("--hours", type=float, default=ARTICLE_WINDOW_HOURS,
+                         help="keep articles from the last N hours (default: since midnight IST)")
+        sub.add_argument("--no-incremental", dest="incremental", action="store_false",
+                         help="re-process articles that are already archived")
+        sub.add_argument("--prefilter", choices=["strict", "borderline", "off"], default=PREFILTER_POLICY,
+                         help=f"which RSS items to fetch judging by feed text (default: {PREFILTER_POLICY})")
+        sub.add_argument("--parse-workers", type=int, default=PARSE_WORKERS, metavar="N",
+                         help=f"parse pages in N worker processes, 0 = in the fetch threads (default: {PARSE_WORKERS})")
+
+    add_scrape_options(subparsers.add_parser("run", help="fetch once and exit with a status code"))
+    daemon = subparsers.add_parser("daemon", help="fetch repeatedly on a schedule")
+    add_scrape_options(daemon)
+    daemon.add_argument("--interval", type=float, default=DAEMON_INTERVAL_MINUTES,
+                        help=f"minutes between polls with --fixed, first interval otherwise (default: {DAEMON_INTERVAL_MINUTES})")
+    daemon.add_argument("--fixed", dest="adaptive", action="store_false",
+                        help="poll every site every --interval minutes instead of adapting per site")
+    daemon.add_argument("--min-interval", type=float, default=POLL_MIN_MINUTES,
+                        help=f"shortest adaptive interval in minutes (default: {POLL_MIN_MINUTES})")
+    daemon.add_argument("--max-interval", type=float, default=POLL_MAX_MINUTES,
+                        help=f"longest adaptive interval in minutes (default: {POLL_MAX_MINUTES})")
+    daemon.add_argument("--max-runs", type=int, default=None, help="stop after this many polls")
+    search = subparsers.add_parser("search", help="ranked full-text search over the archive")
+    search.add_argument("query", help='FTS5 query: words, "exact phrases", AND/OR/NOT, prefix*')
+    search.add_argument("--db", default=DEFAULT_DB_PATH, help=f"SQLite database path (default: {DEFAULT_DB_PATH})")
+    search.add_argument("--phrase", action="store_true", help="match the query as one literal phrase")
+    search.add_argument("--source", nargs="+", metavar="NAME", help="only articles from these sources")
+    search.add_argument("--since", type=_cli_date, metavar="YYYY-MM-DD", help="only articles on or after this date")
+    search.add_argument("--until", type=_cli_date, metavar="YYYY-MM-DD", help="only articles on or before this date")
+    search.add_argument("--sentiment", nargs="+", metavar="LABEL", help="only these sentiments, e.g. Positive Negative")
+    search.add_argument("--limit", type=int, default=SEARCH_RESULTS_LIMIT,
+                        help=f"maximum number of results (default: {SEARCH_RESULTS_LIMIT})")
+    subparsers.add_parser("gui", help="start the Tk interface (the default without arguments)")
+    subparsers.add_parser("sites", help="list the configured site names")
+    return parser
+
+def main(argv=None):
+    """Entry point; without arguments the GUI starts, as before."""
+    global PREFILTER_POLICY
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        return run_gui()
+    args = build_arg_parser().parse_args(argv)
+
+    if args.command == "gui":
+        return run_gui()
+    if args.command == "sites":
+        for site_name in WEBSITES:
+            print(site_name)
+        return EXIT_OK
+    if args.command == "search":
+        return run_search(args)
 
-    print(f"Finished scraping {site_name}. Matched filter: {matched_articles_count} articles.")
-    results_queue.put(f"--- Finished {site_name} ({matched_articles_count} matched filter) ---")
+    try:
+        websites = select_websites(args.sites)
+    except KeyError as e:
+        print(f"Unknown site(s): {e.args[0]}. Use the 'sites' command to list them.")
+        return EXIT_USAGE
+    if args.hours is not None and args.hours <= 0:
+        print("--hours must be a positive number.")
+        return EXIT_USAGE
+    if args.parse_workers < 0:
+        print("--parse-workers must be 0 or more.")
+        return EXIT_USAGE
+    PARSE_POOL.configure(args.parse_workers)
+    PREFILTER_POLICY = args.prefilter
+
+    if args.command == "daemon":
+        return run_daemon(websites, args.db, args.interval, args.hours, args.incremental, args.max_runs,
+                          args.adaptive, args.min_interval, args.max_interval)
+    return run_once(websites, args.db, args.hours, args.incremental)
 
 
 # --- GUI Application Class ---
 class NewsScraperApp:
+    _RUN_FINISHED = object() # Heads the last results_queue message of a run, see wait_for_threads
+
     def __init__(self, master):
         self.master = master
         master.title(APP_TITLE)
@@ -764,10 +3887,9 @@ class NewsScraperApp:
 
         # State variables
         self.is_fetching = False
-        self.is_saving = False
         self.scraper_threads = []
-        self.collected_articles = []
-        self.results_queue = queue.Queue()
+        self.article_refs = [] # Lightweight (url, title, source) refs; full articles are streamed to the DB
+        self.results_queue = queue.Queue(maxsize=RESULTS_QUEUE_SIZE)
 
         # Setup UI
         self._setup_ui()
@@ -784,6 +3906,10 @@ class NewsScraperApp:
         self.status_label = tk.Label(control_frame, text="Status: Idle", fg="blue", font=self.normal_font)
         self.status_label.pack(side=tk.LEFT, padx=10, fill=tk.X, expand=True)
 
+        # Live pipeline view: queue depth, busy workers and throughput per stage
+        self.pipeline_label = tk.Label(self.master, text="Pipeline: idle", fg="#555555", font=self.log_font, anchor="w")
+        self.pipeline_label.pack(fill=tk.X, padx=10)
+
         # Database Control Frame
         db_frame = tk.Frame(self.master, pady=5)
         db_frame.pack(fill=tk.X, padx=10)
@@ -795,23 +3921,34 @@ class NewsScraperApp:
         self.db_path_entry = tk.Entry(db_frame, textvariable=self.db_path_var, width=50, font=self.normal_font)
         self.db_path_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
 
-        self.save_button = tk.Button(db_frame, text="Save Results", command=self.save_results_action, state=tk.DISABLED)
-        self.save_button.pack(side=tk.LEFT, padx=(10, 0))
+        self.incremental_var = tk.BooleanVar(value=True)
+        self.incremental_check = tk.Checkbutton(db_frame, text="Skip archived", variable=self.incremental_var, font=self.normal_font)
+        self.incremental_check.pack(side=tk.LEFT, padx=(10, 0))
+
+        window_label = tk.Label(db_frame, text="Last hours:", font=self.normal_font)
+        window_label.pack(side=tk.LEFT, padx=(10, 5))
+        self.window_hours_var = tk.StringVar(value="" if ARTICLE_WINDOW_HOURS is None else str(ARTICLE_WINDOW_HOURS))
+        self.window_hours_entry = tk.Entry(db_frame, textvariable=self.window_hours_var, width=5, font=self.normal_font)
+        self.window_hours_entry.pack(side=tk.LEFT) # Blank = since midnight IST today
 
         # Notebook for Tabs
         self.notebook = ttk.Notebook(self.master)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=(5, 10))
 
         self.tab_text_widgets = {}
+        self.tab_placeholders = {} # Log tab -> text shown while it is empty
 
         # Summary Tab
         self._create_tab("Summary", is_log_tab=True)
 
+        # Performance Tab (timing breakdown of the last run)
+        self._create_tab("Performance", is_log_tab=True, placeholder="Timings per stage and site appear here after each run...")
+
         # Website Tabs
         for site_name in WEBSITES.keys():
             self._create_tab(site_name)
 
-    def _create_tab(self, tab_name, is_log_tab=False):
+    def _create_tab(self, tab_name, is_log_tab=False, placeholder="Scraping log will appear here..."):
         """Helper function to create a tab and its text widget."""
         tab_frame = tk.Frame(self.notebook, bg="#F0F0F0" if is_log_tab else "white")
         tab_frame.pack(fill=tk.BOTH, expand=True)
@@ -828,8 +3965,9 @@ class NewsScraperApp:
             text_widget.tag_configure("info", foreground="blue", font=self.log_font)
             text_widget.tag_configure("success", foreground="green", font=self.log_font)
             text_widget.config(state=tk.NORMAL)
-            text_widget.insert('1.0', "Scraping log will appear here...\n\n", "info")
+            text_widget.insert('1.0', f"{placeholder}\n\n", "info")
             text_widget.config(state=tk.DISABLED)
+            self.tab_placeholders[tab_name] = placeholder
         else:
             # Configure tags for article display
             text_widget.tag_configure("title", font=self.bold_font, foreground="#00008B")
@@ -886,7 +4024,8 @@ class NewsScraperApp:
             source = result['source']
             target_widget = self.tab_text_widgets.get(source)
             if target_widget:
-                self.collected_articles.append(result) # Store valid articles for saving
+                # Keep only a reference; the article itself is already queued for the DB writer
+                self.article_refs.append({"url": result['url'], "title": result['title'], "source": source})
             else:
                 print(f"Error: No tab found for source '{source}'. Discarding article.")
                 return
@@ -897,15 +4036,15 @@ class NewsScraperApp:
                 print(f"Error: Summary tab widget not found. Discarding log: {result}")
                 return
             # Determine log tag based on content
-            if "Error" in result or "Failed" in result: log_tag = "error"
+            if is_error_message(result): log_tag = "error"
             elif "Finished" in result and "0 matched" not in result: log_tag = "success"
             else: log_tag = "info"
         else:
             print(f"Received unknown result type: {type(result)}. Discarding.")
             return
 
-        # Schedule GUI update in the main thread
-        self.master.after(0, self._update_widget_content, target_widget, result, is_log_message, log_tag)
+        # Called from process_queue, so already in the main thread
+        self._update_widget_content(target_widget, result, is_log_message, log_tag)
 
     def _update_widget_content(self, widget, content_data, is_log, log_tag_type):
         """Helper function to perform the actual text widget update (runs in main thread)."""
@@ -919,7 +4058,7 @@ class NewsScraperApp:
                 # Format and insert article data
                 widget.insert(tk.END, f"{content_data['title']}\n", "title")
                 widget.insert(tk.END, f"Source: {content_data['source']} | ", "source_info")
-                widget.insert(tk.END, f"Date: {content_data['date']} | ", "date_info")
+                widget.insert(tk.END, f"Date: {format_article_date(content_data['date'])} | ", "date_info")
 
                 # Format sentiment
                 sentiment = content_data.get("sentiment", "N/A")
@@ -930,6 +4069,8 @@ class NewsScraperApp:
 
                 widget.insert(tk.END, f"Sentiment: {sentiment}", sentiment_tag)
                 widget.insert(tk.END, " | ")
+                if content_data.get("matched_rules"):
+                    widget.insert(tk.END, f"Rules: {', '.join(content_data['matched_rules'])} | ", "source_info")
 
                 # Insert clickable URL
                 url_start = widget.index(tk.INSERT)
@@ -938,8 +4079,11 @@ class NewsScraperApp:
                 widget.tag_add("url_info", url_start, url_end)
                 widget.insert(tk.END, "\n")
 
-                # Insert content and separator
-                widget.insert(tk.END, f"{content_data['content']}\n\n", "content")
+                # Insert content preview and separator
+                content = content_data['content']
+                if len(content) > CONTENT_PREVIEW_CHARS:
+                    content = content[:CONTENT_PREVIEW_CHARS].rstrip() + " ..."
+                widget.insert(tk.END, f"{content}\n\n", "content")
                 widget.insert(tk.END, "-" * 60 + "\n\n", "separator")
 
             widget.see(tk.END) # Scroll to the end
@@ -952,62 +4096,132 @@ class NewsScraperApp:
 
 
     def process_queue(self):
-        """Processes results from the queue and updates the GUI."""
+        """
+        Shows up to GUI_QUEUE_BATCH queued results, then yields to Tk until the next tick.
+        Polling stops at the _RUN_FINISHED message wait_for_threads queues after everything else.
+        """
         try:
-            while True: # Process all available items
+            for _ in range(GUI_QUEUE_BATCH):
                 result = self.results_queue.get_nowait()
+                if isinstance(result, tuple) and result[0] is self._RUN_FINISHED:
+                    self._finish_run(*result[1:])
+                    return
                 self.display_result(result)
-                self.master.update_idletasks() # Allow GUI to refresh between items
+            self.master.after(10, self.process_queue) # More may be waiting; let Tk redraw first
         except queue.Empty:
-            # Queue is empty, check if scraping is done
-            still_fetching = self.is_fetching or any(t.is_alive() for t in self.scraper_threads if t is not None)
-            if still_fetching:
-                self.master.after(100, self.process_queue) # Check again later
-            else:
-                # Fetching is false AND all threads are done
-                self.update_status("Finished Fetching.", "green")
-                self.master.after(0, lambda: self.fetch_button.config(state=tk.NORMAL))
-                if self.collected_articles: # Enable save only if there's something to save
-                    self.master.after(0, lambda: self.save_button.config(state=tk.NORMAL))
-                print("Queue empty and all scraping threads finished.")
-                self._add_summary_log("=== All scraping finished ===", "success")
-
-    def fetch_news_thread_runner(self):
-        """Runs the scraping process in background threads."""
+            self.master.after(100, self.process_queue) # Check again later
+
+    def _finish_run(self, save_message, save_failed, report, report_path):
+        """Shows the end of a run (runs in main thread, once per run) and re-enables fetching."""
+        summary = self.tab_text_widgets.get("Summary")
+        self._update_widget_content(summary, save_message, True, "error" if save_failed else "success")
+        self._show_perf_report(report, report_path)
+        for line in format_run_summary():
+            self._update_widget_content(summary, f"--- {line} ---", True, "info")
+        self._update_widget_content(summary, "=== All scraping finished ===", True, "success")
+        print("Queue empty and all scraping threads finished.")
+        self.status_label.config(text="Status: Finished Fetching.", fg="green")
+        self.fetch_button.config(state=tk.NORMAL)
+        self.is_fetching = False
+
+    def fetch_news_thread_runner(self, db_path, incremental, window_hours=None):
+        """Runs the scraping process in background threads, streaming matches into the database."""
         self.is_fetching = True
         self.scraper_threads = []
-        self.collected_articles = [] # Clear previous results
-        today = date.today()
+        self.article_refs = [] # Clear previous results
+        since = window_start(window_hours)
+        reset_pipeline_stats()
+        SENTIMENT_SCHEDULER.reset_stats()
 
         # Update GUI elements (safely from main thread)
-        self.master.after(0, lambda: self.save_button.config(state=tk.DISABLED))
         self._clear_results()
         self.update_status("Fetching...", "orange")
-        self._add_summary_log("--- Starting news fetch ---", "info")
+        self._add_summary_log(f"--- Starting news fetch (articles since {since:%Y-%m-%d %H:%M} IST) ---", "info")
+
+        if not init_db(db_path, progress=lambda message: self._add_summary_log(f"--- {message} ---", "info")):
+            # Nothing could be saved, so don't start scraping (details are on the console)
+            self.master.after(0, lambda: messagebox.showerror(
+                "Database Error", f"Could not initialize database:\n{db_path}\n\nSee the console for details."))
+            self._add_summary_log("--- Fetch aborted: database initialization failed ---", "error")
+            self.update_status("Database Initialization Failed!", "red")
+            self.is_fetching = False
+            self.master.after(0, lambda: self.fetch_button.config(state=tk.NORMAL))
+            return
+
+        known_urls = None
+        if incremental:
+            known_urls = KnownUrlIndex.from_db(db_path)
+            self._add_summary_log(f"--- Incremental mode: {len(known_urls)} URLs already archived in {db_path} ---", "info")
 
-        # Start a thread for each website
-        for site_name, config in WEBSITES.items():
-            thread = threading.Thread(target=scrape_website, args=(site_name, config, today, self.results_queue), daemon=True)
-            self.scraper_threads.append(thread)
-            thread.start()
-            time.sleep(0.05) # Slight stagger
+        duplicates = NearDuplicateIndex.from_db(db_path)
+        validators = ValidatorCache.from_db(db_path, WEBSITES) if use_conditional_gets(incremental, window_hours) else None
+        writer = ArticleWriter(db_path, on_flush=self._on_writer_flush)
+        writer.start()
+
+        # Scrape all websites through the staged pipeline (each stage has its own workers)
+        thread = threading.Thread(
+            target=scrape_all_websites, args=(WEBSITES, since, self.results_queue, known_urls, writer, duplicates, validators),
+            kwargs={"on_status": self._on_pipeline_status}, daemon=True
+        )
+        self.scraper_threads.append(thread)
+        thread.start()
 
         # Start a monitor thread to wait for all scraping threads to finish
-        monitor_thread = threading.Thread(target=self.wait_for_threads, args=(self.scraper_threads,), daemon=True)
+        monitor_thread = threading.Thread(target=self.wait_for_threads, args=(self.scraper_threads, writer, db_path, validators),
+                                          daemon=True)
         monitor_thread.start()
 
         # Start polling the results queue
         self.master.after(100, self.process_queue)
 
-    def wait_for_threads(self, threads):
-        """Waits for all provided threads to complete."""
+    def _on_pipeline_status(self, status):
+        """Called from the scraping thread with the live per-stage line."""
+        self.master.after(0, lambda: self.pipeline_label.config(text=f"Pipeline: {status}"))
+
+    def _on_writer_flush(self, inserted, ignored, errors):
+        """Called from the writer thread after each micro-batch is committed."""
+        self.update_status(f"Fetching... ({len(self.article_refs)} matched, saved as they arrive)", "orange")
+
+    def wait_for_threads(self, threads, writer, db_path, validators=None):
+        """
+        Waits for all provided threads to complete, then flushes the database writer (and saves
+        the validators), writes the perf report and queues _RUN_FINISHED for process_queue.
+        The only place a run is finished.
+        """
+        start_time = time.time()
         print(f"Monitoring {len(threads)} scraping threads...")
         for i, t in enumerate(threads):
             if t: t.join()
         print("All scraping threads have joined.")
-        self.is_fetching = False
-        # Trigger a final queue check from the main thread
-        self.master.after(10, self.process_queue)
+
+        try:
+            writer.close() # Commits whatever is still pending
+        except Exception as e:
+            print(f"Database Error: article writer stopped early ({e}); unsaved articles are counted as errors.")
+        save_failed = bool(writer.error_count) or writer.failure is not None
+        if validators is not None and not save_failed:
+            validators.save() # Only now are the articles behind them in the archive
+        log_msg = (f"--- Database save to {db_path} finished: Inserted={writer.inserted_count}, "
+                   f"Ignored={writer.ignored_count}, Errors={writer.error_count}, Duration={time.time() - start_time:.2f}s ---")
+        if writer.failure is not None:
+            log_msg += f"\n--- Article writer stopped early: {writer.failure} ---"
+        report, report_path = finish_perf_report(WEBSITES, db_path, writer)
+        # Behind every result the scraper queued, so the summary comes last
+        self.results_queue.put((self._RUN_FINISHED, log_msg, save_failed, report, report_path))
+
+    def _show_perf_report(self, report, report_path):
+        """Fills the Performance tab with the run's timing table (runs in main thread)."""
+        widget = self.tab_text_widgets.get("Performance")
+        if not widget: return
+        try:
+            widget.config(state=tk.NORMAL)
+            widget.delete('1.0', tk.END)
+            widget.insert(tk.END, "\n".join(format_perf_report(report)) + "\n\n", "info")
+            if report_path:
+                widget.insert(tk.END, f"Full report (with histograms): {report_path}\n", "success")
+            widget.config(state=tk.DISABLED)
+        except tk.TclError as e:
+            print(f"Tkinter Error updating performance tab: {e}")
 
     def _clear_results(self):
         """Safely clears all result text widgets."""
@@ -1016,8 +4230,8 @@ class NewsScraperApp:
                 try:
                     text_widget.config(state=tk.NORMAL)
                     text_widget.delete('1.0', tk.END)
-                    if name == "Summary": # Reset summary log message
-                        text_widget.insert('1.0', "Scraping log will appear here...\n\n", "info")
+                    if name in self.tab_placeholders: # Log tabs get their placeholder back
+                        text_widget.insert('1.0', f"{self.tab_placeholders[name]}\n\n", "info")
                     text_widget.config(state=tk.DISABLED)
                 except tk.TclError: pass # Ignore if widget is already destroyed
         self.master.after(0, _do_clear)
@@ -1036,107 +4250,43 @@ class NewsScraperApp:
         if self.is_fetching:
             messagebox.showwarning("Busy", "Already fetching news. Please wait.")
             return
-        if self.is_saving:
-             messagebox.showwarning("Busy", "Currently saving results. Please wait.")
-             return
-
-        self.fetch_button.config(state=tk.DISABLED)
-        self.save_button.config(state=tk.DISABLED)
-        self.update_status("Starting Fetch...", "orange")
-
-        # Run the fetching process in a separate thread to keep GUI responsive
-        fetch_thread = threading.Thread(target=self.fetch_news_thread_runner, daemon=True)
-        fetch_thread.start()
-
-    def save_results_action(self):
-        """Handles the 'Save Results' button click and starts the save thread."""
-        if self.is_fetching:
-            messagebox.showwarning("Busy", "Cannot save while fetching. Please wait.")
-            return
-        if self.is_saving:
-            messagebox.showwarning("Busy", "Already saving results.")
-            return
-        if not self.collected_articles:
-            messagebox.showinfo("No Results", "No articles have been collected to save.")
-            return
 
+        # Read Tk variables here (main thread) and hand them to the worker
         db_path = self.db_path_var.get().strip()
+        incremental = self.incremental_var.get()
         if not db_path:
             messagebox.showerror("Input Error", "Please enter a valid database file path.")
             return
+        window_text = self.window_hours_var.get().strip()
+        window_hours = None
+        if window_text:
+            try:
+                window_hours = float(window_text)
+                if window_hours <= 0: raise ValueError
+            except ValueError:
+                messagebox.showerror("Input Error", "'Last hours' must be a positive number (or blank for today).")
+                return
 
-        if not messagebox.askyesno("Confirm Save", f"Save {len(self.collected_articles)} collected articles to '{db_path}'?"):
-            return
-
-        self.is_saving = True
-        self.save_button.config(state=tk.DISABLED)
         self.fetch_button.config(state=tk.DISABLED)
-        self.update_status(f"Saving to {db_path}...", "orange")
-        self._add_summary_log(f"--- Starting database save to {db_path} ---", "info")
-
-        # Pass a copy of the articles list to the save thread
-        articles_to_save = list(self.collected_articles)
-        save_thread = threading.Thread(target=self.save_results_thread_runner, args=(db_path, articles_to_save), daemon=True)
-        save_thread.start()
-
-    def save_results_thread_runner(self, db_path, articles):
-        """Performs database saving in a background thread and updates GUI on completion."""
-        start_time = time.time()
-        inserted_count, ignored_count, error_count = 0, 0, 0
-
-        if not init_db(db_path):
-            # Error already shown by init_db, just update status
-            self.master.after(0, lambda: self.update_status("Database Initialization Failed!", "red"))
-            self.master.after(0, lambda: self._add_summary_log("--- Database save failed (init error) ---", "error"))
-            self.is_saving = False
-            # Re-enable buttons if not fetching
-            if not self.is_fetching:
-                 self.master.after(0, lambda: self.fetch_button.config(state=tk.NORMAL))
-                 self.master.after(0, lambda: self.save_button.config(state=tk.NORMAL if self.collected_articles else tk.DISABLED))
-            return
-
-        # Insert articles one by one (handles INSERT OR IGNORE easily)
-        for i, article in enumerate(articles):
-            result_id = insert_article(db_path, article)
-            if result_id is None: error_count += 1
-            elif result_id > 0: inserted_count += 1
-            else: ignored_count += 1
-
-            # Optional periodic status update for large saves
-            if (i + 1) % 50 == 0:
-                 progress_msg = f"Saving... ({i+1}/{len(articles)})"
-                 self.master.after(0, lambda msg=progress_msg: self.update_status(msg, "orange"))
-
-        duration = time.time() - start_time
-
-        # Final GUI update after saving is complete
-        def _final_update():
-            if error_count > 0:
-                final_message = f"Save finished with {error_count} errors."
-                final_color = "red"
-                messagebox.showerror("Save Error", f"Finished saving with {error_count} errors.\nInserted: {inserted_count}, Ignored (duplicates): {ignored_count}\nCheck summary log.")
-            else:
-                final_message = f"Saved {inserted_count} new articles."
-                final_color = "green"
-                messagebox.showinfo("Save Complete", f"Successfully saved results to '{db_path}'.\nInserted: {inserted_count}\nIgnored (duplicates): {ignored_count}\nDuration: {duration:.2f}s")
-
-            self.update_status(final_message, final_color)
-            log_msg = f"--- Database save finished: Inserted={inserted_count}, Ignored={ignored_count}, Errors={error_count}, Duration={duration:.2f}s ---"
-            log_tag = "error" if error_count > 0 else "success"
-            self._add_summary_log(log_msg, log_tag)
-
-            self.is_saving = False
-            # Re-enable buttons if not fetching
-            if not self.is_fetching:
-                 self.fetch_button.config(state=tk.NORMAL)
-                 # Keep save enabled if there were results originally
-                 self.save_button.config(state=tk.NORMAL if self.collected_articles else tk.DISABLED)
+        self.update_status("Starting Fetch...", "orange")
 
-        self.master.after(0, _final_update)
+        # Run the fetching process in a separate thread to keep GUI responsive
+        fetch_thread = threading.Thread(target=self.fetch_news_thread_runner, args=(db_path, incremental, window_hours), daemon=True)
+        fetch_thread.start()
 
 
 # --- Main Execution ---
-if __name__ == "__main__":
+def _load_tkinter():
+    """Imports tkinter (into the module globals the GUI code uses) on first use."""
+    global tk, scrolledtext, messagebox, font, ttk
+    if tk is None:
+        import tkinter
+        from tkinter import scrolledtext, messagebox, font, ttk
+        tk = tkinter
+
+def run_gui():
+    """Starts the Tk front end over the same engine the headless runner uses."""
+    _load_tkinter()
     root = tk.Tk()
 
     # Apply a modern theme if available
@@ -1161,3 +4311,7 @@ if __name__ == "__main__":
 
     app = NewsScraperApp(root)
     root.mainloop()
+    return EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
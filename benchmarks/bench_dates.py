@@ -0,0 +1,154 @@
+"""
+Date parsing micro-benchmark (user-011): time per 10k listing/RSS date strings for the old
+strptime cascade (legacy_parse_date, a copy of parse_date as it was before the compiled
+parser) and for parse_datetime, first on unseen strings and then on memoized ones.
+
+    python benchmarks/bench_dates.py [--count 10000]
+"""
+import argparse
+import random
+from datetime import date, datetime, timedelta
+
+from benchutil import best_of, print_table, quiet
+
+import Scrapper
+
+
+def legacy_parse_date(date_str, site_name_context):
+    """parse_date before user-011: every format is tried with strptime, misses raise ValueError."""
+    if not date_str:
+        return None
+
+    today = date.today()
+    original_date_str = date_str
+    cleaned_date_str = date_str.strip()
+    cleaned_date_str_lower = cleaned_date_str.lower()
+
+    if any(word in cleaned_date_str_lower for word in ["hour", "minute", "today", "just now"]):
+        return today
+    if "yesterday" in cleaned_date_str_lower:
+        return None
+
+    prefixes = ["Updated :", "Published :", "Updated:", "Published:"]
+    for prefix in prefixes:
+        if cleaned_date_str_lower.startswith(prefix.lower()):
+            cleaned_date_str = cleaned_date_str[len(prefix):].strip()
+            cleaned_date_str_lower = cleaned_date_str.lower()
+            break
+
+    parts = cleaned_date_str.split()
+    if len(parts) > 1:
+        last_part = parts[-1]
+        if last_part.startswith('+') or (last_part.startswith('-') and ':' not in last_part):
+            if not last_part.replace('-', '').isdigit() or len(last_part) != 5:
+                cleaned_date_str = " ".join(parts[:-1]).strip()
+
+    formats_to_try = [
+        "%b %d, %Y", "%d %b %Y", "%B %d, %Y", "%d %B %Y",
+        "%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%Y",
+        "%a, %d %b %Y %H:%M:%S",
+        "%Y-%m-%dT%H:%M:%S",
+        "%b %d, %Y, %I:%M %p", "%B %d, %Y %I:%M %p",
+        "%d %b %Y %H:%M",
+        "%Y%m%d",
+        "%Y-%m-%dT%H:%M:%S.%fZ",
+    ]
+
+    for fmt in formats_to_try:
+        try:
+            parse_str = cleaned_date_str
+            if fmt.endswith("%fZ"):
+                if '.' not in parse_str and parse_str.endswith('Z'):
+                    parse_str = parse_str[:-1] + ".000Z"
+                elif not parse_str.endswith('Z'): continue
+            elif fmt == "%Y-%m-%dT%H:%M:%S" and parse_str.endswith('Z'):
+                parse_str = parse_str[:-1]
+            return datetime.strptime(parse_str, fmt).date()
+        except ValueError:
+            try:
+                date_part = cleaned_date_str.split(',')[0].strip()
+                if date_part != cleaned_date_str:
+                    return datetime.strptime(date_part, fmt).date()
+            except ValueError:
+                try:
+                    date_part = cleaned_date_str.split('T')[0]
+                    if date_part != cleaned_date_str:
+                        return datetime.strptime(date_part, "%Y-%m-%d").date()
+                except ValueError:
+                    continue
+
+    year_str = str(today.year)
+    month_short = today.strftime("%b").lower()
+    month_long = today.strftime("%B").lower()
+    day_str = str(today.day)
+    if (year_str in cleaned_date_str_lower and
+        (month_short in cleaned_date_str_lower or month_long in cleaned_date_str_lower) and
+        (f" {day_str} " in cleaned_date_str_lower or
+         f" {day_str}," in cleaned_date_str_lower or
+         cleaned_date_str_lower.endswith(f" {day_str}"))):
+        print(f"[{site_name_context}] Warning: Fallback date match for '{original_date_str}'")
+        return today
+
+    print(f"[{site_name_context}] Failed to parse date: '{original_date_str}' (Cleaned: '{cleaned_date_str}')")
+    return None
+
+
+# (site, strftime pattern) pairs in roughly the mix our feeds and listing pages produce
+SHAPES = [
+    ("rss", "%a, %d %b %Y %H:%M:%S +0530"),
+    ("rss-gmt", "%a, %d %b %Y %H:%M:%S GMT"),
+    ("iso", "%Y-%m-%dT%H:%M:%S+05:30"),
+    ("iso-z", "%Y-%m-%dT%H:%M:%S.000Z"),
+    ("listing", "%b %d, %Y, %I:%M %p"),
+    ("listing-long", "Updated: %B %d, %Y %I:%M %p IST"),
+    ("day-first", "%d %b %Y %H:%M"),
+    ("numeric", "%d-%m-%Y"),
+]
+
+
+def make_corpus(count, seed=11):
+    """`count` distinct (date string, site) pairs spread over the last 30 days."""
+    rng = random.Random(seed)
+    start = datetime(2025, 4, 12, 23, 59)
+    corpus = []
+    for i in range(count):
+        site, pattern = SHAPES[i % len(SHAPES)]
+        moment = start - timedelta(minutes=rng.randrange(30 * 24 * 60))
+        corpus.append((moment.strftime(pattern), site))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000, help="date strings per pass")
+    args = parser.parse_args()
+    corpus = make_corpus(args.count)
+
+    def run_legacy():
+        for raw, site in corpus:
+            legacy_parse_date(raw, site)
+
+    def run_cold():
+        Scrapper._date_cache.clear()
+        Scrapper._date_pattern_hints.clear()
+        run_warm()
+
+    def run_warm():
+        for raw, site in corpus:
+            Scrapper.parse_datetime(raw, site)
+
+    with quiet():
+        legacy = best_of(run_legacy)
+        cold = best_of(run_cold)
+        run_warm() # Fill the memo
+        warm = best_of(run_warm)
+    per_10k = 10000 / len(corpus)
+    print_table(["parser", "ms per 10k", "speedup"], [
+        ("legacy strptime cascade", f"{legacy * per_10k * 1000:.1f}", "1.0x"),
+        ("parse_datetime, unseen strings", f"{cold * per_10k * 1000:.1f}", f"{legacy / cold:.1f}x"),
+        ("parse_datetime, memoized", f"{warm * per_10k * 1000:.1f}", f"{legacy / warm:.1f}x"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Extraction benchmark (user-014): parse time and peak memory of the BeautifulSoup extractor
+(BeautifulSoup tree + extract_article_content) against the lxml one (lxml tree +
+extract_article_content_lxml) on article pages of growing length. Peak memory is the Python
+heap high-water mark from tracemalloc, so it covers BeautifulSoup's tree but not libxml2's.
+
+    python benchmarks/bench_extract.py [--paragraphs 10 100 1000]
+"""
+import argparse
+
+from benchutil import ARTICLE_PARAGRAPH, best_of, peak_memory, print_table, quiet
+
+import Scrapper
+
+URL = "https://example.com/story"
+
+
+def long_article_html(paragraphs):
+    """An article with nested blocks, inline links and captions, as long story pages have."""
+    blocks = []
+    for n in range(paragraphs):
+        blocks.append(f"<p>{ARTICLE_PARAGRAPH} <a href='/tag/{n}'>Tag {n}</a> <b>{n}</b></p>")
+        if n % 10 == 9:
+            blocks.append(f"<figure><img src='/{n}.jpg'><figcaption><p>Caption {n}: {ARTICLE_PARAGRAPH}</p>"
+                          f"</figcaption></figure><div class='ad'><script>var slot = {n};</script></div>")
+    related = "".join(f"<li><a href='/r{n}'>Related story {n}</a></li>" for n in range(50))
+    return (f"<html><head><title>Story</title></head><body><nav><ul>{related}</ul></nav>"
+            f"<div class='article-body'><div class='inner'>{''.join(blocks)}</div></div>"
+            f"<aside><ul>{related}</ul></aside></body></html>")
+
+
+def extract(html, config):
+    page = Scrapper.parse_article_page(html, config)
+    return Scrapper.extract_article_content(page, config, URL) # Dispatches lxml trees to the lxml extractor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if Scrapper.CSSSelector is None:
+        raise SystemExit("The lxml extractor needs cssselect (pip install cssselect).")
+
+    soup_config = {"content_selector": "div.article-body"}
+    lxml_config = dict(soup_config, extractor="lxml")
+    rows = []
+    for paragraphs in args.paragraphs:
+        html = long_article_html(paragraphs)
+        with quiet():
+            if extract(html, soup_config) != extract(html, lxml_config):
+                raise RuntimeError(f"extractors disagree on the {paragraphs}-paragraph page")
+            soup_seconds = best_of(lambda: extract(html, soup_config), args.repeat)
+            lxml_seconds = best_of(lambda: extract(html, lxml_config), args.repeat)
+            soup_peak = peak_memory(lambda: extract(html, soup_config))
+            lxml_peak = peak_memory(lambda: extract(html, lxml_config))
+        rows.append((paragraphs, f"{len(html) / 1024:.0f}",
+                     f"{soup_seconds * 1000:.1f}", f"{lxml_seconds * 1000:.1f}", f"{soup_seconds / lxml_seconds:.1f}x",
+                     f"{soup_peak / 1024:.0f}", f"{lxml_peak / 1024:.0f}"))
+    print_table(["paragraphs", "KiB", "soup ms", "lxml ms", "speedup", "soup peak KiB", "lxml peak KiB"], rows)
+
+
+if __name__ == "__main__":
+    main()
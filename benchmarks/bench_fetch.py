@@ -0,0 +1,90 @@
+"""
+Fetch throughput benchmark (user-002): scrapes S local stand-in sites (one port each, so each
+is its own host) with N articles apiece and a fixed per-response latency, comparing wall-clock
+time for
+
+  per-site threads   the original model: one thread per site, fetching its feed and then each
+                     article in turn with requests.get and a 0.2 s pause
+  pipeline           scrape_all_websites (the staged thread pipeline, limited by FETCH_LIMITER)
+
+    python benchmarks/bench_fetch.py [--sites 8] [--articles 20] [--latency 0.05]
+"""
+import argparse
+import queue
+import threading
+import time
+
+import feedparser
+import requests
+from bs4 import BeautifulSoup
+
+from benchutil import print_table, quiet, serve_site
+
+import Scrapper
+
+
+def legacy_scrape_site(base_url, config, pages, pause):
+    """One site the old way: feed, then every article sequentially (fetched and parsed)."""
+    feed = feedparser.parse(requests.get(base_url + "/feed", timeout=20).content)
+    pages.append(1)
+    for entry in feed.entries:
+        response = requests.get(entry.link, timeout=20)
+        soup = BeautifulSoup(response.text, 'lxml')
+        Scrapper.extract_article_content(soup, config, entry.link)
+        pages.append(1)
+        time.sleep(pause)
+
+
+def run_legacy(sites, pause):
+    pages = []
+    threads = [threading.Thread(target=legacy_scrape_site, args=(base_url, config, pages, pause))
+               for base_url, config in sites.values()]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, len(pages)
+
+
+def run_pipeline(sites):
+    websites = {name: config for name, (_, config) in sites.items()}
+    Scrapper.reset_pipeline_stats()
+    started = time.perf_counter()
+    Scrapper.scrape_all_websites(websites, Scrapper.window_start(24), queue.Queue())
+    elapsed = time.perf_counter() - started
+    return elapsed, sum(stats["pages"] for stats in Scrapper.download_stats.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sites", type=int, default=8)
+    parser.add_argument("--articles", type=int, default=20, help="articles per site")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--pause", type=float, default=0.2, help="per-article pause of the old model")
+    args = parser.parse_args()
+
+    published = Scrapper.now_ist()
+    sites = {}
+    for i in range(args.sites):
+        base_url = serve_site(args.articles, args.latency, published)
+        sites[f"Bench {i}"] = (base_url, {
+            "rss_feed_url": base_url + "/feed",
+            "content_fetch": True,
+            "content_selector": "div.article-body",
+            "prefilter": "off", # Fetch every item, as the old model did
+        })
+
+    with quiet():
+        legacy_seconds, legacy_pages = run_legacy(sites, args.pause)
+        pipeline_seconds, pipeline_pages = run_pipeline(sites)
+    print(f"{args.sites} sites x {args.articles} articles, {args.latency * 1000:.0f} ms per response")
+    print_table(["model", "pages", "seconds", "pages/s", "speedup"], [
+        ("per-site threads", legacy_pages, f"{legacy_seconds:.2f}", f"{legacy_pages / legacy_seconds:.1f}", "1.0x"),
+        ("pipeline", pipeline_pages, f"{pipeline_seconds:.2f}", f"{pipeline_pages / pipeline_seconds:.1f}",
+         f"{legacy_seconds / pipeline_seconds:.1f}x"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Archive insert benchmark (user-006): stores N synthetic articles in a fresh database (created
+with init_db) three ways and reports rows per second:
+
+  per-row      one connection, INSERT and commit per article (the old insert_article path)
+  writer       insert_articles_bulk in WRITER_BATCH_SIZE micro-batches (what ArticleWriter does)
+  bulk         a single insert_articles_bulk call
+
+Commit cost depends on the disk, so point --dir at the drive the archive lives on; a tmpfs
+hides most of the fsync difference.
+
+    python benchmarks/bench_inserts.py [--sizes 10000 100000] [--dir PATH]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import timedelta
+
+from benchutil import print_table, quiet
+
+import Scrapper
+
+SOURCES = ["Times of India", "The Hindu", "NDTV", "Indian Express", "Hindustan Times"]
+
+
+def make_articles(count):
+    base = Scrapper.now_ist()
+    body = "The state cabinet approved the new water supply scheme for the district on Monday. " * 40
+    return [{
+        "source": SOURCES[i % len(SOURCES)],
+        "date": (base - timedelta(minutes=i)).isoformat(),
+        "title": f"Synthetic article {i}",
+        "url": f"https://example.com/news/{i}",
+        "content": f"{i} {body}",
+        "sentiment": "Neutral",
+        "matched_rules": ["benchmark"],
+    } for i in range(count)]
+
+
+def legacy_insert_article(db_path, article):
+    """One connection and one commit per article, as insert_article did."""
+    with sqlite3.connect(db_path) as conn:
+        cursor = Scrapper._insert_rows(conn, [Scrapper._article_row(article)])
+        conn.commit()
+    conn.close()
+    return cursor.rowcount
+
+
+def insert_per_row(db_path, articles):
+    return sum(legacy_insert_article(db_path, article) for article in articles)
+
+
+def insert_writer_batches(db_path, articles):
+    size = Scrapper.WRITER_BATCH_SIZE
+    return sum(Scrapper.insert_articles_bulk(db_path, articles[i:i + size])[0] for i in range(0, len(articles), size))
+
+
+def insert_bulk(db_path, articles):
+    return Scrapper.insert_articles_bulk(db_path, articles)[0]
+
+
+def timed(directory, method, articles):
+    """Seconds to insert `articles` into a new database with `method`."""
+    with tempfile.TemporaryDirectory(dir=directory) as workdir:
+        db_path = os.path.join(workdir, "bench.db")
+        with quiet():
+            Scrapper.init_db(db_path)
+        started = time.perf_counter()
+        with quiet():
+            inserted = method(db_path, articles)
+        elapsed = time.perf_counter() - started
+    if inserted != len(articles):
+        raise RuntimeError(f"{method.__name__} inserted {inserted} of {len(articles)} rows")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="articles per run")
+    parser.add_argument("--dir", default=None, help="where the temporary databases go")
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        articles = make_articles(size)
+        baseline = None
+        for name, method in [("per-row", insert_per_row), ("writer", insert_writer_batches), ("bulk", insert_bulk)]:
+            elapsed = timed(args.dir, method, articles)
+            baseline = baseline or elapsed
+            rows.append((size, name, f"{elapsed:.2f}", f"{size / elapsed:,.0f}", f"{baseline / elapsed:.1f}x"))
+    print_table(["articles", "path", "seconds", "rows/s", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Keyword matching benchmark (user-022): time to scan one article for K terms with the
+Aho-Corasick KeywordMatcher (a single pass, whatever K is) against the per-term approach it
+replaced (one whole-word regex search per term, the word-safe version of the old
+`SEARCH_TERM in content` test), for growing K.
+
+    python benchmarks/bench_keywords.py [--terms 1 10 100 1000 5000]
+"""
+import argparse
+import random
+import re
+import time
+
+from benchutil import best_of, print_table
+
+import Scrapper
+
+
+def make_terms(rng, count):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    terms = set()
+    while len(terms) < count:
+        words = ["".join(rng.choice(letters) for _ in range(rng.randint(4, 10))) for _ in range(rng.randint(1, 3))]
+        terms.add(" ".join(words))
+    return sorted(terms)
+
+
+def make_article(rng, terms, words=1500):
+    """About `words` words of filler with a handful of the terms mixed in."""
+    filler = Scrapper.normalize_match_text(
+        "The state cabinet on Monday approved the new water supply scheme for the district, officials said.").split()
+    text = [rng.choice(filler) for _ in range(words)]
+    for term in rng.sample(terms, min(5, len(terms))):
+        text.insert(rng.randrange(len(text)), term)
+    return " ".join(text)
+
+
+def per_term_scan(patterns, text):
+    return {term for term, pattern in patterns if pattern.search(text)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--terms", type=int, nargs="+", default=[1, 10, 100, 1000, 5000])
+    parser.add_argument("--articles", type=int, default=20, help="articles scanned per timing")
+    args = parser.parse_args()
+
+    rng = random.Random(22)
+    rows = []
+    for count in args.terms:
+        terms = make_terms(rng, count)
+        articles = [make_article(rng, terms) for _ in range(args.articles)]
+
+        started = time.perf_counter()
+        matcher = Scrapper.KeywordMatcher(terms)
+        build = time.perf_counter() - started
+        patterns = [(term, re.compile(r"(?<!\w)" + re.escape(term) + r"(?!\w)")) for term in terms]
+
+        for text in articles:
+            if matcher.scan(text) != per_term_scan(patterns, text):
+                raise RuntimeError(f"matchers disagree with {count} terms")
+        automaton = best_of(lambda: [matcher.scan(text) for text in articles]) / len(articles)
+        per_term = best_of(lambda: [per_term_scan(patterns, text) for text in articles]) / len(articles)
+        rows.append((count, f"{build * 1000:.1f}", f"{automaton * 1000:.2f}", f"{per_term * 1000:.2f}",
+                     f"{per_term / automaton:.1f}x"))
+    print_table(["terms", "build ms", "automaton ms/article", "per-term ms/article", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Parse pool benchmark (user-018): article pages parsed and extracted per second with the
+pipeline's extract stage (a thread per worker, at least 4, each calling PARSE_POOL.run on
+parse_article_fields) at 0 (in-thread), 1, 2, 4 and 8 worker processes. The pool is started
+and warmed up before timing. Expect gains only up to the number of CPU cores.
+
+    python benchmarks/bench_parse_pool.py [--workers 0 1 2 4 8] [--pages 400]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchutil import print_table, quiet
+from bench_extract import long_article_html
+
+import Scrapper
+
+CONFIG = {"content_selector": "div.article-body"}
+
+
+def parse_all(pages, threads):
+    def parse(page):
+        index, html = page
+        return Scrapper.PARSE_POOL.run(Scrapper.parse_article_fields, html, CONFIG, "Bench",
+                                       f"https://example.com/{index}", True, True)
+    with ThreadPoolExecutor(threads) as executor:
+        return list(executor.map(parse, enumerate(pages)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4, 8])
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--paragraphs", type=int, default=60, help="length of each page")
+    args = parser.parse_args()
+
+    pages = [long_article_html(args.paragraphs)] * args.pages
+    rows = []
+    baseline = None
+    for workers in args.workers:
+        threads = max(Scrapper.PIPELINE_STAGES["extract"][0], workers)
+        with quiet():
+            Scrapper.PARSE_POOL.configure(workers)
+            parse_all(pages[:max(workers, 1) * 2], threads) # Start and warm up the worker processes
+            started = time.perf_counter()
+            results = parse_all(pages, threads)
+            elapsed = time.perf_counter() - started
+        if any(result["content"].startswith(("Error", "Warning")) for result in results):
+            raise RuntimeError(f"extraction failed with {workers} workers")
+        rate = len(pages) / elapsed
+        baseline = baseline or rate
+        rows.append((workers or "in-thread", f"{elapsed:.2f}", f"{rate:.0f}", f"{rate / baseline:.1f}x"))
+    Scrapper.PARSE_POOL.shutdown()
+    print(f"{len(pages)} pages of {args.paragraphs} paragraphs, {os.cpu_count()} CPUs")
+    print_table(["workers", "seconds", "pages/s", "vs first"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Search benchmark (user-019): query latency of search_articles with the FTS5 index against the
+LIKE scan it falls back to (use_index=False) on a synthetic archive. The archive is built
+once with init_db and insert_articles_bulk (so the FTS triggers index it, and the build time
+is the write cost of the index) and reused on later runs with the same --db.
+
+    python benchmarks/bench_search.py [--articles 1000000] [--db bench_search.db]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import timedelta
+
+from benchutil import best_of, print_table, quiet
+
+import Scrapper
+
+SOURCES = ["Times of India", "The Hindu", "NDTV", "Indian Express", "Hindustan Times"]
+ENTITIES = ["monsoon", "parliament", "cricket", "election", "budget", "railways", "isro", "supreme court"]
+WORDS_PER_ARTICLE = 120
+INSERT_CHUNK = 10000
+
+
+def vocabulary(rng, size=20000):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def build_archive(db_path, count, seed=19):
+    rng = random.Random(seed)
+    words = vocabulary(rng)
+    base = Scrapper.now_ist()
+    Scrapper.init_db(db_path)
+    for start in range(0, count, INSERT_CHUNK):
+        articles = []
+        for i in range(start, min(start + INSERT_CHUNK, count)):
+            text = rng.choices(words, k=WORDS_PER_ARTICLE)
+            if i % 50 == 0: # Entities appear in 2% of articles, a rare phrase in 0.1%
+                text[rng.randrange(WORDS_PER_ARTICLE)] = rng.choice(ENTITIES)
+            if i % 1000 == 0:
+                text[10:10] = ["water", "supply", "scheme"]
+            articles.append({
+                "source": SOURCES[(i // 7) % len(SOURCES)],
+                "date": (base - timedelta(minutes=i)).isoformat(),
+                "title": " ".join(rng.choices(words, k=8)),
+                "url": f"https://example.com/news/{i}",
+                "content": " ".join(text),
+                "sentiment": rng.choice(Scrapper.SENTIMENT_LABELS),
+            })
+        Scrapper.insert_articles_bulk(db_path, articles)
+
+
+QUERIES = [ # (label, query, search_articles keyword arguments)
+    ("rare term", "monsoon", {}),
+    ("two terms", "scheme water", {}),
+    ("phrase", "water supply scheme", {"phrase": True}),
+    ("term + source filter", "budget", {"sources": ["NDTV"]}),
+    ("no match", "zzzzzz", {}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=1000000)
+    parser.add_argument("--db", default="bench_search.db", help="archive to build (or reuse if it has enough rows)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    existing = 0
+    if os.path.exists(args.db):
+        with sqlite3.connect(args.db) as conn:
+            existing = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+    if existing < args.articles:
+        if os.path.exists(args.db):
+            os.remove(args.db)
+        started = time.perf_counter()
+        with quiet():
+            build_archive(args.db, args.articles)
+        print(f"Built {args.articles:,} articles in {time.perf_counter() - started:.1f}s")
+    else:
+        print(f"Reusing {args.db} ({existing:,} articles)")
+
+    rows = []
+    for label, query, options in QUERIES:
+        with quiet():
+            fts_hits = Scrapper.search_articles(args.db, query, **options)
+            like_hits = Scrapper.search_articles(args.db, query, use_index=False, **options)
+            fts = best_of(lambda: Scrapper.search_articles(args.db, query, **options), args.repeat)
+            like = best_of(lambda: Scrapper.search_articles(args.db, query, use_index=False, **options), args.repeat)
+        rows.append((label, len(fts_hits), len(like_hits), f"{fts * 1000:.1f}", f"{like * 1000:.1f}", f"{like / fts:.0f}x"))
+    print_table(["query", "fts hits", "like hits", "fts ms", "like ms", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Selector benchmark (user-013): time spent finding listing fields and article content areas in
+already-parsed pages, using the old approach (split the comma-separated selector strings and
+call soup.select_one() for each alternative, then walk the common fallback list) against the
+compiled SiteSelectors with their winning-selector memory. Page parsing is excluded.
+
+Fixtures are generated pages shaped like the Hindustan Times config; pass saved article
+pages with --pages to time content lookup on real HTML too.
+
+    python benchmarks/bench_selectors.py [--repeat 200] [--pages saved/*.html]
+"""
+import argparse
+
+from bs4 import BeautifulSoup
+
+from benchutil import ARTICLE_PARAGRAPH, best_of, print_table, quiet
+
+import Scrapper
+
+SITE = "Hindustan Times India"
+CONFIG = Scrapper.WEBSITES[SITE]
+
+
+def listing_html(items=40):
+    cards = "".join(
+        f"<div class='cartHolder'><h3><a href='/india-news/story-{n}'>Story {n}</a></h3>"
+        f"<span class='dateTime'>Updated on Apr 12, 2025 09:{n % 60:02d} AM IST</span></div>"
+        for n in range(items))
+    return f"<html><body><section class='listingPage'><div><div>{cards}</div></div></section></body></html>"
+
+
+def content_html(wrapper):
+    """An article page whose body sits in `wrapper` (an opening tag), after some page chrome."""
+    chrome = "".join(f"<div class='related'><a href='/r{n}'>Related {n}</a></div>" for n in range(30))
+    body = "".join(f"<p>{ARTICLE_PARAGRAPH}</p>" for _ in range(8))
+    close = "</" + wrapper[1:].split()[0].rstrip(">") + ">"
+    return f"<html><body><nav>{chrome}</nav>{wrapper}{body}{close}<footer>{chrome}</footer></body></html>"
+
+
+def legacy_select_chain(tag, selectors):
+    for sel in selectors.split(','):
+        sel = sel.strip()
+        if sel:
+            element = tag.select_one(sel)
+            if element:
+                return element
+    return None
+
+
+def legacy_listing(soup, config):
+    articles = []
+    for sel in config['article_selector'].split(','):
+        sel = sel.strip()
+        if sel:
+            articles.extend(soup.select(sel))
+    for article_element in articles:
+        legacy_select_chain(article_element, config['title_selector'])
+        legacy_select_chain(article_element, config['link_selector'])
+        legacy_select_chain(article_element, config['date_selector'])
+    return len(articles)
+
+
+def compiled_listing(soup, config):
+    selectors = Scrapper.selectors_for(config, SITE)
+    articles = selectors.article.select(soup)
+    for article_element in articles:
+        selectors.title.select_one(article_element)
+        selectors.link.select_one(article_element)
+        selectors.date.select_one(article_element)
+    return len(articles)
+
+
+def legacy_content(soup, config):
+    return (legacy_select_chain(soup, config.get("content_selector", ""))
+            or legacy_select_chain(soup, ",".join(Scrapper.COMMON_CONTENT_SELECTORS)))
+
+
+def compiled_content(soup, config):
+    selectors = Scrapper.selectors_for(config, SITE)
+    element, _ = selectors.content.select_one(soup)
+    if element is None:
+        element, _ = selectors.content_fallback.select_one(soup)
+    return element
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="lookups per case")
+    parser.add_argument("--pages", nargs="*", default=[], help="saved article pages (HTML files)")
+    args = parser.parse_args()
+
+    cases = [
+        ("listing, 40 cards", legacy_listing, compiled_listing, listing_html()),
+        ("content, first selector", legacy_content, compiled_content, content_html("<div class='storyDetails'>")),
+        ("content, second selector", legacy_content, compiled_content, content_html("<div class='detail'>")),
+        ("content, late fallback", legacy_content, compiled_content, content_html("<div class='articleBody'>")),
+    ]
+    for path in args.pages:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            cases.append((f"content, {path}", legacy_content, compiled_content, f.read()))
+
+    rows = []
+    for name, legacy, compiled, html in cases:
+        soup = BeautifulSoup(html, 'lxml')
+        config = dict(CONFIG) # Fresh compiled selectors (and winner memory) per case
+        with quiet():
+            if compiled(soup, config) != legacy(soup, config): # Also compiles and learns the winner, as a run's first page does
+                raise RuntimeError(f"{name}: compiled selectors found something else")
+            old = best_of(lambda: [legacy(soup, config) for _ in range(args.repeat)])
+            new = best_of(lambda: [compiled(soup, config) for _ in range(args.repeat)])
+        rows.append((name, f"{old / args.repeat * 1e6:.0f}", f"{new / args.repeat * 1e6:.0f}", f"{old / new:.1f}x"))
+    print_table(["case", "old us/page", "compiled us/page", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
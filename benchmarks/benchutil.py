@@ -0,0 +1,106 @@
+"""
+Shared helpers for the scripts in benchmarks/ (run them from the repo root, e.g.
+`python benchmarks/bench_dates.py`). Each script prints a small table; nothing is asserted.
+"""
+import contextlib
+import http.server
+import io
+import os
+import socketserver
+import sys
+import threading
+import time
+import tracemalloc
+from email.utils import format_datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallows Scrapper's print() logging while a benchmark runs."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def best_of(func, repeat=3):
+    """Best wall-clock time of `repeat` calls to func(), in seconds."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(func):
+    """Peak Python heap allocation (bytes) while func() runs, via tracemalloc."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers] + list(rows):
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
+
+
+ARTICLE_PARAGRAPH = ("The state cabinet on Monday approved the new water supply scheme for the district, "
+                     "officials said, adding that work would begin before the monsoon.")
+
+
+def article_html(index, paragraphs=8):
+    body = "".join(f"<p>{ARTICLE_PARAGRAPH} ({index}.{n})</p>" for n in range(paragraphs))
+    return (f"<html><head><title>Story {index}</title></head><body><nav><a href='/'>Home</a></nav>"
+            f"<div class='article-body'>{body}</div><footer>Footer</footer></body></html>")
+
+
+def rss_feed(base_url, items, published):
+    """An RSS 2.0 feed of `items` articles at base_url/article/<n>, all published at `published`."""
+    entries = "".join(
+        f"<item><title>Story {n}</title><link>{base_url}/article/{n}</link>"
+        f"<pubDate>{format_datetime(published)}</pubDate></item>" for n in range(items))
+    return (f"<?xml version='1.0'?><rss version='2.0'><channel><title>Bench</title>"
+            f"<link>{base_url}</link>{entries}</channel></rss>")
+
+
+class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+def serve_site(items, latency, published):
+    """
+    Starts a local news site on its own port (so each one counts as a separate host): /feed is
+    an RSS feed of `items` articles at /article/<n>; every response is delayed by `latency`
+    seconds. Returns the base URL; the server lives until the process exits.
+    """
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep-alive, as real news sites allow
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path == "/feed":
+                body, content_type = rss_feed(base_url, items, published), "application/rss+xml"
+            else:
+                body, content_type = article_html(self.path.rsplit("/", 1)[-1]), "text/html; charset=utf-8"
+            body = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = _Server(("127.0.0.1", 0), Handler)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return base_url
@@ -0,0 +1,450 @@
+"""
+Tests for Scrapper.py (stdlib unittest; run with `python -m unittest test_scrapper`).
+Nothing here talks to the network: Gemini is replaced by FakeSentimentModel and article
+pages are inline HTML.
+"""
+import contextlib
+import io
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import Scrapper
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.candidates = [text]
+
+
+class FakeSentimentModel:
+    """
+    Stands in for the Gemini model. The label for an article is its first word: batched prompts
+    are answered with `batch_reply([{"id": i, "sentiment": label}, ...])`, single prompts with
+    the label alone.
+    """
+
+    def __init__(self, batch_reply=json.dumps):
+        self.batch_reply = batch_reply
+        self.batch_prompts = []
+        self.single_prompts = []
+
+    def generate_content(self, prompt, generation_config=None, safety_settings=None):
+        if "JSON array" in prompt:
+            self.batch_prompts.append(prompt)
+            words = re.findall(r'ARTICLE \d+:\n"""\n(\w+)', prompt)
+            return FakeResponse(self.batch_reply([
+                {"id": i, "sentiment": word} for i, word in enumerate(words)
+            ]))
+        self.single_prompts.append(prompt)
+        return FakeResponse(re.search(r'"""\s*(\w+)', prompt).group(1))
+
+
+class SentimentBatchTest(unittest.TestCase):
+    TEXTS = ["Positive news about the economy", "Negative report on the floods", "Neutral notice of a meeting"]
+
+    def analyze_all(self, model):
+        """Submits TEXTS to a scheduler that answers them from `model` in one batch, without a cache."""
+        scheduler = Scrapper.SentimentScheduler(batch_size=len(self.TEXTS), max_wait=5,
+                                                model_factory=lambda: model, cache=None)
+        futures = [scheduler.submit(text) for text in self.TEXTS]
+        return [future.result(timeout=10) for future in futures], scheduler
+
+    def test_batch_labels_are_parsed(self):
+        model = FakeSentimentModel()
+        labels, scheduler = self.analyze_all(model)
+        self.assertEqual(labels, ["Positive", "Negative", "Neutral"])
+        self.assertEqual(len(model.batch_prompts), 1)
+        self.assertEqual(model.single_prompts, [])
+        self.assertEqual(scheduler.stats()["fallback_calls"], 0)
+
+    def test_batch_reply_with_surrounding_text_and_bare_labels(self):
+        reply = lambda items: "Sure:\n" + json.dumps([item["sentiment"].lower() for item in items]) + "\nDone."
+        labels, _ = self.analyze_all(FakeSentimentModel(reply))
+        self.assertEqual(labels, ["Positive", "Negative", "Neutral"])
+
+    def test_unparseable_label_falls_back_to_single_call(self):
+        def reply(items):
+            items[1]["sentiment"] = "Mixed feelings"
+            return json.dumps(items)
+        model = FakeSentimentModel(reply)
+        labels, scheduler = self.analyze_all(model)
+        self.assertEqual(labels, ["Positive", "Negative", "Neutral"])
+        self.assertEqual(len(model.single_prompts), 1)
+        self.assertIn(self.TEXTS[1], model.single_prompts[0])
+        self.assertEqual(scheduler.stats()["fallback_calls"], 1)
+
+    def test_missing_and_out_of_range_ids_fall_back(self):
+        reply = lambda items: json.dumps([items[0], {"id": 7, "sentiment": "Positive"}])
+        model = FakeSentimentModel(reply)
+        labels, _ = self.analyze_all(model)
+        self.assertEqual(labels, ["Positive", "Negative", "Neutral"])
+        self.assertEqual(len(model.single_prompts), 2)
+
+    def test_unparseable_response_falls_back_for_every_article(self):
+        model = FakeSentimentModel(lambda items: "I cannot answer that.")
+        labels, scheduler = self.analyze_all(model)
+        self.assertEqual(labels, ["Positive", "Negative", "Neutral"])
+        self.assertEqual(len(model.single_prompts), 3)
+        self.assertEqual(scheduler.stats()["fallback_calls"], 3)
+
+    def test_dispatcher_failure_fails_waiting_requests_and_recovers(self):
+        model = FakeSentimentModel()
+        scheduler = Scrapper.SentimentScheduler(batch_size=2, max_wait="not a number",
+                                                model_factory=lambda: model, cache=None)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            future = scheduler.submit(self.TEXTS[0])
+            with self.assertRaises(TypeError):
+                future.result(timeout=10)
+        scheduler.max_wait = 0.1
+        self.assertEqual(scheduler.submit(self.TEXTS[1]).result(timeout=10), "Negative")
+
+    def test_failed_batch_fails_its_requests(self):
+        class BrokenCache:
+            def reset_stats(self): pass
+            def get(self, key): return None
+            def put(self, key, label): raise RuntimeError("disk full")
+        model = FakeSentimentModel()
+        scheduler = Scrapper.SentimentScheduler(batch_size=len(self.TEXTS), max_wait=5,
+                                                model_factory=lambda: model, cache=BrokenCache())
+        with contextlib.redirect_stdout(io.StringIO()):
+            futures = [scheduler.submit(text) for text in self.TEXTS]
+            for future in futures:
+                with self.assertRaises(RuntimeError):
+                    future.result(timeout=10)
+
+
+class TransientErrorTest(unittest.TestCase):
+    def test_classified_by_type_and_status_not_message(self):
+        exceptions = Scrapper.google_exceptions
+        transient = [exceptions.ResourceExhausted("quota"), exceptions.ServiceUnavailable("busy"),
+                     exceptions.InternalServerError("oops"), exceptions.DeadlineExceeded("slow"),
+                     TimeoutError(), ConnectionResetError()]
+        permanent = [exceptions.InvalidArgument("prompt has 4290 tokens; request 503 failed"),
+                     exceptions.PermissionDenied("API key not valid"), ValueError("Timeout 500")]
+        for error in transient:
+            self.assertTrue(Scrapper._is_transient_llm_error(error), error)
+        for error in permanent:
+            self.assertFalse(Scrapper._is_transient_llm_error(error), error)
+
+    def test_status_code_attribute(self):
+        error = Exception("upstream")
+        error.code = 503
+        self.assertTrue(Scrapper._is_transient_llm_error(error))
+        error.code = 400
+        self.assertFalse(Scrapper._is_transient_llm_error(error))
+
+
+def ist(*fields):
+    return datetime(*fields, tzinfo=Scrapper.IST)
+
+
+PARSE_NOW = ist(2025, 4, 12, 14, 30) # now_ist() while parsing the corpora below
+
+# Strings the pre-user-011 strptime cascade (parse_date) gave the same day for: raw -> expected
+DATE_CORPUS = {
+    "Sat, 12 Apr 2025 09:15:00 +0530": ist(2025, 4, 12, 9, 15),
+    "Sat, 12 Apr 2025 03:45:00 GMT": ist(2025, 4, 12, 9, 15),
+    "Sat, 12 Apr 2025 09:15:00 IST": ist(2025, 4, 12, 9, 15),
+    "2025-04-12T09:15:00Z": ist(2025, 4, 12, 14, 45),
+    "2025-04-12T09:15:00": ist(2025, 4, 12, 9, 15),
+    "2025-04-12": ist(2025, 4, 12),
+    "Apr 12, 2025": ist(2025, 4, 12),
+    "April 12, 2025": ist(2025, 4, 12),
+    "12 Apr 2025": ist(2025, 4, 12),
+    "12 April 2025": ist(2025, 4, 12),
+    "12-04-2025": ist(2025, 4, 12),
+    "04/12/2025": ist(2025, 4, 12), # %m/%d/%Y is tried before %d/%m/%Y
+    "13/04/2025": ist(2025, 4, 13),
+    "20250412": ist(2025, 4, 12),
+    "Apr 12, 2025, 09:15 AM": ist(2025, 4, 12, 9, 15),
+    "April 12, 2025 09:15 PM": ist(2025, 4, 12, 21, 15),
+    "12 Apr 2025 21:05": ist(2025, 4, 12, 21, 5),
+    "Updated: Apr 12, 2025, 09:15 AM IST": ist(2025, 4, 12, 9, 15),
+    "Published : 12 April 2025": ist(2025, 4, 12),
+    "2 hours ago": ist(2025, 4, 12, 12, 30),
+    "45 minutes ago": ist(2025, 4, 12, 13, 45),
+    "Today": PARSE_NOW,
+    "Just now": PARSE_NOW,
+    "Sept 31, 2025": None,
+    "not a date": None,
+    "12 Apr": None,
+    "": None,
+}
+
+# Intended differences from parse_date (user-012: zones and offsets are honoured, yesterday is
+# kept for the time window to judge): raw -> (expected, the day parse_date returned)
+DATE_CHANGES = {
+    "Fri, 11 Apr 2025 20:00:00 GMT": (ist(2025, 4, 12, 1, 30), None),
+    "Fri, 11 Apr 2025 20:00:00 +0000": (ist(2025, 4, 12, 1, 30), "2025-04-11"),
+    "2025-04-11T22:30:00.123Z": (ist(2025, 4, 12, 4, 0, 0, 123000), "2025-04-11"),
+    "2025-04-12T09:15:00+05:30": (ist(2025, 4, 12, 9, 15), None),
+    "2025-04-11T23:00:00-04:00": (ist(2025, 4, 12, 8, 30), None),
+    "Updated : 2025-04-12T09:15:00+05:30": (ist(2025, 4, 12, 9, 15), None),
+    "Yesterday": (ist(2025, 4, 11), None),
+    "Updated yesterday at 5 PM": (ist(2025, 4, 11), None),
+}
+
+
+class ParseDatetimeTest(unittest.TestCase):
+    def setUp(self):
+        Scrapper._date_cache.clear()
+        Scrapper._date_pattern_hints.clear()
+        patcher = mock.patch.object(Scrapper, "now_ist", lambda: PARSE_NOW)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        quiet = contextlib.redirect_stdout(io.StringIO()) # Unparseable strings are logged
+        quiet.__enter__()
+        self.addCleanup(quiet.__exit__, None, None, None)
+
+    def check(self, raw, expected, site="corpus"):
+        with self.subTest(raw=raw, site=site):
+            parsed = Scrapper.parse_datetime(raw, site)
+            self.assertEqual(parsed, expected)
+            if parsed is not None:
+                self.assertEqual(parsed.utcoffset(), PARSE_NOW.utcoffset()) # Always in IST
+
+    def test_corpus(self):
+        for raw, expected in DATE_CORPUS.items():
+            self.check(raw, expected)
+
+    def test_intended_changes_from_parse_date(self):
+        for raw, (expected, _) in DATE_CHANGES.items():
+            self.check(raw, expected)
+
+    def test_results_do_not_depend_on_the_site_hint_or_cache(self):
+        corpus = list(DATE_CORPUS.items()) + [(raw, expected) for raw, (expected, _) in DATE_CHANGES.items()]
+        for raw, expected in corpus + corpus[::-1]: # Second pass hits the cache, with the hints reshuffled
+            self.check(raw, expected, site="one-site")
+
+
+class FakeStreamedResponse:
+    """Just enough of a streamed requests.Response for read_body: headers, iter_content and raw.tell()."""
+
+    def __init__(self, body, chunk_size=None, content_length=True):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.headers = {"content-type": "text/html; charset=utf-8"}
+        if content_length:
+            self.headers["content-length"] = str(len(body))
+        self.sent = 0
+        self.consumed = False # True once iter_content ran to the end (requests then reuses the connection)
+        self.raw = self
+
+    def tell(self):
+        return self.sent
+
+    def iter_content(self, chunk_size):
+        size = self.chunk_size or chunk_size
+        while self.sent < len(self.body):
+            chunk = self.body[self.sent:self.sent + size]
+            self.sent += len(chunk)
+            yield chunk
+        self.consumed = True
+
+
+class ReadBodyTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(Scrapper, MAX_BODY_BYTES=20000, EARLY_STOP_DRAIN_BYTES=4096)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def page(self, size):
+        head = b"<html><body><p>"
+        tail = b"</p></body></html>"
+        return head + b"x" * (size - len(head) - len(tail)) + tail
+
+    def test_body_of_exactly_the_cap_is_not_truncated(self):
+        for chunk_size in (1000, 20000, None):
+            with self.subTest(chunk_size=chunk_size):
+                response = FakeStreamedResponse(self.page(20000), chunk_size)
+                body = Scrapper.read_body(response)
+                self.assertFalse(body["truncated"])
+                self.assertEqual(body["bytes_downloaded"], 20000)
+                self.assertTrue(body["text"].endswith("</html>"))
+
+    def test_body_over_the_cap_is_truncated(self):
+        body = Scrapper.read_body(FakeStreamedResponse(self.page(20001), 1000))
+        self.assertTrue(body["truncated"])
+        self.assertEqual(body["bytes_downloaded"], 20000)
+
+    @unittest.skipIf(Scrapper.CSSSelector is None, "early stops need cssselect")
+    def test_small_remainder_after_early_stop_is_drained(self):
+        html = b"<html><body><div class='story'><p>Text</p></div>" + b"<!-- rest -->" * 200 + b"</body></html>"
+        for content_length in (True, False):
+            with self.subTest(content_length=content_length):
+                response = FakeStreamedResponse(html, 256, content_length)
+                body = Scrapper.read_body(response, "div.story")
+                self.assertTrue(body["stopped_early"])
+                self.assertTrue(response.consumed)
+                self.assertFalse(body["connection_dropped"])
+                self.assertEqual(body["bytes_downloaded"] + body["bytes_drained"], len(html))
+
+    @unittest.skipIf(Scrapper.CSSSelector is None, "early stops need cssselect")
+    def test_large_remainder_after_early_stop_drops_the_connection(self):
+        html = b"<html><body><div class='story'><p>Text</p></div>" + b"<!-- rest -->" * 2000 + b"</body></html>"
+        for content_length, drained in ((True, 0), (False, None)):
+            with self.subTest(content_length=content_length):
+                response = FakeStreamedResponse(html, 256, content_length)
+                body = Scrapper.read_body(response, "div.story")
+                self.assertTrue(body["stopped_early"])
+                self.assertFalse(response.consumed)
+                self.assertTrue(body["connection_dropped"])
+                if drained is not None: # Known length: nothing is downloaded just to keep the socket
+                    self.assertEqual(body["bytes_drained"], drained)
+                else: # Unknown length: gives up once the drain limit is passed
+                    self.assertLessEqual(body["bytes_drained"], 4096 + 256)
+
+
+class ArticleWriterTest(unittest.TestCase):
+    def test_unexpected_error_is_raised_from_close_without_blocking(self):
+        articles = [{"url": f"https://example.com/{i}"} for i in range(10)]
+        writer = Scrapper.ArticleWriter(":memory:", batch_size=2, queue_size=1)
+        with mock.patch.object(Scrapper, "insert_articles_bulk", side_effect=ValueError("bad row")), \
+                contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            writer.start()
+            producer = threading.Thread(target=lambda: [writer.submit(article) for article in articles], daemon=True)
+            producer.start()
+            producer.join(timeout=5)
+            self.assertFalse(producer.is_alive(), "submit() blocked after the writer failed")
+            with self.assertRaisesRegex(ValueError, "bad row"):
+                writer.close()
+        self.assertFalse(writer.is_alive())
+        self.assertEqual(writer.error_count, len(articles))
+        self.assertEqual(writer.inserted_count, 0)
+
+
+class SchemaMigrationTest(unittest.TestCase):
+    def test_articles_view_after_upgrading_each_schema(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        expected = ["id", "source", *Scrapper.ARTICLES_VIEW_COLUMNS]
+        for start, _, _ in Scrapper.SCHEMA_MIGRATIONS:
+            with self.subTest(start=start):
+                conn = sqlite3.connect(os.path.join(directory.name, f"v{start}.db"), isolation_level=None)
+                self.addCleanup(conn.close)
+                with mock.patch.object(Scrapper, "SCHEMA_MIGRATIONS", Scrapper.SCHEMA_MIGRATIONS[:start]):
+                    Scrapper.migrate_db(conn, progress=lambda message: None)
+                if start == 1:
+                    conn.execute("INSERT INTO articles(source, article_date, title, url) VALUES "
+                                 "('Example', '2024-05-01', 'Title', 'https://example.com/a')")
+                self.assertEqual(Scrapper.migrate_db(conn, progress=lambda message: None), Scrapper.SCHEMA_VERSION)
+                columns = [row[1] for row in conn.execute("PRAGMA table_info(articles_view)")]
+                self.assertEqual(columns, expected)
+                if start == 1:
+                    self.assertEqual(conn.execute("SELECT source, title FROM articles_view").fetchall(),
+                                     [("Example", "Title")])
+
+
+class FetchLimiterTest(unittest.TestCase):
+    def test_host_limits_override_the_per_host_cap(self):
+        limiter = Scrapper.FetchLimiter(16, 2, {"big.example.com": 6})
+        for url, limit in (("https://big.example.com/a", 6), ("https://small.example.com/a", 2)):
+            with self.subTest(url=url):
+                with contextlib.ExitStack() as stack:
+                    for _ in range(limit):
+                        stack.enter_context(limiter.slot(url))
+                    self.assertFalse(limiter._host_semaphore(url).acquire(blocking=False))
+
+    def test_pool_and_limiter_share_one_table(self):
+        self.assertIs(Scrapper.FETCH_LIMITER.host_limits, Scrapper.HOST_FETCH_LIMITS)
+        self.assertIs(Scrapper.HTTP_POOL.pool_size_overrides, Scrapper.HOST_FETCH_LIMITS)
+
+
+class ValidatorCacheTest(unittest.TestCase):
+    SITES = {"Example": {"url": "https://example.com/news", "content_selector": "div.story"}}
+    URL = "https://example.com/news"
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db_path = os.path.join(directory.name, "news.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(Scrapper.init_db(self.db_path))
+        cache = Scrapper.ValidatorCache.from_db(self.db_path, self.SITES)
+        cache.store_response(self.URL, '"v1"', None, 1000)
+        cache.confirm(self.URL)
+        cache.save()
+
+    def test_validators_are_sent_while_the_matching_config_is_unchanged(self):
+        cache = Scrapper.ValidatorCache.from_db(self.db_path, self.SITES)
+        self.assertEqual(cache.conditional_headers(self.URL), {"If-None-Match": '"v1"'})
+
+    def test_validators_are_ignored_after_the_matching_config_changes(self):
+        changes = {
+            "watchlists": mock.patch.dict(Scrapper.WATCHLISTS, {"Water": {"Supply": {"any": ["water"]}}}),
+            "prefilter policy": mock.patch.object(Scrapper, "PREFILTER_POLICY", "off"),
+            "site prefilter": mock.patch.dict(self.SITES["Example"], {"prefilter": "strict"}),
+        }
+        for name, patcher in changes.items():
+            with self.subTest(name), patcher:
+                cache = Scrapper.ValidatorCache.from_db(self.db_path, self.SITES)
+                self.assertEqual(cache.conditional_headers(self.URL), {})
+
+
+SENTENCE = "The state cabinet approved the new water supply scheme for the district on Monday."
+
+# Article pages the two extractors must agree on: name -> (content_selector, html)
+EXTRACTION_FIXTURES = {
+    "direct paragraphs": ("div.story", f"""
+        <div class="story"><p>{SENTENCE}</p><p>Short.</p><p>Advertisement {SENTENCE}</p>
+        <p>Also read: {SENTENCE}</p><p>{SENTENCE} <b>Second</b> sentence.</p></div>"""),
+    "nested paragraphs": ("div.story", f"""
+        <div class="story"><section><p>{SENTENCE}</p></section>
+        <figure><p>Caption: {SENTENCE}</p></figure><div><aside><p>{SENTENCE} aside</p></aside></div></div>"""),
+    "area inside a figure": ("div.story", f"""
+        <figure><div class="story"><p>{SENTENCE}</p><aside><p>Inner {SENTENCE}</p></aside></div></figure>"""),
+    "link-heavy paragraphs": ("div.story", f"""
+        <div class="story"><p><a href="/a">{SENTENCE}</a> More</p>
+        <p><a href="/b">Related story</a> {SENTENCE}</p></div>"""),
+    "scripts and comments": ("div.story", f"""
+        <div class="story"><p>{SENTENCE}<script>var ad = "{SENTENCE}";</script><!-- {SENTENCE} --> tail</p>
+        <p><style>p {{ color: red; }}</style>{SENTENCE}<ruby>x<rt>y</rt></ruby></p></div>"""),
+    "fallback selector": ("div.missing", f"""
+        <div class="article-body"><p>{SENTENCE}</p></div>"""),
+    "get_text fallback": ("div.story", f"""
+        <div class="story"><span>{SENTENCE}</span> <em>{SENTENCE}</em></div>"""),
+    "no usable text": ("div.story", """
+        <div class="story"><p>Too short.</p></div>"""),
+    "no content area": ("div.missing", """
+        <div class="sidebar"><p>Nothing to see.</p></div>"""),
+}
+
+
+@unittest.skipIf(Scrapper.CSSSelector is None, "the lxml extractor needs cssselect")
+class ExtractorDifferentialTest(unittest.TestCase):
+    """extract_article_content_lxml must return exactly what the BeautifulSoup extractor does."""
+
+    def extract(self, selector, html, extractor):
+        config = {"content_selector": selector, "extractor": extractor}
+        page = Scrapper.parse_article_page(f"<html><body>{html}</body></html>", config)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if extractor == "lxml":
+                return Scrapper.extract_article_content_lxml(page, config, "https://example.com/story")
+            return Scrapper.extract_article_content(page, config, "https://example.com/story")
+
+    def test_extractors_agree(self):
+        for name, (selector, html) in EXTRACTION_FIXTURES.items():
+            with self.subTest(name):
+                self.assertEqual(self.extract(selector, html, "lxml"), self.extract(selector, html, "soup"))
+
+    def test_fixtures_cover_each_outcome(self):
+        outcomes = {self.extract(selector, html, "soup").split(":")[0] for selector, html in EXTRACTION_FIXTURES.values()}
+        self.assertTrue({"Warning", "Error"} < outcomes, outcomes)
+
+
+def setUpModule():
+    patcher = mock.patch.object(Scrapper, "google_api_key_configured", True)
+    patcher.start()
+    unittest.addModuleCleanup(patcher.stop)
+
+
+if __name__ == "__main__":
+    unittest.main()